@@ -0,0 +1,618 @@
+import io
+import json
+import os
+import random
+import threading
+
+import pytest
+
+import xindmap.file
+import xindmap.mind_map
+
+
+def dict_nodes(node_dict):
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(node_dict)
+
+    return mind_map.snapshot().nodes()
+
+
+def random_node_dict(depth=0):
+    node_dict = {
+        "title": f"{random.randint(0, 99)} \"é\\😀" * random.randint(0, 2),
+        "childs": [],
+    }
+
+    if depth < 5:
+        for _ in range(random.randint(0, 3)):
+            node_dict["childs"].append(random_node_dict(depth + 1))
+
+    return node_dict
+
+
+def test_json_reader():
+    random.seed(0)
+
+    for _ in range(20):
+        node_dict = random_node_dict()
+        mind_map = xindmap.mind_map.MindMap()
+        mind_map.populate_from_dict(node_dict)
+
+        for indent in (2, None):
+            text = json.dumps(node_dict, indent=indent)
+
+            for chunk_size in (1, 7, 4096):
+                reader = xindmap.file.MindMapJsonReader(io.StringIO(text), chunk_size)
+                streamed_mind_map = xindmap.mind_map.MindMap()
+                streamed_mind_map.populate_from_nodes(reader.nodes(), None, 2)
+
+                assert streamed_mind_map.to_dict() == node_dict
+
+
+def test_json_reader_key_order():
+    text = (
+        '{"childs": [{"extra": [1, {"a": null}], "title": "child"}],'
+        ' "extra": {"b": [true, -1.5e3]}, "title": "root"}'
+    )
+    reader = xindmap.file.MindMapJsonReader(io.StringIO(text), 3)
+
+    assert list(reader.nodes()) == [(0, "root"), (1, "child")]
+
+
+@pytest.mark.parametrize(
+    "text",
+    ['{"title": 1}', '{"title": "a"', '{"title": "a"} {', '[]', '{"childs": [1]}'],
+)
+def test_json_reader_error(text):
+    reader = xindmap.file.MindMapJsonReader(io.StringIO(text), 2)
+
+    with pytest.raises(xindmap.file.MindMapFileError):
+        list(reader.nodes())
+
+
+def test_json_writer():
+    random.seed(1)
+
+    for _ in range(20):
+        node_dict = random_node_dict()
+        mind_map = xindmap.mind_map.MindMap()
+        mind_map.populate_from_dict(node_dict)
+        snapshot = mind_map.snapshot()
+
+        for indent in (2, None):
+            for chunk_size in (1, 4096):
+                file = io.StringIO()
+                writer = xindmap.file.MindMapJsonWriter(file, indent, chunk_size)
+                writer.write(snapshot.nodes())
+
+                assert file.getvalue() == json.dumps(node_dict, indent=indent)
+
+
+def test_json_writer_error():
+    writer = xindmap.file.MindMapJsonWriter(io.StringIO())
+
+    with pytest.raises(xindmap.file.MindMapFileError):
+        writer.write([])
+
+    with pytest.raises(xindmap.file.MindMapFileError):
+        writer.write([(0, "root"), (2, "orphan")])
+
+
+def test_binary_file(tmp_path):
+    random.seed(2)
+
+    for index in range(20):
+        node_dict = random_node_dict()
+        mind_map = xindmap.mind_map.MindMap()
+        mind_map.populate_from_dict(node_dict)
+
+        mind_map_file = xindmap.file.MindMapFile(tmp_path / f"{index}.xmap")
+        mind_map_file.write(mind_map.snapshot().nodes())
+
+        loaded_mind_map = xindmap.mind_map.MindMap()
+        loaded_mind_map.populate_from_nodes(mind_map_file.nodes())
+
+        assert mind_map_file.is_binary
+        assert loaded_mind_map.to_dict() == node_dict
+
+
+def test_binary_file_error(tmp_path):
+    file_path = tmp_path / "map.xmap"
+    mind_map_file = xindmap.file.MindMapFile(file_path)
+    mind_map_file.write([(0, "root"), (1, "child")])
+
+    content = file_path.read_bytes()
+
+    for corrupted_content in (b"", b"JSON" + content[4:], content[:-1]):
+        file_path.write_bytes(corrupted_content)
+
+        with pytest.raises(xindmap.file.MindMapFileError):
+            list(mind_map_file.nodes())
+
+
+@pytest.mark.parametrize("suffix", [".json.bz2", ".json.gz", ".json.xz"])
+def test_compressed_file(tmp_path, suffix):
+    random.seed(3)
+
+    node_dict = random_node_dict()
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(node_dict)
+
+    mind_map_file = xindmap.file.MindMapFile(tmp_path / f"map{suffix}")
+    mind_map_file.write(mind_map.snapshot().nodes(), compression_level=1)
+
+    with mind_map_file.compression.open(tmp_path / f"map{suffix}", "rt") as file:
+        assert json.load(file) == node_dict
+
+    loaded_mind_map = xindmap.mind_map.MindMap()
+    loaded_mind_map.populate_from_nodes(mind_map_file.nodes())
+
+    assert loaded_mind_map.to_dict() == node_dict
+
+
+def test_database(tmp_path):
+    mind_map = xindmap.mind_map.MindMap()
+    change_tracker = xindmap.mind_map.MindMapChangeTracker()
+
+    for event_type in xindmap.mind_map.MindMapEvent:
+        callback_name = f"on_mind_map_{event_type.name}"
+
+        if hasattr(change_tracker, callback_name):
+            mind_map.register_callbacks(event_type, getattr(change_tracker, callback_name))
+
+    random.seed(3)
+    mind_map.populate_from_dict(random_node_dict())
+    mind_map.history_clear()
+
+    database = xindmap.file.MindMapDatabase(tmp_path / "map.sqlite")
+    change_tracker.clear()
+    database.save(mind_map.snapshot())
+
+    for _ in range(200):
+        node_ids = list(mind_map.snapshot().node_ids())
+        node_id = random.choice(node_ids)
+        action = random.random()
+
+        if action < 0.3:
+            mind_map.node_set_title(str(random.random()), node_id)
+        elif action < 0.5:
+            mind_map.node_add(node_id)
+        elif action < 0.7 and node_id != node_ids[0]:
+            mind_map.node_delete(node_id)
+        elif action < 0.9 and node_id != node_ids[0]:
+            child_count = len(mind_map.node_child_ids(node_ids[0]))
+            mind_map.node_move(node_id, node_ids[0], random.randint(0, child_count - 1))
+        else:
+            mind_map.undo()
+
+        is_cleared, changed_ids = change_tracker.changes_take()
+        database.save(mind_map.snapshot(), changed_ids)
+
+        assert not is_cleared
+
+    loaded_mind_map = xindmap.mind_map.MindMap()
+    loaded_mind_map.populate_from_nodes(database.nodes())
+
+    assert loaded_mind_map.to_dict() == mind_map.to_dict()
+
+    database.compact()
+    database.close()
+
+    database = xindmap.file.MindMapDatabase(tmp_path / "map.sqlite")
+
+    assert list(database.nodes()) == list(mind_map.snapshot().nodes())
+
+
+def test_autosaver():
+    saved = threading.Event()
+    autosaver = xindmap.file.MindMapAutosaver(saved.set)
+    autosaver.on_config_variable_autosave_debounce_s_set(0.05)
+
+    try:
+        with autosaver.paused():
+            autosaver.change_record()
+
+            assert not saved.wait(0.2)
+
+        autosaver.change_record()
+
+        assert saved.wait(5)
+
+        saved.clear()
+        autosaver.on_config_variable_autosave_interval_s_set(0)
+        autosaver.change_record()
+
+        assert not saved.wait(0.2)
+    finally:
+        autosaver.stop()
+
+
+def test_folded_mind_map(tmp_path):
+    random.seed(5)
+
+    file_path = tmp_path / "map.json"
+    node_dict = random_node_dict()
+    xindmap.file.MindMapFile(file_path).write(dict_nodes(node_dict))
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_nodes(xindmap.file.MindMapFile(file_path).nodes(), None, None, 1)
+    mind_map.history_clear()
+
+    change_tracker = xindmap.mind_map.MindMapChangeTracker()
+    journal = xindmap.file.MindMapJournal()
+
+    for event_type in xindmap.mind_map.MindMapEvent:
+        callback_name = f"on_mind_map_{event_type.name}"
+
+        for listener in (change_tracker, journal):
+            if hasattr(listener, callback_name):
+                mind_map.register_callbacks(event_type, getattr(listener, callback_name))
+
+    database = xindmap.file.MindMapDatabase(tmp_path / "map.sqlite")
+    database.save(mind_map.snapshot())
+    change_tracker.clear()
+
+    assert list(database.nodes()) == list(dict_nodes(node_dict))
+
+    try:
+        journal.open(file_path, mind_map.snapshot().node_ids(include_folded=True))
+
+        for _ in range(50):
+            node_ids = list(mind_map.snapshot().node_ids())
+            node_id = random.choice(node_ids)
+            action = random.random()
+
+            if action < 0.3:
+                mind_map.node_unfold(node_id, 1)
+            elif action < 0.5:
+                mind_map.node_fold(node_id)
+            elif action < 0.7:
+                mind_map.node_set_title("added", mind_map.node_add(node_id))
+            elif node_id != node_ids[0]:
+                mind_map.node_delete(node_id)
+
+            database.save(mind_map.snapshot(), change_tracker.changes_take()[1])
+
+        journal.close()
+    finally:
+        journal.stop()
+
+    replayed_mind_map = xindmap.mind_map.MindMap()
+    replayed_mind_map.populate_from_nodes(xindmap.file.MindMapFile(file_path).nodes())
+
+    assert xindmap.file.MindMapJournal.replay(file_path, replayed_mind_map) > 0
+    assert replayed_mind_map.to_dict() == mind_map.to_dict()
+    assert list(database.nodes()) == list(mind_map.snapshot().nodes())
+
+    database.close()
+
+
+def test_file_write_replaces_file(tmp_path):
+    file_path = tmp_path / "map.json"
+    file_path.write_text("previous content")
+
+    mind_map_file = xindmap.file.MindMapFile(file_path)
+
+    with pytest.raises(xindmap.file.MindMapFileError):
+        mind_map_file.write([(1, "orphan")])
+
+    assert file_path.read_text() == "previous content"
+
+    mind_map_file.write([(0, "root")])
+
+    assert json.loads(file_path.read_text()) == {"title": "root", "childs": []}
+    assert [path.name for path in tmp_path.iterdir()] == ["map.json"]
+
+
+def test_file_index(tmp_path):
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "a", "childs": [{"title": "é", "childs": []}]},
+            {
+                "title": "b",
+                "childs": [
+                    {"title": "c", "childs": [{"title": "d", "childs": []}]},
+                ],
+            },
+        ],
+    }
+    file_path = tmp_path / "map.json"
+    mind_map_file = xindmap.file.MindMapFile(file_path)
+    mind_map_file.write(dict_nodes(node_dict), index_depth=2)
+
+    index = xindmap.file.MindMapIndex.read(file_path)
+    content = file_path.read_bytes()
+
+    for titles, child_dict in (
+        (["a"], node_dict["childs"][0]),
+        (["a", "é"], node_dict["childs"][0]["childs"][0]),
+        (["b", "c", "d"], node_dict["childs"][1]["childs"][0]),
+    ):
+        offset, length, title_count = index.subtree_range(titles)
+
+        assert title_count == min(len(titles), 2)
+        assert json.loads(content[offset:offset + length])["title"] == titles[
+            title_count - 1
+        ]
+
+    # the rest of the file is not read
+    offset, length, _ = index.subtree_range(["b"])
+    stat = file_path.stat()
+    file_path.write_bytes(
+        b" " * offset + content[offset:offset + length]
+        + b" " * (len(content) - offset - length)
+    )
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_nodes(mind_map_file.subtree_nodes(["b", "c"]))
+
+    assert mind_map.to_dict() == node_dict["childs"][1]["childs"][0]
+
+    # a stale index is not used
+    file_path.write_text(json.dumps(node_dict))
+
+    assert xindmap.file.MindMapIndex.read(file_path) is None
+    assert list(mind_map_file.subtree_nodes(["a"])) == [(0, "a"), (1, "é")]
+
+    with pytest.raises(xindmap.file.MindMapFileError):
+        list(mind_map_file.subtree_nodes(["a", "d"]))
+
+    mind_map_file.write(dict_nodes(node_dict))
+
+    assert [path.name for path in tmp_path.iterdir()] == ["map.json"]
+
+
+def test_journal(tmp_path):
+    file_path = tmp_path / "map.json"
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(random_node_dict())
+    xindmap.file.MindMapFile(file_path).write(mind_map.snapshot().nodes())
+
+    journal = xindmap.file.MindMapJournal()
+
+    for event_type in (
+        xindmap.mind_map.MindMapEvent.changed,
+        xindmap.mind_map.MindMapEvent.cleared,
+        xindmap.mind_map.MindMapEvent.node_added,
+        xindmap.mind_map.MindMapEvent.node_deleted,
+        xindmap.mind_map.MindMapEvent.node_moved,
+        xindmap.mind_map.MindMapEvent.node_title_set,
+        xindmap.mind_map.MindMapEvent.subtree_added,
+    ):
+        callback = getattr(journal, f"on_mind_map_{event_type.name}")
+        mind_map.register_callbacks(event_type, callback)
+
+    try:
+        journal.open(file_path, mind_map.snapshot().node_ids())
+
+        for _ in range(50):
+            node_ids = list(mind_map.snapshot().node_ids())
+            node_id = random.choice(node_ids)
+
+            with mind_map.transaction():
+                added_node_id = mind_map.node_add(node_id)
+                mind_map.node_set_title("added", added_node_id)
+
+            if len(node_ids) > 2:
+                mind_map.node_move(added_node_id, mind_map.root_node_id, 0)
+                mind_map.node_delete(random.choice(node_ids[1:]))
+
+        journal.close()
+    finally:
+        journal.stop()
+
+    # a record cut by an incomplete sync is ignored
+    with open(xindmap.file.MindMapJournal.journal_path(file_path), "ab") as file:
+        file.write(b"N\x00\x00")
+
+    replayed_mind_map = xindmap.mind_map.MindMap()
+    replayed_mind_map.populate_from_nodes(xindmap.file.MindMapFile(file_path).nodes())
+
+    assert xindmap.file.MindMapJournal.replay(file_path, replayed_mind_map) > 0
+    assert replayed_mind_map.to_dict() == mind_map.to_dict()
+
+    # the journal is stale once the file is saved again
+    xindmap.file.MindMapFile(file_path).write(replayed_mind_map.snapshot().nodes())
+
+    assert xindmap.file.MindMapJournal.replay(file_path, replayed_mind_map) == 0
+
+
+def test_journal_bind(tmp_path):
+    file_path = tmp_path / "map.json"
+
+    mind_map = xindmap.mind_map.MindMap()
+    journal = xindmap.file.MindMapJournal()
+
+    for event_type in (
+        xindmap.mind_map.MindMapEvent.node_added,
+        xindmap.mind_map.MindMapEvent.node_title_set,
+    ):
+        callback = getattr(journal, f"on_mind_map_{event_type.name}")
+        mind_map.register_callbacks(event_type, callback)
+
+    root_id = mind_map.node_add()
+
+    try:
+        # records held back while a failed save binds no file are dropped
+        journal.hold()
+        mind_map.node_set_title("dropped", root_id)
+        journal.release()
+
+        # the ones held back while a save binds the file go to its journal
+        journal.hold()
+        snapshot = mind_map.snapshot()
+        mind_map.node_set_title("root", root_id)
+        xindmap.file.MindMapFile(file_path).write(snapshot.nodes())
+        journal.open(file_path, snapshot.node_ids(include_folded=True))
+
+        mind_map.node_add(root_id)
+        journal.close()
+    finally:
+        journal.stop()
+
+    replayed_mind_map = xindmap.mind_map.MindMap()
+    replayed_mind_map.populate_from_nodes(xindmap.file.MindMapFile(file_path).nodes())
+
+    assert xindmap.file.MindMapJournal.replay(file_path, replayed_mind_map) == 2
+    assert replayed_mind_map.to_dict() == mind_map.to_dict()
+
+
+def test_loader():
+    random.seed(4)
+
+    loader = xindmap.file.MindMapLoader()
+    loader.on_config_variable_file_load_chunk_interval_ms_set(0)
+    loader.on_config_variable_file_load_chunk_size_set(8)
+    loader.on_config_variable_file_load_first_levels_set(2)
+
+    progresses = []
+    loader.register_callbacks(
+        xindmap.file.MindMapLoaderEvent.progressed,
+        lambda loader, event: progresses.append(
+            (event.loaded_node_count, event.node_count)
+        ),
+    )
+
+    for _ in range(10):
+        node_dict = random_node_dict()
+        mind_map = xindmap.mind_map.MindMap()
+        progresses.clear()
+
+        assert loader.load(mind_map, dict_nodes(node_dict))
+        assert mind_map.to_dict() == node_dict
+        assert progresses[0] == (0, None)
+        assert progresses[-1] == (len(mind_map), len(mind_map))
+        assert progresses[1:] == sorted(progresses[1:])
+
+    # the load stops at the end of the chunk it is cancelled in
+    loader.register_callbacks(
+        xindmap.file.MindMapLoaderEvent.progressed,
+        lambda loader, event: event.node_count is not None and loader.cancel(),
+    )
+
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "child", "childs": [{"title": "grandchild", "childs": []}]}
+            for _ in range(20)
+        ],
+    }
+    mind_map = xindmap.mind_map.MindMap()
+
+    assert not loader.load(mind_map, dict_nodes(node_dict))
+    assert 21 < len(mind_map) < 41
+
+
+def test_loader_cut_short():
+    def new_loader():
+        loader = xindmap.file.MindMapLoader()
+        loader.on_config_variable_file_load_chunk_interval_ms_set(0)
+        loader.on_config_variable_file_load_chunk_size_set(8)
+        loader.on_config_variable_file_load_first_levels_set(2)
+
+        return loader
+
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "child", "childs": [{"title": "grandchild", "childs": []}]}
+            for _ in range(20)
+        ],
+    }
+
+    # the load can not be undone
+    mind_map = xindmap.mind_map.MindMap()
+    edit_count = mind_map.edit_count
+
+    assert new_loader().load(mind_map, dict_nodes(node_dict))
+    assert mind_map.undo() is None
+    assert mind_map.edit_count == edit_count
+
+    # the subtree of a node deleted meanwhile is not loaded
+    mind_map = xindmap.mind_map.MindMap()
+    loader = new_loader()
+    loader.register_callbacks(
+        xindmap.file.MindMapLoaderEvent.progressed,
+        lambda loader, event: (
+            event.node_count is not None
+            and event.loaded_node_count > 21
+            and mind_map.node_id_exists(39)
+            and mind_map.node_delete(39)
+        ),
+    )
+
+    assert not loader.load(mind_map, dict_nodes(node_dict))
+    assert mind_map.edit_count > edit_count
+
+    # neither is a mind map emptied meanwhile
+    mind_map = xindmap.mind_map.MindMap()
+    loader = new_loader()
+    loader.register_callbacks(
+        xindmap.file.MindMapLoaderEvent.progressed,
+        lambda loader, event: (
+            mind_map.root_node_id is not None
+            and mind_map.node_delete(mind_map.root_node_id)
+        ),
+    )
+
+    assert not loader.load(mind_map, dict_nodes(node_dict))
+    assert len(mind_map) == 0
+
+    # the nodes of a node folded meanwhile are loaded into its fold
+    for is_read in (False, True):
+        mind_map = xindmap.mind_map.MindMap()
+        loader = new_loader()
+        loader.register_callbacks(
+            xindmap.file.MindMapLoaderEvent.progressed,
+            lambda loader, event, is_read=is_read: (
+                (event.node_count is not None) == is_read
+                and len(mind_map) > 1
+                and mind_map.node_fold(mind_map.root_node_id)
+            ),
+        )
+
+        assert loader.load(mind_map, dict_nodes(node_dict))
+        assert len(mind_map) == 1
+
+        mind_map.unfold_all()
+
+        assert mind_map.to_dict() == node_dict
+
+
+def test_loader_unfolded_levels():
+    random.seed(6)
+
+    loader = xindmap.file.MindMapLoader()
+    loader.on_config_variable_file_load_chunk_interval_ms_set(0)
+    loader.on_config_variable_file_load_chunk_size_set(8)
+    loader.on_config_variable_file_load_first_levels_set(2)
+
+    progresses = []
+    loader.register_callbacks(
+        xindmap.file.MindMapLoaderEvent.progressed,
+        lambda loader, event: progresses.append(
+            (event.loaded_node_count, event.node_count)
+        ),
+    )
+
+    for unfolded_levels in range(1, 5):
+        loader.on_config_variable_file_load_unfolded_levels_set(unfolded_levels)
+
+        for _ in range(5):
+            node_dict = random_node_dict()
+            mind_map = xindmap.mind_map.MindMap()
+            progresses.clear()
+
+            assert loader.load(mind_map, dict_nodes(node_dict))
+            assert mind_map.to_dict() == node_dict
+            assert progresses[-1] == (len(mind_map), len(mind_map))
+            assert all(
+                mind_map.node_depth(node_id) < unfolded_levels
+                for node_id in mind_map.snapshot().node_ids()
+            )
+            assert list(mind_map.snapshot().node_ids(include_folded=True)) == list(
+                range(len(list(mind_map.snapshot().nodes())))
+            )
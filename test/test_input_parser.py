@@ -6,6 +6,8 @@ def test_parse_single_input():
         "aa": None,
         "<CR>": xindmap.input.Input(xindmap.input.InputType.enter),
         "<BS>": xindmap.input.Input(xindmap.input.InputType.backspace),
+        "<Left>": xindmap.input.Input(xindmap.input.InputType.left),
+        "<Del>": xindmap.input.Input(xindmap.input.InputType.delete),
     }
 
     for string, expected_input in string_to_expected_input.items():
@@ -0,0 +1,1158 @@
+import random
+
+import pytest
+
+import xindmap.mind_map
+
+
+def test_node_add_and_delete():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    child_a_id = mind_map.node_add(root_id)
+    child_b_id = mind_map.node_add(root_id)
+    grand_child_id = mind_map.node_add(child_a_id)
+
+    assert len(mind_map) == 4
+    assert mind_map.root_node_id == root_id
+    assert mind_map.node_child_ids(root_id) == [child_a_id, child_b_id]
+    assert mind_map.node_parent_id(grand_child_id) == child_a_id
+    assert mind_map.node_parent_id(root_id) is None
+
+    mind_map.node_delete(child_a_id)
+
+    assert len(mind_map) == 2
+    assert mind_map.node_child_ids(root_id) == [child_b_id]
+    assert not mind_map.node_id_exists(child_a_id)
+    assert not mind_map.node_id_exists(grand_child_id)
+
+    mind_map.node_delete(root_id)
+
+    assert len(mind_map) == 0
+    assert mind_map.root_node_id is None
+
+
+def test_node_title():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    child_id = mind_map.node_add(root_id)
+
+    mind_map.node_set_title("root", root_id)
+    mind_map.node_set_title("é child", child_id)
+    mind_map.node_select(child_id)
+    mind_map.add_text("ren")
+    mind_map.remove_last_char()
+
+    assert mind_map.node_title(root_id) == "root"
+    assert mind_map.node_title(child_id) == "é childre"
+
+    for index in range(10000):
+        mind_map.node_set_title(f"title {index}", root_id)
+
+    assert mind_map.node_title(root_id) == "title 9999"
+    assert mind_map.node_title(child_id) == "é childre"
+
+
+def test_to_dict():
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "a", "childs": [{"title": "aa", "childs": []}]},
+            {"title": "b", "childs": []},
+        ],
+    }
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(node_dict)
+
+    assert mind_map.to_dict() == node_dict
+
+
+def test_populate_from_dict_dispatches_one_event():
+    mind_map = xindmap.mind_map.MindMap()
+
+    events = []
+    for event_type in xindmap.mind_map.MindMapEvent:
+        mind_map.register_callbacks(
+            event_type, lambda source, event: events.append(event)
+        )
+
+    node_dict = {"title": "root", "childs": [{"title": str(index)} for index in range(100)]}
+    root_id = mind_map.populate_from_dict(node_dict)
+
+    assert len(events) == 1
+    assert events[0].type == xindmap.mind_map.MindMapEvent.subtree_added
+    assert events[0].node_id == root_id
+    assert events[0].node_ids[0] == root_id
+    assert len(events[0].node_ids) == 101
+    assert mind_map.node_title(events[0].node_ids[-1]) == "99"
+
+
+def test_populate_from_nodes_by_chunks():
+    mind_map = xindmap.mind_map.MindMap()
+
+    events = []
+    mind_map.register_callbacks(
+        xindmap.mind_map.MindMapEvent.subtree_added,
+        lambda source, event: events.append(event)
+    )
+
+    nodes = [(0, "root"), (1, "a"), (2, "aa"), (1, "b"), (2, "ba"), (3, "baa"), (1, "c")]
+    root_id = mind_map.populate_from_nodes(nodes, None, 2)
+
+    assert [len(event.node_ids) for event in events] == [2, 4, 1]
+    assert mind_map.node_subtree_size(root_id) == 7
+    assert mind_map.node_height(root_id) == 3
+    assert mind_map.node_search("baa") == [events[1].node_ids[-1]]
+
+    mind_map.undo()
+
+    assert len(mind_map) == 0
+
+    with pytest.raises(xindmap.mind_map.MindMapError):
+        mind_map.populate_from_nodes([(0, "root"), (2, "orphan")])
+
+    # an addition not recorded can not be undone
+    mind_map.clear()
+    mind_map.populate_from_nodes(nodes, None, 2, None, False)
+
+    assert mind_map.undo() is None
+    assert len(mind_map) == 7
+
+    # population is cut short by the deletion of a node being populated
+    def nodes_deleting_root():
+        yield 0, "root"
+        yield 1, "a"
+        yield 1, "b"
+        mind_map.node_delete(mind_map.root_node_id)
+        yield 1, "c"
+
+    mind_map.clear()
+
+    assert mind_map.populate_from_nodes(nodes_deleting_root(), None, 1) is None
+    assert len(mind_map) == 0
+
+
+def test_deep_chain():
+    depth = 100000
+
+    node_dict = {"title": str(depth - 1), "childs": []}
+    for index in reversed(range(depth - 1)):
+        node_dict = {"title": str(index), "childs": [node_dict]}
+
+    mind_map = xindmap.mind_map.MindMap()
+    root_id = mind_map.populate_from_dict(node_dict)
+
+    assert len(mind_map) == depth
+
+    node_dict = mind_map.to_dict()
+    for index in range(depth):
+        assert node_dict["title"] == str(index)
+        node_dict = node_dict["childs"][0] if node_dict["childs"] else None
+    assert node_dict is None
+
+    mind_map.node_delete(root_id)
+
+    assert len(mind_map) == 0
+    assert mind_map.root_node_id is None
+
+
+def test_node_siblings():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    child_ids = [mind_map.node_add(root_id) for _ in range(4)]
+
+    assert mind_map.node_first_child_id(root_id) == child_ids[0]
+    assert mind_map.node_last_child_id(root_id) == child_ids[3]
+    assert mind_map.node_first_child_id(child_ids[0]) is None
+    assert mind_map.node_previous_sibling_id(child_ids[0]) is None
+    assert mind_map.node_next_sibling_id(child_ids[3]) is None
+    assert mind_map.node_next_sibling_id(root_id) is None
+
+    mind_map.node_delete(child_ids[1])
+
+    assert mind_map.node_next_sibling_id(child_ids[0]) == child_ids[2]
+    assert mind_map.node_previous_sibling_id(child_ids[2]) == child_ids[0]
+
+    mind_map.node_delete(child_ids[3])
+
+    assert mind_map.node_last_child_id(root_id) == child_ids[2]
+    assert mind_map.node_next_sibling_id(child_ids[2]) is None
+
+
+def test_node_aggregates():
+    def check(mind_map):
+        def walk(node_id, depth):
+            assert mind_map.node_depth(node_id) == depth
+
+            subtree_size = 1
+            height = 0
+            for child_id in mind_map.node_child_ids(node_id):
+                child_subtree_size, child_height = walk(child_id, depth + 1)
+                subtree_size += child_subtree_size
+                height = max(height, child_height + 1)
+
+            assert mind_map.node_subtree_size(node_id) == subtree_size
+            assert mind_map.node_height(node_id) == height
+
+            return subtree_size, height
+
+        walk(mind_map.root_node_id, 0)
+
+    generator = random.Random(0)
+
+    mind_map = xindmap.mind_map.MindMap()
+    node_ids = [mind_map.node_add()]
+
+    for _ in range(500):
+        parent_id = generator.choice(node_ids)
+
+        if generator.random() < 0.1:
+            node_dict = {"childs": [{"childs": [{}]}, {}]}
+            node_id = mind_map.populate_from_dict(node_dict, parent_id)
+            node_ids.append(node_id)
+            node_ids.extend(mind_map.node_child_ids(node_id))
+            node_ids.extend(mind_map.node_child_ids(mind_map.node_child_ids(node_id)[0]))
+        elif generator.random() < 0.2 and parent_id != mind_map.root_node_id:
+            mind_map.node_delete(parent_id)
+            node_ids = [
+                node_id for node_id in node_ids if mind_map.node_id_exists(node_id)
+            ]
+        else:
+            node_ids.append(mind_map.node_add(parent_id))
+
+        check(mind_map)
+
+    assert mind_map.node_subtree_size(mind_map.root_node_id) == len(mind_map)
+
+
+def test_node_search():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    mind_map.node_set_title("mind map", root_id)
+
+    titles = ["map", "Mapping", "road map", "bitmap", "tree", "map"]
+    node_ids = []
+    for title in titles:
+        node_id = mind_map.node_add(root_id)
+        mind_map.node_set_title(title, node_id)
+        node_ids.append(node_id)
+
+    assert mind_map.node_search("map") == [
+        node_ids[0], node_ids[5], node_ids[1], root_id, node_ids[2], node_ids[3]
+    ]
+    assert mind_map.node_search("MAP", 2) == [node_ids[0], node_ids[5]]
+    assert mind_map.node_search("ma") == mind_map.node_search("map")
+    assert mind_map.node_search("forest") == []
+
+    mind_map.node_select(node_ids[4])
+    mind_map.add_text(" map")
+    mind_map.remove_last_char()
+
+    assert node_ids[4] not in mind_map.node_search("map")
+    assert mind_map.node_search("tree ma") == [node_ids[4]]
+
+    mind_map.node_delete(node_ids[0])
+    mind_map.node_set_title("graph", node_ids[5])
+
+    assert mind_map.node_search("map") == [node_ids[1], root_id, node_ids[2], node_ids[3]]
+
+
+def test_node_search_random_edits():
+    generator = random.Random(1)
+    alphabet = "abcé "
+
+    mind_map = xindmap.mind_map.MindMap()
+    node_ids = [mind_map.node_add()]
+
+    for _ in range(2000):
+        node_id = generator.choice(node_ids)
+        action = generator.random()
+
+        if action < 0.3:
+            node_ids.append(mind_map.node_add(node_id))
+        elif action < 0.4 and node_id != mind_map.root_node_id:
+            mind_map.node_delete(node_id)
+            node_ids = [
+                node_id for node_id in node_ids if mind_map.node_id_exists(node_id)
+            ]
+        elif action < 0.5:
+            title = "".join(generator.choice(alphabet) for _ in range(6))
+            mind_map.node_set_title(title, node_id)
+        else:
+            mind_map.node_select(node_id)
+            if action < 0.8:
+                mind_map.add_text(generator.choice(alphabet) * generator.randint(1, 2))
+            else:
+                mind_map.remove_last_char()
+
+    for query in ("abc", "a b", "éé", "aaa", "c a", "ca"):
+        expected_ids = sorted(
+            node_id
+            for node_id in node_ids
+            if query in mind_map.node_title(node_id)
+        )
+        assert sorted(mind_map.node_search(query)) == expected_ids
+
+
+def test_ancestors():
+    def brute_force_path(node_id):
+        path = [node_id]
+        while mind_map.node_parent_id(path[-1]) is not None:
+            path.append(mind_map.node_parent_id(path[-1]))
+        return path
+
+    generator = random.Random(2)
+
+    mind_map = xindmap.mind_map.MindMap()
+    node_ids = [mind_map.node_add()]
+
+    for _ in range(3000):
+        parent_id = node_ids[-1] if generator.random() < 0.7 else generator.choice(node_ids)
+        node_ids.append(mind_map.node_add(parent_id))
+
+    for _ in range(50):
+        node_id = generator.choice(node_ids[1:])
+        if mind_map.node_id_exists(node_id):
+            mind_map.node_delete(node_id)
+    node_ids = [node_id for node_id in node_ids if mind_map.node_id_exists(node_id)]
+
+    for _ in range(500):
+        node_a_id = generator.choice(node_ids)
+        node_b_id = generator.choice(node_ids)
+
+        path_a = brute_force_path(node_a_id)
+        path_b = brute_force_path(node_b_id)
+
+        assert mind_map.path_to_root(node_a_id) == path_a
+        assert mind_map.is_ancestor(node_b_id, node_a_id) == (node_b_id in path_a[1:])
+        assert mind_map.is_ancestor(path_a[-1], node_a_id) == (len(path_a) > 1)
+
+        common_ids = set(path_b)
+        expected_id = next(node_id for node_id in path_a if node_id in common_ids)
+        assert mind_map.lowest_common_ancestor(node_a_id, node_b_id) == expected_id
+
+
+def test_snapshot():
+    mind_map = xindmap.mind_map.MindMap()
+
+    node_dict = {
+        "title": "root",
+        "childs": [{"title": str(index)} for index in range(3000)],
+    }
+    root_id = mind_map.populate_from_dict(node_dict)
+    child_ids = mind_map.node_child_ids(root_id)
+
+    snapshot_a = mind_map.snapshot()
+    dict_a = mind_map.to_dict()
+
+    mind_map.node_set_title("changed", child_ids[0])
+    mind_map.node_delete(child_ids[2000])
+    added_id = mind_map.node_add(child_ids[1])
+
+    snapshot_b = mind_map.snapshot()
+    dict_b = mind_map.to_dict()
+
+    mind_map.node_delete(root_id)
+
+    assert snapshot_a.to_dict() == dict_a
+    assert snapshot_b.to_dict() == dict_b
+    assert len(snapshot_a) == 3001
+    assert len(snapshot_b) == 3001
+    assert snapshot_b.node_id_exists(added_id)
+    assert snapshot_a.node_title(added_id) == "2000"
+    assert snapshot_b.node_parent_id(added_id) == child_ids[1]
+    assert snapshot_b.node_subtree_size(root_id) == 3001
+    assert snapshot_a.node_title(child_ids[0]) == "0"
+    assert mind_map.snapshot().root_node_id is None
+
+
+def test_undo_redo():
+    mind_map = xindmap.mind_map.MindMap()
+
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "a", "childs": [{"title": "aa", "childs": []}, {"title": "ab", "childs": []}]},
+            {"title": "b", "childs": []},
+            {"title": "c", "childs": []},
+        ],
+    }
+    root_id = mind_map.populate_from_dict(node_dict)
+    child_ids = mind_map.node_child_ids(root_id)
+    mind_map.history_clear()
+
+    assert mind_map.undo() is None
+
+    added_id = mind_map.node_add(child_ids[1])
+    mind_map.node_set_title("added", added_id)
+    mind_map.node_select(child_ids[2])
+    for char in "hello":
+        mind_map.add_text(char)
+    mind_map.remove_last_char()
+    mind_map.node_delete(child_ids[0])
+
+    edited_dict = mind_map.to_dict()
+
+    assert mind_map.undo() == child_ids[0]
+    assert mind_map.to_dict()["childs"][0] == node_dict["childs"][0]
+    assert mind_map.node_child_ids(root_id) == child_ids
+    assert mind_map.node_search("ab") == [mind_map.node_child_ids(child_ids[0])[1]]
+
+    assert mind_map.undo() == child_ids[2]
+    assert mind_map.node_title(child_ids[2]) == "c"
+
+    assert mind_map.undo() == added_id
+    assert mind_map.undo() == child_ids[1]
+    assert not mind_map.node_id_exists(added_id)
+    assert mind_map.to_dict() == node_dict
+    assert mind_map.node_subtree_size(root_id) == 6
+    assert mind_map.undo() is None
+
+    for _ in range(4):
+        mind_map.redo()
+
+    assert mind_map.redo() is None
+    assert mind_map.to_dict() == edited_dict
+    assert mind_map.node_title(added_id) == "added"
+
+    mind_map.undo()
+    mind_map.node_add(root_id)
+
+    assert mind_map.redo() is None
+
+    mind_map.node_delete(root_id)
+    mind_map.undo()
+
+    assert mind_map.root_node_id == root_id
+    assert mind_map.node_subtree_size(root_id) == 8
+
+
+def test_undo_coalescing_and_memory_limit():
+    history = xindmap.mind_map.MindMapHistory()
+    history.on_config_variable_mind_map_history_max_size_kb_set(1)
+
+    title = ""
+    for char in "typing":
+        history.record(history.TitleEntry(0, title, title + char, True))
+        title += char
+    history.checkpoint()
+    history.record(history.TitleEntry(0, title, title + "!", True))
+
+    assert history.undo_count == 2
+    assert history.undo_pop().previous_title == "typing"
+    assert history.undo_pop() == history.TitleEntry(0, "", "typing", True)
+
+    for index in range(100):
+        history.record(history.TitleEntry(index, "", "x" * 100, False))
+
+    assert history.size <= 1024
+    assert 0 < history.undo_count < 100
+    assert history.undo_pop().node_id == 99
+
+
+def test_title_edit():
+    mind_map = xindmap.mind_map.MindMap()
+    root_id = mind_map.populate_from_dict({"title": "root", "childs": []})
+    mind_map.history_clear()
+    mind_map.node_select(root_id)
+
+    events = []
+    for event_type in xindmap.mind_map.MindMapEvent:
+        mind_map.register_callbacks(
+            event_type, lambda source, event: events.append(event)
+        )
+
+    for char in "typing":
+        mind_map.add_text(char)
+    mind_map.cursor_move_to_start()
+    mind_map.remove_next_char()
+    mind_map.add_text("R")
+    mind_map.cursor_move(3)
+    mind_map.remove_last_char()
+
+    assert mind_map.node_title(root_id) == "Rootyping"
+    assert [event.type for event in events] == [
+        xindmap.mind_map.MindMapEvent.node_title_edited
+    ]
+
+    mind_map.title_edit_flush()
+    mind_map.title_edit_flush()
+
+    assert [event.type for event in events] == [
+        xindmap.mind_map.MindMapEvent.node_title_edited,
+        xindmap.mind_map.MindMapEvent.node_title_set,
+    ]
+    assert events[-1].title == "Rootyping"
+    assert events[-1].cursor == 3
+
+    mind_map.cursor_move_to_end()
+    mind_map.add_text("!")
+    mind_map.edit_end()
+
+    assert events[-1].type == xindmap.mind_map.MindMapEvent.node_title_set
+    assert events[-1].title == "Rootyping!"
+    assert events[-1].cursor is None
+    assert mind_map.node_search("rootyping") == [root_id]
+
+    assert mind_map.undo() == root_id
+    assert mind_map.node_title(root_id) == "root"
+    assert mind_map.undo() is None
+
+
+def test_title_buffer():
+    title_buffer = xindmap.mind_map.MindMapTitleBuffer(0, "gap")
+
+    title_buffer.cursor_move_to(1)
+    title_buffer.insert("x" * 40)
+
+    assert title_buffer.title() == "g" + "x" * 40 + "ap"
+    assert title_buffer.cursor == 41
+
+    title_buffer.cursor_move(100)
+
+    assert title_buffer.delete_after() is False
+    assert title_buffer.delete_before() is True
+    assert title_buffer.title() == "g" + "x" * 40 + "a"
+    assert len(title_buffer) == 42
+
+    title_buffer.cursor_move(-100)
+
+    assert title_buffer.delete_before() is False
+    assert title_buffer.cursor == 0
+
+
+def test_transaction():
+    mind_map = xindmap.mind_map.MindMap()
+    root_id = mind_map.populate_from_dict({"title": "root", "childs": [{"title": "a"}]})
+    child_id = mind_map.node_child_ids(root_id)[0]
+    mind_map.history_clear()
+
+    events = []
+    for event_type in xindmap.mind_map.MindMapEvent:
+        mind_map.register_callbacks(
+            event_type, lambda source, event: events.append(event)
+        )
+
+    with mind_map.transaction():
+        added_ids = [mind_map.node_add(root_id) for _ in range(1000)]
+
+        with mind_map.transaction():
+            mind_map.node_set_title("first", added_ids[0])
+            mind_map.node_delete(added_ids[1])
+            mind_map.node_set_title("b", child_id)
+            mind_map.node_select(added_ids[2])
+
+        assert events == []
+
+    assert [event.type for event in events] == [
+        xindmap.mind_map.MindMapEvent.changed,
+        xindmap.mind_map.MindMapEvent.node_selected,
+    ]
+    assert events[0].added_node_ids == [added_ids[0]] + added_ids[2:]
+    assert events[0].deleted_node_ids == []
+    assert events[0].title_set_node_ids == [child_id]
+
+    events.clear()
+    mind_map.undo()
+
+    assert [event.type for event in events] == [
+        xindmap.mind_map.MindMapEvent.changed,
+        xindmap.mind_map.MindMapEvent.node_unselected,
+    ]
+    assert events[0].added_node_ids == []
+    assert events[0].deleted_node_ids[-1] == added_ids[0]
+    assert len(events[0].deleted_node_ids) == 999
+    assert mind_map.to_dict() == {
+        "title": "root", "childs": [{"title": "a", "childs": []}]
+    }
+
+    mind_map.redo()
+
+    assert len(mind_map) == 1001
+    assert mind_map.node_title(added_ids[0]) == "first"
+    assert mind_map.node_title(child_id) == "b"
+
+
+def test_node_move():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    child_ids = [mind_map.node_add(root_id) for _ in range(3)]
+    grand_child_id = mind_map.node_add(child_ids[0])
+
+    mind_map.node_move(child_ids[0], child_ids[2])
+
+    assert mind_map.node_child_ids(root_id) == child_ids[1:]
+    assert mind_map.node_child_ids(child_ids[2]) == [child_ids[0]]
+    assert mind_map.node_depth(grand_child_id) == 3
+    assert mind_map.node_height(root_id) == 3
+    assert mind_map.path_to_root(grand_child_id) == [
+        grand_child_id, child_ids[0], child_ids[2], root_id
+    ]
+
+    mind_map.node_move(child_ids[2], root_id, 0)
+
+    assert mind_map.node_child_ids(root_id) == [child_ids[2], child_ids[1]]
+
+    mind_map.node_move(child_ids[2], root_id, 5)
+
+    assert mind_map.node_child_ids(root_id) == [child_ids[1], child_ids[2]]
+
+    with pytest.raises(xindmap.mind_map.MindMapError):
+        mind_map.node_move(child_ids[2], grand_child_id)
+
+    with pytest.raises(xindmap.mind_map.MindMapError):
+        mind_map.node_move(root_id, child_ids[1])
+
+    mind_map.undo()
+    mind_map.undo()
+    mind_map.undo()
+
+    assert mind_map.node_child_ids(root_id) == child_ids
+    assert mind_map.node_depth(grand_child_id) == 2
+    assert mind_map.node_height(root_id) == 2
+
+
+def test_node_move_random():
+    generator = random.Random(3)
+
+    mind_map = xindmap.mind_map.MindMap()
+    node_ids = [mind_map.node_add()]
+
+    for _ in range(300):
+        node_ids.append(mind_map.node_add(generator.choice(node_ids)))
+
+    def brute_force_path(node_id):
+        path = [node_id]
+        while mind_map.node_parent_id(path[-1]) is not None:
+            path.append(mind_map.node_parent_id(path[-1]))
+        return path
+
+    for _ in range(500):
+        node_id = generator.choice(node_ids[1:])
+        parent_id = generator.choice(node_ids)
+
+        if node_id in brute_force_path(parent_id):
+            continue
+
+        mind_map.node_move(node_id, parent_id, generator.randint(0, 3))
+
+    for node_id in node_ids:
+        path = brute_force_path(node_id)
+
+        assert mind_map.path_to_root(node_id) == path
+        assert mind_map.node_depth(node_id) == len(path) - 1
+        assert mind_map.node_subtree_size(node_id) == 1 + sum(
+            mind_map.node_subtree_size(child_id)
+            for child_id in mind_map.node_child_ids(node_id)
+        )
+        assert mind_map.node_height(node_id) == max(
+            (
+                mind_map.node_height(child_id) + 1
+                for child_id in mind_map.node_child_ids(node_id)
+            ),
+            default=0,
+        )
+
+    snapshot = mind_map.snapshot()
+
+    assert snapshot.to_dict() == mind_map.to_dict()
+
+
+def test_node_id_reuse_and_compact():
+    mind_map = xindmap.mind_map.MindMap()
+
+    root_id = mind_map.node_add()
+    child_ids = [mind_map.node_add(root_id) for _ in range(5)]
+    mind_map.node_set_title("kept", child_ids[4])
+
+    mind_map.node_delete(child_ids[3])
+    mind_map.node_delete(child_ids[1])
+
+    assert mind_map.node_add(root_id) == child_ids[1]
+    assert mind_map.node_add(root_id) == child_ids[3]
+    assert mind_map.node_add(root_id) == 6
+
+    mind_map.undo()
+    mind_map.undo()
+    mind_map.undo()
+    mind_map.undo()
+    mind_map.undo()
+
+    assert mind_map.node_child_ids(root_id) == child_ids
+
+    mind_map.redo()
+    mind_map.redo()
+    mind_map.redo()
+
+    assert mind_map.node_child_ids(root_id) == [
+        child_ids[0], child_ids[2], child_ids[4], child_ids[1]
+    ]
+
+    mind_map.node_delete(child_ids[0])
+    mind_map.node_delete(child_ids[2])
+    mind_map.node_select(child_ids[4])
+    node_dict = mind_map.to_dict()
+
+    node_id_to_new_id = mind_map.compact()
+
+    assert mind_map.to_dict() == node_dict
+    assert sorted(node_id_to_new_id.values()) == list(range(len(mind_map)))
+    assert mind_map.node_child_ids(0) == [1, 2]
+    assert mind_map.current_node_id == 1
+    assert mind_map.node_title(1) == "kept"
+    assert mind_map.node_search("kept") == [1]
+    assert mind_map.undo() is None
+
+    mind_map.clear()
+
+    assert mind_map.node_add() == 0
+
+
+def test_node_fold():
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {
+                "title": "a",
+                "childs": [
+                    {"title": "a1", "childs": [{"title": "a11", "childs": []}]},
+                    {"title": "a2", "childs": []},
+                ],
+            },
+            {"title": "b", "childs": [{"title": "b1", "childs": []}]},
+        ],
+    }
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(node_dict)
+
+    root_id = mind_map.root_node_id
+    a_id, b_id = mind_map.node_child_ids(root_id)
+    a1_id, a2_id = mind_map.node_child_ids(a_id)
+    a11_id = mind_map.node_child_ids(a1_id)[0]
+    root_hash = mind_map.node_hash(root_id)
+
+    events = []
+    for event_type in (
+        xindmap.mind_map.MindMapEvent.node_folded,
+        xindmap.mind_map.MindMapEvent.node_unfolded,
+    ):
+        mind_map.register_callbacks(
+            event_type,
+            lambda mind_map, event: events.append((event.type, event.node_ids)),
+        )
+
+    mind_map.node_select(a11_id)
+    mind_map.node_fold(a_id)
+
+    assert events == [
+        (xindmap.mind_map.MindMapEvent.node_folded, [a1_id, a11_id, a2_id])
+    ]
+    assert len(mind_map) == 4
+    assert mind_map.node_is_folded(a_id)
+    assert mind_map.node_child_ids(a_id) == []
+    assert not mind_map.node_id_exists(a1_id)
+    assert mind_map.current_node_id == a_id
+    assert mind_map.node_hash(root_id) == root_hash
+    assert mind_map.node_search("a1") == []
+    assert mind_map.to_dict() == node_dict
+    assert mind_map.snapshot().to_dict() == node_dict
+    assert list(mind_map.snapshot().node_ids(include_folded=True)) == list(range(7))
+
+    events.clear()
+
+    assert mind_map.node_unfold(a_id, 1) == [a1_id, a2_id]
+    assert events == [
+        (xindmap.mind_map.MindMapEvent.node_unfolded, [a1_id, a2_id])
+    ]
+    assert mind_map.node_is_folded(a1_id)
+    assert not mind_map.node_is_folded(a2_id)
+    assert mind_map.node_hash(root_id) == root_hash
+
+    mind_map.node_fold(root_id)
+    mind_map.node_reveal(a11_id)
+
+    assert mind_map.node_parent_id(a11_id) == a1_id
+    assert mind_map.node_is_folded(b_id)
+    assert mind_map.node_hash(root_id) == root_hash
+
+    mind_map.unfold_all()
+
+    assert len(mind_map) == 7
+    assert mind_map.node_search("a11") == [a11_id]
+    assert mind_map.to_dict() == node_dict
+
+    with pytest.raises(xindmap.mind_map.MindMapError):
+        mind_map.node_unfold(a_id, 0)
+
+
+def test_node_fold_history():
+    generator = random.Random(6)
+
+    mind_map = xindmap.mind_map.MindMap()
+    root_id = mind_map.node_add()
+
+    for index in range(60):
+        parent_id = generator.choice(list(mind_map.snapshot().node_ids()))
+        mind_map.node_set_title(str(index), mind_map.node_add(parent_id))
+
+    mind_map.history_clear()
+    node_dict = mind_map.to_dict()
+    root_hash = mind_map.node_hash(root_id)
+
+    for index in range(30):
+        node_ids = list(mind_map.snapshot().node_ids())
+        node_id = generator.choice(node_ids)
+        action = generator.random()
+
+        if action < 0.3:
+            mind_map.node_set_title(f"added {index}", mind_map.node_add(node_id))
+        elif action < 0.5 and node_id != root_id:
+            mind_map.node_delete(node_id)
+        elif action < 0.7 and node_id != root_id:
+            mind_map.node_move(node_id, root_id, 0)
+        else:
+            mind_map.node_set_title(f"edited {index}", node_id)
+
+        for folded_node_id in generator.sample(node_ids, len(node_ids) // 4):
+            if mind_map.node_id_exists(folded_node_id):
+                mind_map.node_fold(folded_node_id)
+
+    while mind_map.undo() is not None:
+        pass
+
+    assert mind_map.node_hash(root_id) == root_hash
+    assert mind_map.to_dict() == node_dict
+
+    mind_map.unfold_all()
+
+    assert mind_map.to_dict() == node_dict
+    assert mind_map.node_hash(root_id) == root_hash
+
+
+def test_node_fold_transaction_events():
+    mind_map = xindmap.mind_map.MindMap()
+    root_id = mind_map.node_add()
+    parent_id = mind_map.node_add(root_id)
+    child_id = mind_map.node_add(parent_id)
+    grandchild_id = mind_map.node_add(child_id)
+
+    with mind_map.transaction():
+        mind_map.node_delete(grandchild_id)
+        mind_map.node_set_title("parent", parent_id)
+
+    mind_map.node_fold(parent_id)
+
+    events = []
+    for event_type in (
+        xindmap.mind_map.MindMapEvent.changed,
+        xindmap.mind_map.MindMapEvent.node_unfolded,
+    ):
+        mind_map.register_callbacks(
+            event_type, lambda mind_map, event: events.append(event)
+        )
+
+    # the grandchild is added back once its parent is unfolded
+    mind_map.undo()
+
+    assert [event.type for event in events] == [
+        xindmap.mind_map.MindMapEvent.changed,
+        xindmap.mind_map.MindMapEvent.node_unfolded,
+        xindmap.mind_map.MindMapEvent.changed,
+    ]
+    assert events[0].title_set_node_ids == [parent_id]
+    assert events[1].node_ids == [child_id]
+    assert events[2].added_node_ids == [grandchild_id]
+
+
+def test_populate_from_nodes_folded():
+    nodes = [
+        (0, "root"), (1, "a"), (2, "aa"), (3, "aaa"), (2, "ab"), (1, "b"),
+        (2, "ba"), (1, "c"),
+    ]
+
+    full_mind_map = xindmap.mind_map.MindMap()
+    full_mind_map.populate_from_nodes(nodes)
+    root_hash = full_mind_map.node_hash(0)
+
+    for folded_depth in range(4):
+        mind_map = xindmap.mind_map.MindMap()
+        root_id = mind_map.populate_from_nodes(nodes, None, 2, folded_depth)
+        snapshot = mind_map.snapshot()
+
+        assert len(mind_map) == sum(depth <= folded_depth for depth, _ in nodes)
+        assert mind_map.node_hash(root_id) == root_hash
+        assert list(snapshot.nodes()) == nodes
+        assert list(snapshot.node_ids(include_folded=True)) == list(range(8))
+        assert snapshot.folded_node(3) == (
+            (2, None, None, "aaa") if folded_depth < 3 else None
+        )
+
+        mind_map.node_reveal(1)
+        mind_map.node_delete(1)
+        node_dict = mind_map.to_dict()
+        mind_map.compact()
+
+        assert list(mind_map.snapshot().node_ids(include_folded=True)) == list(
+            range(4)
+        )
+        assert mind_map.to_dict() == node_dict
+        assert mind_map.node_hash(root_id) != root_hash
+
+        mind_map.unfold_all()
+
+        assert len(mind_map) == 4
+        assert mind_map.to_dict() == node_dict
+
+
+def test_populate_from_nodes_fold_in_between():
+    nodes = [
+        (0, "root"), (1, "a"), (2, "aa"), (3, "aaa"), (2, "ab"), (1, "b"),
+        (2, "ba"), (1, "c"),
+    ]
+
+    full_mind_map = xindmap.mind_map.MindMap()
+    full_mind_map.populate_from_nodes(nodes)
+    root_hash = full_mind_map.node_hash(0)
+
+    for folded_depth in (None, 2):
+        mind_map = xindmap.mind_map.MindMap()
+
+        events = []
+        mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.subtree_added,
+            lambda source, event: events.append(event)
+        )
+
+        def nodes_folding_root():
+            is_folded = False
+
+            for node in nodes:
+                if not is_folded and len(mind_map) > 1:
+                    mind_map.node_fold(0)
+                    is_folded = True
+
+                yield node
+
+        # the nodes streamed once the root is folded go to its fold
+        root_id = mind_map.populate_from_nodes(
+            nodes_folding_root(), None, 1, folded_depth
+        )
+
+        assert root_id == 0
+        assert len(mind_map) == 1
+        assert mind_map.node_is_folded(root_id)
+        assert mind_map.node_hash(root_id) == root_hash
+        assert list(mind_map.snapshot().nodes()) == nodes
+        assert len(events) == 2
+
+        mind_map.unfold_all()
+
+        assert len(mind_map) == len(nodes)
+        assert mind_map.to_dict() == full_mind_map.to_dict()
+
+    # a node folded with its parent is not deleted
+    mind_map = xindmap.mind_map.MindMap()
+
+    def nodes_folding_a():
+        for index, node in enumerate(nodes):
+            if index == 5:
+                mind_map.node_fold(1)
+
+            yield node
+
+    assert mind_map.populate_from_nodes(nodes_folding_a(), None, 1) == 0
+    assert mind_map.node_is_folded(1)
+    assert mind_map.node_child_ids(0) == [1, 5, 7]
+    assert mind_map.node_hash(0) == root_hash
+
+
+def test_node_hash():
+    node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "a", "childs": [{"title": "aa", "childs": []}]},
+            {"title": "b", "childs": []},
+        ],
+    }
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_dict(node_dict)
+
+    other_mind_map = xindmap.mind_map.MindMap()
+    other_root_id = other_mind_map.node_add()
+    other_mind_map.node_add(other_root_id)
+    other_mind_map.node_delete(1)
+    other_mind_map.node_set_title("root", other_root_id)
+
+    other_a_id = other_mind_map.node_add(other_root_id)
+    other_mind_map.node_set_title("a", other_a_id)
+    other_b_id = other_mind_map.node_add(other_root_id)
+    other_mind_map.node_set_title("b", other_b_id)
+    other_aa_id = other_mind_map.node_add(other_a_id)
+    other_mind_map.node_set_title("aa", other_aa_id)
+
+    root_id = mind_map.root_node_id
+    root_hash = mind_map.node_hash(root_id)
+
+    assert other_mind_map.node_hash(other_root_id) == root_hash
+    assert not list(mind_map.snapshot().differences(other_mind_map.snapshot()))
+
+    a_id, b_id = mind_map.node_child_ids(root_id)
+    mind_map.node_set_title("changed", mind_map.node_child_ids(a_id)[0])
+
+    assert mind_map.node_hash(root_id) != root_hash
+    assert mind_map.node_hash(b_id) == other_mind_map.node_hash(other_b_id)
+    assert list(mind_map.snapshot().differences(other_mind_map.snapshot())) == [
+        (mind_map.node_child_ids(a_id)[0], other_aa_id)
+    ]
+
+    mind_map.node_move(b_id, root_id, 0)
+
+    assert mind_map.node_hash(root_id) != root_hash
+
+    mind_map.undo()
+    mind_map.undo()
+
+    assert mind_map.node_hash(root_id) == root_hash
+
+
+def test_diff():
+    old_mind_map = xindmap.mind_map.MindMap()
+    old_mind_map.populate_from_dict(
+        {
+            "title": "root",
+            "childs": [
+                {"title": "a", "childs": [{"title": "a1"}, {"title": "a2"}]},
+                {"title": "b", "childs": [{"title": "b1"}]},
+                {"title": "c"},
+            ],
+        }
+    )
+    new_node_dict = {
+        "title": "root",
+        "childs": [
+            {"title": "b", "childs": []},
+            {
+                "title": "a",
+                "childs": [
+                    {"title": "a2", "childs": []},
+                    {"title": "renamed", "childs": []},
+                ],
+            },
+            {"title": "c", "childs": []},
+            {"title": "d", "childs": [{"title": "d1", "childs": []}]},
+        ],
+    }
+    new_mind_map = xindmap.mind_map.MindMap()
+    new_mind_map.populate_from_dict(new_node_dict)
+
+    old_snapshot = old_mind_map.snapshot()
+    diff = xindmap.mind_map.MindMapDiff(old_snapshot, new_mind_map.snapshot())
+
+    assert not diff.is_empty
+    assert sorted(diff.lines()) == [
+        "+ root / d",
+        "- root / b / b1",
+        "> root / a / a2 -> root / a / a2",
+        "> root / b -> root / b",
+        "~ root / a / renamed (was 'a1')",
+    ]
+
+    a_id = old_mind_map.node_child_ids(old_mind_map.root_node_id)[0]
+    a1_id = old_mind_map.node_child_ids(a_id)[0]
+
+    diff.apply(old_mind_map)
+
+    assert old_mind_map.to_dict() == new_node_dict
+    assert old_mind_map.node_title(a1_id) == "renamed"
+    assert xindmap.mind_map.MindMapDiff(
+        old_mind_map.snapshot(), new_mind_map.snapshot()
+    ).is_empty
+
+    old_mind_map.undo()
+
+    assert old_mind_map.snapshot().to_dict() == old_snapshot.to_dict()
+
+
+def test_merge():
+    def mind_map_from_dict(node_dict):
+        mind_map = xindmap.mind_map.MindMap()
+        mind_map.populate_from_dict(node_dict)
+        return mind_map
+
+    base_mind_map = mind_map_from_dict(
+        {
+            "title": "root",
+            "childs": [
+                {"title": "a", "childs": [{"title": "a1"}]},
+                {"title": "b"},
+                {"title": "c"},
+            ],
+        }
+    )
+    ours_mind_map = mind_map_from_dict(
+        {
+            "title": "root",
+            "childs": [
+                {"title": "a", "childs": [{"title": "a1"}, {"title": "ours"}]},
+                {"title": "b"},
+                {"title": "c", "childs": [{"title": "c1"}]},
+            ],
+        }
+    )
+    theirs_mind_map = mind_map_from_dict(
+        {
+            "title": "root",
+            "childs": [
+                {
+                    "title": "b",
+                    "childs": [
+                        {"title": "a", "childs": [{"title": "A1"}]},
+                        {"title": "theirs"},
+                    ],
+                },
+            ],
+        }
+    )
+
+    merge = xindmap.mind_map.MindMapMerge(
+        base_mind_map.snapshot(), ours_mind_map.snapshot(), theirs_mind_map.snapshot()
+    )
+
+    assert merge.conflicts == [
+        "root / c / c1: placed under a node deleted in the other side, deleted"
+    ]
+
+    merged_node_dict = {
+        "title": "root",
+        "childs": [
+            {
+                "title": "b",
+                "childs": [
+                    {
+                        "title": "a",
+                        "childs": [
+                            {"title": "A1", "childs": []},
+                            {"title": "ours", "childs": []},
+                        ],
+                    },
+                    {"title": "theirs", "childs": []},
+                ],
+            },
+        ],
+    }
+
+    assert merge.snapshot.to_dict() == merged_node_dict
+
+    a_id = ours_mind_map.node_child_ids(ours_mind_map.root_node_id)[0]
+
+    merge.apply(ours_mind_map)
+
+    assert ours_mind_map.to_dict() == merged_node_dict
+    assert ours_mind_map.node_title(ours_mind_map.node_child_ids(a_id)[1]) == "ours"
@@ -21,6 +21,7 @@ Each submodules has its own documentation.
 - [xindmap.config][]
 - [xindmap.controller][]
 - [xindmap.event][]
+- [xindmap.file][]
 - [xindmap.input][]
 - [xindmap.plugin][]
 - [xindmap.state][]
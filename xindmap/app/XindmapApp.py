@@ -1,7 +1,7 @@
 import logging
-import json
 import pathlib
 import shlex
+import threading
 
 import customtkinter as ctk
 
@@ -9,6 +9,7 @@ import xindmap.command
 import xindmap.config
 import xindmap.controller
 import xindmap.editable
+import xindmap.file
 import xindmap.input
 import xindmap.mind_map
 import xindmap.plugin
@@ -73,6 +74,37 @@ class XindmapApp:
     All [inputs][xindmap.input.Input.Input] passed through this queue
     to be later treated by the (`input controller`)[#input-controller].
 
+    ### Mind map autosaver
+
+    The mind map autosaver is an instance of
+    [`MindMapAutosaver`][xindmap.file.MindMapAutosaver.MindMapAutosaver] class.
+    It saves the mind map in the background to the file it was last loaded
+    from or saved to once it changed.
+
+    ### Mind map change tracker
+
+    The mind map change tracker is an instance of
+    [`MindMapChangeTracker`][xindmap.mind_map.MindMapChangeTracker.MindMapChangeTracker]
+    class.
+    It tracks the nodes changed since the mind map was last saved to its
+    [database][xindmap.file.MindMapDatabase.MindMapDatabase], if any, so that
+    only their rows are written.
+
+    ### Mind map journal
+
+    The mind map journal is an instance of
+    [`MindMapJournal`][xindmap.file.MindMapJournal.MindMapJournal] class.
+    It journals the changes made to the mind map since it was last loaded from
+    or saved to its file, the journal being replayed when the file is loaded
+    again after the application stopped without saving.
+
+    ### Mind map loader
+
+    The mind map loader is an instance of
+    [`MindMapLoader`][xindmap.file.MindMapLoader.MindMapLoader] class.
+    It loads the mind map in the background, the first levels first, so that
+    the application stays responsive while a large file is loaded.
+
     ### Plugin importer
 
     The plugin importer is an instance of
@@ -166,6 +198,11 @@ class XindmapApp:
         - configure: dispatched upon reconfiguration of the window (size, position,
           ...).
         - key: dispatched when the user press a key on the keyboard.
+    - [mind map loader](#mind-map-loader)
+        - [ended][xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent.ended]:
+          dispatched when a load ends.
+        - [progressed][xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent.progressed]:
+          dispatched when more nodes are loaded.
     - [state holder](#state-holder)
         - [state set][xindmap.state.StateHolderEvent.StateHolderEvent.state_set]:
           dispatched when the state of the application is set to a new value.
@@ -195,9 +232,15 @@ class XindmapApp:
 
         input_stack_viewer(["input stack viewer"])
 
+        mind_map_loader(["mind map loader"])
+        ended{{"ended"}}
+        progressed{{"progressed"}}
+
         state_holder(["state holder"])
         state_set{{"state set"}}
 
+        state_viewer(["state viewer"])
+
         xindmap_app(["xindmap app"])
 
         command_call_queue --> call_dequeued
@@ -223,6 +266,13 @@ class XindmapApp:
         stack_cleared --> command_controller
         stack_cleared --> input_stack_viewer
 
+        mind_map_loader --> ended
+        ended --> state_viewer
+
+        mind_map_loader --> progressed
+        progressed --> state_viewer
+        progressed --> xindmap_app
+
         state_holder --> state_set
         state_set --> command_controller
     ```
@@ -256,11 +306,32 @@ class XindmapApp:
             it.
             It is specified upon instantiating this object.
             It is expected to be derived from [`pathlib.Path`][] class.
+        __file_load_path:
+            The path of the file being loaded, [`None`][] if none.
+            The mind map can not be saved to it meanwhile.
+        __file_load_thread:
+            The thread of the last load command, [`None`][] if none.
+        __file_content_hash:
+            The [hash][xindmap.mind_map.MindMap.MindMap.node_hash] of the mind
+            map as in the file it was last loaded from or saved to, [`None`][]
+            if empty.
+        __file_save_lock:
+            Reentrant lock preventing the save command and the autosave from
+            saving at the same time, held while a load binds the mind map to
+            its file.
         __input_controller: [input controller](#input-controller)
         __input_mapping_tree: [input mapping tree](#input-mapping-tree)
         __input_stack: [input stack](#input-stack)
         __input_stack_viewer: [input stack viewer](#input-stack-viewer)
         __main_window: [main window](#main-window)
+        __mind_map_autosaver: [mind map autosaver](#mind-map-autosaver)
+        __mind_map_change_tracker:
+            [mind map change tracker](#mind-map-change-tracker)
+        __mind_map_database:
+            The [database][xindmap.file.MindMapDatabase.MindMapDatabase] the
+            mind map was last loaded from or saved to, [`None`][] if none.
+        __mind_map_journal: [mind map journal](#mind-map-journal)
+        __mind_map_loader: [mind map loader](#mind-map-loader)
         __plugin_importer: [plugin importer](#plugin-importer)
         __previous_height:
             Holds the last observed main window height.
@@ -308,25 +379,79 @@ class XindmapApp:
             self.__command_controller.on_input_stack_stack_cleared,
             self.__input_stack_viewer.on_input_stack_stack_cleared,
         )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.changed,
+            self.__mind_map_autosaver.on_mind_map_changed,
+            self.__mind_map_change_tracker.on_mind_map_changed,
+            self.__mind_map_journal.on_mind_map_changed,
+            self.__mind_map_viewer.on_mind_map_changed,
+        )
         self.__mind_map.register_callbacks(
             xindmap.mind_map.MindMapEvent.cleared,
-            self.__mind_map_viewer.on_mind_map_cleared
+            self.__mind_map_autosaver.on_mind_map_cleared,
+            self.__mind_map_change_tracker.on_mind_map_cleared,
+            self.__mind_map_journal.on_mind_map_cleared,
+            self.__mind_map_viewer.on_mind_map_cleared,
         )
         self.__mind_map.register_callbacks(
             xindmap.mind_map.MindMapEvent.node_added,
-            self.__mind_map_viewer.on_mind_map_node_added
+            self.__mind_map_autosaver.on_mind_map_node_added,
+            self.__mind_map_change_tracker.on_mind_map_node_added,
+            self.__mind_map_journal.on_mind_map_node_added,
+            self.__mind_map_viewer.on_mind_map_node_added,
         )
         self.__mind_map.register_callbacks(
             xindmap.mind_map.MindMapEvent.node_deleted,
-            self.__mind_map_viewer.on_mind_map_node_deleted
+            self.__mind_map_autosaver.on_mind_map_node_deleted,
+            self.__mind_map_change_tracker.on_mind_map_node_deleted,
+            self.__mind_map_journal.on_mind_map_node_deleted,
+            self.__mind_map_viewer.on_mind_map_node_deleted,
+        )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.node_folded,
+            self.__mind_map_viewer.on_mind_map_node_folded,
+        )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.node_moved,
+            self.__mind_map_autosaver.on_mind_map_node_moved,
+            self.__mind_map_change_tracker.on_mind_map_node_moved,
+            self.__mind_map_journal.on_mind_map_node_moved,
+            self.__mind_map_viewer.on_mind_map_node_moved,
         )
         self.__mind_map.register_callbacks(
             xindmap.mind_map.MindMapEvent.node_selected,
             self.__mind_map_viewer.on_mind_map_node_selected
         )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.node_title_edited,
+            self.on_mind_map_node_title_edited
+        )
         self.__mind_map.register_callbacks(
             xindmap.mind_map.MindMapEvent.node_title_set,
-            self.__mind_map_viewer.on_mind_map_node_title_set
+            self.__mind_map_autosaver.on_mind_map_node_title_set,
+            self.__mind_map_change_tracker.on_mind_map_node_title_set,
+            self.__mind_map_journal.on_mind_map_node_title_set,
+            self.__mind_map_viewer.on_mind_map_node_title_set,
+        )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.node_unfolded,
+            self.__mind_map_viewer.on_mind_map_node_unfolded,
+        )
+        self.__mind_map.register_callbacks(
+            xindmap.mind_map.MindMapEvent.subtree_added,
+            self.__mind_map_autosaver.on_mind_map_subtree_added,
+            self.__mind_map_change_tracker.on_mind_map_subtree_added,
+            self.__mind_map_journal.on_mind_map_subtree_added,
+            self.__mind_map_viewer.on_mind_map_subtree_added,
+        )
+        self.__mind_map_loader.register_callbacks(
+            xindmap.file.MindMapLoaderEvent.ended,
+            self.__state_viewer.on_mind_map_loader_ended,
+        )
+        self.__mind_map_loader.register_callbacks(
+            xindmap.file.MindMapLoaderEvent.progressed,
+            self.__state_viewer.on_mind_map_loader_progressed,
+            self.on_mind_map_loader_progressed,
         )
         self.__state_holder.register_callbacks(
             xindmap.state.StateHolderEvent.state_set,
@@ -361,7 +486,60 @@ class XindmapApp:
 
             self.__place_widget()
 
+    def on_mind_map_loader_progressed(self, mind_map_loader, event):
+        """Callback to be called upon the
+        [mind map loader](#mind-map-loader) progressing.
+
+        It selects the root of the mind map and centers the view on it as soon
+        as the root is loaded, so that the mind map is navigated while its
+        deeper levels are loaded.
+
+        Args:
+            mind_map_loader: The mind map loader.
+            event: The event for which this callback is called.
+        """
+        self.__file_load_root_select(self.__command_api)
+
+    def on_mind_map_node_title_edited(self, mind_map, event):
+        """Callback to be called upon the title of a node of the mind map being
+        edited since its last flush.
+
+        It schedules a flush of the edited title after
+        [`mind_map_title_event_interval_ms`][xindmap.config.Variables.Variables.mind_map_title_event_interval_ms]
+        so that keystrokes typed in between produce a single title event.
+
+        Args:
+            mind_map: The mind map in which a title is edited.
+            event: The event for which this callback is called.
+        """
+        interval_ms = xindmap.config.Config().get(
+            xindmap.config.Variables.mind_map_title_event_interval_ms
+        )
+
+        self.__main_window.after(interval_ms, mind_map.title_edit_flush)
+
     # command ******************************************************************
+    def __command_diff(self, file_path, api):
+        """Logs the differences between the mind map and a file."""
+        snapshot = self.__file_snapshot(pathlib.Path(file_path))
+
+        self.__mind_map.title_edit_flush()
+        mind_map_snapshot = self.__mind_map.snapshot()
+
+        # the folded subtrees are compared as well, unfolded in a copy
+        if mind_map_snapshot.root_node_id is not None:
+            mind_map = xindmap.mind_map.MindMap()
+            mind_map.populate_from_nodes(mind_map_snapshot.nodes())
+            mind_map_snapshot = mind_map.snapshot()
+
+        diff = xindmap.mind_map.MindMapDiff(mind_map_snapshot, snapshot)
+
+        for line in diff.lines():
+            logging.info(line)
+
+        if diff.is_empty:
+            logging.info(f'no difference with "{file_path}"')
+
     def __command_import(self, plugin_name, api):
         """Imports a plugin and registers its commands.
 
@@ -383,22 +561,72 @@ class XindmapApp:
         logging.info(f'imported plugin "{plugin_name}"')
 
     def __command_load(self, file_path, api):
-        self.__mind_map.clear()
+        # a load still running is cancelled first, the loads then run in the
+        # background one at a time
+        self.__mind_map_loader.cancel()
 
+        if self.__file_load_thread is not None:
+            self.__file_load_thread.join()
+
+        file_path = pathlib.Path(file_path)
+        if not file_path.is_file():
+            raise ValueError(f"not a file \"{file_path}\"")
+
+        self.__file_load_thread = threading.Thread(
+            target=self.__file_load, args=(file_path, api), daemon=True
+        )
+        self.__file_load_thread.start()
+
+    def __command_load_subtree(self, file_path, *titles, api):
+        """Adds a subtree of a file under the current node, or as the mind map
+        if it is empty.
+
+        The subtree is the one of the node reached from the root of the file
+        by titles, each node being the first child of the previous one with
+        the given title, the whole file if none is given.
+        The file is only partially read if it has an up to date
+        [index][xindmap.file.MindMapIndex.MindMapIndex].
+        """
         file_path = pathlib.Path(file_path)
         if not file_path.is_file():
             raise ValueError(f"not a file \"{file_path}\"")
 
-        with file_path.open("r") as file:
-            node_dict = json.load(file)
-        
-        api.populate_from_dict(node_dict, True)
-        api.select_node(self.__mind_map.root_node_id)
-        api.center_view(self.__mind_map.root_node_id)
+        if file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+            raise ValueError(f"can not load a subtree of a database")
 
-        self.__last_file_path = file_path
+        nodes = xindmap.file.MindMapFile(file_path).subtree_nodes(list(titles))
+
+        self.__mind_map.title_edit_flush()
+        self.__mind_map.populate_from_nodes(nodes)
+
+        logging.info(f'loaded subtree of "{file_path}"')
+
+    def __command_merge(self, base_file_path, theirs_file_path, api):
+        """Merges into the mind map the changes made to a base file in another
+        file, as one change.
+        """
+        base_snapshot = self.__file_snapshot(pathlib.Path(base_file_path))
+        theirs_snapshot = self.__file_snapshot(pathlib.Path(theirs_file_path))
+
+        self.__mind_map.title_edit_flush()
+
+        # changes may apply to any node
+        self.__mind_map.unfold_all()
+
+        # the mind map is not changed meanwhile
+        with self.__mind_map.transaction():
+            merge = xindmap.mind_map.MindMapMerge(
+                base_snapshot, self.__mind_map.snapshot(), theirs_snapshot
+            )
+            merge.apply(self.__mind_map)
+
+        for conflict in merge.conflicts:
+            logging.warning(f"merge conflict: {conflict}")
 
     def __command_quit(self, api):
+        self.__mind_map_loader.cancel()
+        self.__mind_map_autosaver.stop()
+        self.__mind_map_journal.stop()
         self.__main_window.quit()
         exit(0)
 
@@ -409,11 +637,8 @@ class XindmapApp:
         if file_path is None:
             raise ValueError(f"can not save as no file was given")
 
-        file_path = pathlib.Path(file_path)
-        root_dict = api.to_dict()
-
-        with file_path.open("w") as file:
-            json.dump(root_dict, file, indent=2)
+        self.__mind_map.title_edit_flush()
+        self.__file_save(pathlib.Path(file_path))
 
     # constructor **************************************************************
     def __init__(self, init_file_path):
@@ -439,6 +664,10 @@ class XindmapApp:
         self.__previous_width = None
 
         self.__last_file_path = None
+        self.__file_content_hash = None
+        self.__file_load_path = None
+        self.__file_load_thread = None
+        self.__file_save_lock = threading.RLock()
 
         # model ******************************************************
         self.__plugin_importer = xindmap.plugin.PluginImporter()
@@ -449,6 +678,11 @@ class XindmapApp:
         self.__input_mapping_tree = xindmap.input.InputMappingTree()
         self.__input_stack = xindmap.input.InputStack()
         self.__mind_map = xindmap.mind_map.MindMap()
+        self.__mind_map_autosaver = xindmap.file.MindMapAutosaver(self.__autosave)
+        self.__mind_map_change_tracker = xindmap.mind_map.MindMapChangeTracker()
+        self.__mind_map_database = None
+        self.__mind_map_journal = xindmap.file.MindMapJournal()
+        self.__mind_map_loader = xindmap.file.MindMapLoader()
         self.__state_holder = xindmap.state.StateHolder()
 
         # controller ************************************************
@@ -480,6 +714,261 @@ class XindmapApp:
             self.__command_api, self.__command_register
         )
 
+    # file *********************************************************************
+    def __autosave(self):
+        """Saves the mind map to the file it was last loaded from or saved to,
+        called from the worker thread of the
+        [mind map autosaver](#mind-map-autosaver).
+        """
+        file_path = self.__last_file_path
+
+        if file_path is not None:
+            self.__file_save(file_path)
+
+    @staticmethod
+    def __content_hash(snapshot):
+        """Returns the hash of the content of a mind map snapshot,
+        [`None`][] if empty.
+        """
+        if snapshot.root_node_id is None:
+            return None
+
+        return snapshot.node_hash(snapshot.root_node_id)
+
+    def __database_save(self, file_path):
+        """Saves the mind map to a database, only writing the changed nodes if
+        it is the database of the mind map.
+
+        Returns:
+            The [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot]
+            of the saved mind map.
+        """
+        is_same_database = (
+            self.__mind_map_database is not None
+            and self.__mind_map_database.file_path == file_path
+        )
+
+        if not is_same_database:
+            # the database being loaded is read until the end of the load
+            if (
+                self.__file_load_path is not None
+                and self.__file_load_path.suffix == xindmap.file.MindMapDatabase.suffix
+            ):
+                raise ValueError(f"can not save to a database while loading one")
+
+            self.__mind_map_database_set(xindmap.file.MindMapDatabase(file_path))
+
+        # changes are taken before the snapshot so that none is missed
+        is_cleared, node_ids = self.__mind_map_change_tracker.changes_take()
+        snapshot = self.__mind_map.snapshot()
+
+        try:
+            if is_cleared or not is_same_database:
+                self.__mind_map_database.save(snapshot)
+            else:
+                self.__mind_map_database.save(snapshot, node_ids)
+        except Exception:
+            self.__mind_map_change_tracker.changes_put_back(is_cleared, node_ids)
+            raise
+
+        return snapshot
+
+    def __file_load(self, file_path, api):
+        """Loads the mind map from a file, in the thread of the load command
+        with the [mind map loader](#mind-map-loader).
+
+        The mind map is bound to its file once fully loaded.
+        It can be navigated and edited meanwhile, but not saved to its file.
+        Edits made while loading are saved to the file right away, the changes
+        journaled before the application stopped, which no longer apply to
+        the mind map, not being replayed.
+        """
+        file_stat = file_path.stat()
+
+        # the former mind map is unbound first so that it is not saved over its
+        # file once cleared
+        with self.__file_save_lock:
+            self.__mind_map_journal.close()
+            self.__last_file_path = None
+            self.__file_load_path = file_path
+            self.__mind_map.clear()
+
+            if file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+                self.__mind_map_database_set(xindmap.file.MindMapDatabase(file_path))
+
+                # loaded nodes get their index in pre order as id
+                self.__mind_map_database.compact()
+                nodes = self.__mind_map_database.nodes()
+            else:
+                nodes = xindmap.file.MindMapFile(file_path).nodes()
+
+        edit_count = self.__mind_map.edit_count
+        is_complete = False
+
+        try:
+            is_complete = self.__mind_map_loader.load(self.__mind_map, nodes)
+        finally:
+            # a partly loaded mind map is not bound to its file
+            if not is_complete:
+                with self.__file_save_lock:
+                    self.__file_load_path = None
+
+                self.__file_load_root_select(api)
+
+        if not is_complete:
+            return
+
+        # the changes recorded while loading are the ones of the load
+        with self.__file_save_lock, self.__mind_map_autosaver.paused():
+            self.__file_load_path = None
+
+            self.__mind_map.title_edit_flush()
+            is_edited = self.__mind_map.edit_count != edit_count
+            snapshot = self.__mind_map.snapshot()
+
+            if is_edited:
+                # ids no longer match the rows of a database
+                self.__mind_map_change_tracker.changes_put_back(True, ())
+                self.__file_content_hash = None
+            else:
+                self.__mind_map_change_tracker.clear()
+                self.__file_content_hash = XindmapApp.__content_hash(snapshot)
+
+                # changes not saved before the application stopped are
+                # replayed and saved, which compacts the journal
+                is_edited = xindmap.file.MindMapJournal.replay(
+                    file_path, self.__mind_map, file_stat
+                ) > 0
+
+                self.__mind_map.history_clear()
+
+            self.__last_file_path = file_path
+
+            if not is_edited:
+                self.__mind_map_journal.open(
+                    file_path, snapshot.node_ids(include_folded=True)
+                )
+
+                # edits made before the journal is opened are not journaled
+                is_edited = self.__mind_map.edit_count != edit_count
+
+            if is_edited:
+                self.__file_save(file_path)
+
+        self.__file_load_root_select(api)
+
+    def __file_load_root_select(self, api):
+        """Selects the root of the mind map being loaded and centers the view
+        on it, unless a node is already selected.
+        """
+        root_node_id = self.__mind_map.root_node_id
+
+        if root_node_id is not None and self.__mind_map.current_node_id is None:
+            api.select_node(root_node_id)
+            api.center_view(root_node_id)
+
+    def __file_save(self, file_path):
+        """Saves the mind map to a file, from either the save command or the
+        autosave.
+
+        Saving the mind map to the file it was last loaded from or saved to
+        compacts its [journal](#mind-map-journal).
+        The file is not written again if the content of the mind map did not
+        change since, as told by the hash of its root node, such as after
+        changes undone.
+        A mind map bound to no file yet, such as a new one, is bound to the
+        file it is saved to, which it is then autosaved to and journaled over,
+        unless a file is being loaded.
+        """
+        with self.__file_save_lock:
+            if file_path == self.__file_load_path:
+                raise ValueError(f"can not save to \"{file_path}\" while loading it")
+
+            is_autosaved_file = file_path == self.__last_file_path
+            is_bound = self.__last_file_path is None and self.__file_load_path is None
+
+            is_unchanged = False
+
+            if is_autosaved_file or is_bound:
+                self.__mind_map_autosaver.clear()
+                self.__mind_map_journal.hold()
+
+            if is_autosaved_file:
+                root_node_id = self.__mind_map.root_node_id
+                content_hash = (
+                    self.__mind_map.node_hash(root_node_id)
+                    if root_node_id is not None
+                    else None
+                )
+                is_unchanged = content_hash == self.__file_content_hash
+
+            try:
+                if is_unchanged:
+                    # the change tracker keeps the changed node ids for the
+                    # next save of a database
+                    snapshot = self.__mind_map.snapshot()
+                elif file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+                    snapshot = self.__database_save(file_path)
+                else:
+                    indent = xindmap.config.Config().get(
+                        xindmap.config.Variables.file_save_json_indent
+                    )
+                    if indent < 0:
+                        indent = None
+
+                    compression_level = xindmap.config.Config().get(
+                        xindmap.config.Variables.file_save_compression_level
+                    )
+                    index_depth = xindmap.config.Config().get(
+                        xindmap.config.Variables.file_save_index_depth
+                    )
+
+                    snapshot = self.__mind_map.snapshot()
+
+                    mind_map_file = xindmap.file.MindMapFile(file_path)
+                    mind_map_file.write(
+                        snapshot.nodes(), indent, compression_level, index_depth
+                    )
+            except Exception:
+                if is_autosaved_file or is_bound:
+                    self.__mind_map_autosaver.change_record()
+                    self.__mind_map_journal.release()
+
+                raise
+
+            if is_autosaved_file or is_bound:
+                self.__last_file_path = file_path
+                self.__file_content_hash = XindmapApp.__content_hash(snapshot)
+                self.__mind_map_journal.open(
+                    file_path, snapshot.node_ids(include_folded=True)
+                )
+
+    def __file_snapshot(self, file_path):
+        """Reads a file into a
+        [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot], leaving
+        the mind map as is.
+        """
+        if not file_path.is_file():
+            raise ValueError(f"not a file \"{file_path}\"")
+
+        if file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+            mind_map_database = xindmap.file.MindMapDatabase(file_path)
+            nodes = list(mind_map_database.nodes())
+            mind_map_database.close()
+        else:
+            nodes = xindmap.file.MindMapFile(file_path).nodes()
+
+        mind_map = xindmap.mind_map.MindMap()
+        mind_map.populate_from_nodes(nodes, None)
+
+        return mind_map.snapshot()
+
+    def __mind_map_database_set(self, mind_map_database):
+        if self.__mind_map_database is not None:
+            self.__mind_map_database.close()
+
+        self.__mind_map_database = mind_map_database
+
     # initialize ***************************************************************
     def init(self):
         """Initializes this application.
@@ -498,7 +987,12 @@ class XindmapApp:
         self.__command_register.register_command("quit", self.__command_quit)
         self.__command_register.register_command("q", self.__command_quit)
         self.__command_register.register_command("load", self.__command_load)
+        self.__command_register.register_command(
+            "load_subtree", self.__command_load_subtree
+        )
         self.__command_register.register_command("save", self.__command_save)
+        self.__command_register.register_command("diff", self.__command_diff)
+        self.__command_register.register_command("merge", self.__command_merge)
 
         self.__read_init_file()
 
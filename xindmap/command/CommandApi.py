@@ -9,6 +9,16 @@ class CommandApi:
             [input mapping tree][xindmap.input.InputMappingTree.InputMappingTree]
             used to register mapping.
     """
+    # ancestor *****************************************************************
+    def is_ancestor(self, ancestor_id, node_id=None):
+        return self.__mind_map.is_ancestor(ancestor_id, node_id)
+
+    def lowest_common_ancestor(self, node_a_id, node_b_id):
+        return self.__mind_map.lowest_common_ancestor(node_a_id, node_b_id)
+
+    def path_to_root(self, node_id=None):
+        return self.__mind_map.path_to_root(node_id)
+
     # constructor **************************************************************
     def __init__(self, input_mapping_tree, mind_map, mind_map_viewer, state_holder):
         """Instantiates this api.
@@ -23,6 +33,19 @@ class CommandApi:
         self.__mind_map_viewer = mind_map_viewer
         self.__state_holder = state_holder
 
+    # history ******************************************************************
+    def redo(self, wait=False):
+        node_id = self.__mind_map.redo()
+        if wait:
+            self.__wait()
+        return node_id
+
+    def undo(self, wait=False):
+        node_id = self.__mind_map.undo()
+        if wait:
+            self.__wait()
+        return node_id
+
     # mapping ******************************************************************
     def map(self, inputs, mapped_inputs):
         """Maps a list of [inputs][xindmap.input.Input.Input] to another one.
@@ -34,11 +57,25 @@ class CommandApi:
         self.__input_mapping_tree.add_mapping(inputs, mapped_inputs)
 
     # mind map *****************************************************************
+    def compact(self, wait=False):
+        node_id_to_new_id = self.__mind_map.compact()
+        if wait:
+            self.__wait()
+        return node_id_to_new_id
+
     def populate_from_dict(self, node_dict, wait=False):
         self.__mind_map.populate_from_dict(node_dict)
         if wait:
             self.__wait()
             
+    def populate_from_nodes(self, nodes, chunk_size=None, wait=False):
+        self.__mind_map.populate_from_nodes(nodes, None, chunk_size)
+        if wait:
+            self.__wait()
+
+    def snapshot(self):
+        return self.__mind_map.snapshot()
+
     def to_dict(self):
         return self.__mind_map.to_dict()
 
@@ -60,9 +97,45 @@ class CommandApi:
         if wait:
             self.__wait()
 
+    def first_child_node(self, parent_id=None):
+        return self.__mind_map.node_first_child_id(parent_id)
+
+    def fold_node(self, node_id=None, wait=False):
+        self.__mind_map.node_fold(node_id)
+        if wait:
+            self.__wait()
+
+    def last_child_node(self, parent_id=None):
+        return self.__mind_map.node_last_child_id(parent_id)
+
+    def move_node(self, node_id, parent_id, position=None, wait=False):
+        self.__mind_map.node_move(node_id, parent_id, position)
+        if wait:
+            self.__wait()
+
+    def move_node_after(self, node_id, parent_id, previous_sibling_id=None, wait=False):
+        self.__mind_map.node_move_after(node_id, parent_id, previous_sibling_id)
+        if wait:
+            self.__wait()
+
+    def next_sibling_node(self, node_id=None):
+        return self.__mind_map.node_next_sibling_id(node_id)
+
+    def node_exists(self, node_id):
+        return self.__mind_map.node_id_exists(node_id)
+
+    def node_is_folded(self, node_id=None):
+        return self.__mind_map.node_is_folded(node_id)
+
+    def node_title(self, node_id=None):
+        return self.__mind_map.node_title(node_id)
+
     def parent_node(self, node_id=None):
         return self.__mind_map.node_parent_id(node_id)
 
+    def previous_sibling_node(self, node_id=None):
+        return self.__mind_map.node_previous_sibling_id(node_id)
+
     def root_node(self):
         return self.__mind_map.root_node_id
 
@@ -71,12 +144,39 @@ class CommandApi:
         if wait:
             self.__wait()
 
+    def unfold_node(self, node_id=None, levels=None, wait=False):
+        node_ids = self.__mind_map.node_unfold(node_id, levels)
+        if wait:
+            self.__wait()
+        return node_ids
+
+    # node aggregate ***********************************************************
+    def node_depth(self, node_id=None):
+        return self.__mind_map.node_depth(node_id)
+
+    def node_height(self, node_id=None):
+        return self.__mind_map.node_height(node_id)
+
+    def node_subtree_size(self, node_id=None):
+        return self.__mind_map.node_subtree_size(node_id)
+
+    # search *******************************************************************
+    def search_nodes(self, query, limit=None):
+        return self.__mind_map.node_search(query, limit)
+
     # state ********************************************************************
     def set_state(self, state, wait=False):
         self.__state_holder.set_state(state)
         if wait:
             self.__wait()
 
+    # transaction **************************************************************
+    def transaction(self):
+        """Returns a context manager grouping the edits made within it, see
+        [`MindMap.transaction`][xindmap.mind_map.MindMap.MindMap.transaction].
+        """
+        return self.__mind_map.transaction()
+
     # view *********************************************************************
     def center_view(self, node_id, wait=False):
         self.__mind_map_viewer.view_center_on_node(node_id)
@@ -8,12 +8,54 @@ class Variables(enum.Enum):
     """Statically declared list of all variables that can be set through the
     [config][xindmap.config.Config.Config].
     """
+    autosave_debounce_s = Variable(VariableTypes.float, 2)
+    """The delay (in seconds) without change after which the
+    [mind map][xindmap.mind_map.MindMap.MindMap] is saved in the background to
+    the file it was last loaded from or saved to.
+    """
+    autosave_interval_s = Variable(VariableTypes.float, 30)
+    """The maximum delay (in seconds) between a change of the
+    [mind map][xindmap.mind_map.MindMap.MindMap] and its saving in the
+    background, autosave being disabled if not positive.
+    """
     command_controller_mapping_delay_s = Variable(VariableTypes.float, 1)
     """The delay (in seconds) used by
     [command controller][xindmap.controller.CommandController.CommandController]
     when having to decide wether accepting a mapping or wait for the user to
     finish the mapping.
     """
+    file_load_chunk_interval_ms = Variable(VariableTypes.int, 5)
+    """The delay between two chunks of nodes added to the
+    [mind map][xindmap.mind_map.MindMap.MindMap] when loading it in the
+    background, leaving it to the user meanwhile.
+    """
+    file_load_chunk_size = Variable(VariableTypes.int, 1024)
+    """The number of nodes added at once to the
+    [mind map][xindmap.mind_map.MindMap.MindMap] when loading it in the
+    background.
+    """
+    file_load_first_levels = Variable(VariableTypes.int, 3)
+    """The number of levels of a mind map added at once when loading it, the
+    deeper ones being added in the background.
+    """
+    file_load_unfolded_levels = Variable(VariableTypes.int, 0)
+    """The number of levels of a mind map unfolded when loading it, the deeper
+    ones being folded until unfolded on demand, `0` to unfold all of them.
+    """
+    file_save_compression_level = Variable(VariableTypes.int, 6)
+    """The compression level, from 1 for the fastest to 9 for the smallest, of
+    the compressed JSON files saved, such as `.json.gz` files.
+    """
+    file_save_index_depth = Variable(VariableTypes.int, 1)
+    """The number of levels below the root of the
+    [index][xindmap.file.MindMapIndex.MindMapIndex] saved along plain JSON
+    files, from which their subtrees are loaded without reading them whole,
+    `0` for no index.
+    """
+    file_save_json_indent = Variable(VariableTypes.int, 2)
+    """The number of spaces per indentation level of the JSON files saved, a
+    negative value writing them on a single line.
+    """
     input_stack_input_pushed_event_priority = Variable(VariableTypes.int, 20)
     """The priority to which [event][xindmap.event.Event.Event]
     [input pushed][xindmap.input.InputStack.InputStack--input-pushed]
@@ -23,6 +65,22 @@ class Variables(enum.Enum):
     """The height (in pixel) of 
     [input stack viewer][xindmap.widget.InputStackViewer.InputStackViewer].
     """
+    journal_sync_interval_ms = Variable(VariableTypes.int, 200)
+    """The minimum delay between two syncs of the
+    [journal][xindmap.file.MindMapJournal.MindMapJournal] to disk, the changes
+    made meanwhile being synced together.
+    """
+    mind_map_history_max_size_kb = Variable(VariableTypes.int, 65536)
+    """The maximum size (in kilobytes) of the edits kept by the
+    [history][xindmap.mind_map.MindMapHistory.MindMapHistory] of the
+    [mind map][xindmap.mind_map.MindMap.MindMap] to be undone, the oldest edits
+    being forgotten first.
+    """
+    mind_map_title_event_interval_ms = Variable(VariableTypes.int, 16)
+    """The delay (in milliseconds) during which the keystrokes editing the title
+    of a node of the [mind map][xindmap.mind_map.MindMap.MindMap] are gathered
+    before the title is flushed, bounding title events to one per frame.
+    """
     mind_map_viewer_node_height = Variable(VariableTypes.int, 20)
     mind_map_viewer_node_margin_x = Variable(VariableTypes.int, 30)
     mind_map_viewer_node_margin_y = Variable(VariableTypes.int, 30)
@@ -22,9 +22,28 @@ class EditController:
 
         if input.type == xindmap.input.InputType.escape:
             self.__state_holder.set_state(xindmap.state.State.command)
-        if input.type == xindmap.input.InputType.backspace and self.__editable is not None:
+
+            if self.__editable is not None:
+                self.__editable.edit_end()
+
+            return
+
+        if self.__editable is None:
+            return
+
+        if input.type == xindmap.input.InputType.backspace:
             self.__editable.remove_last_char()
-        elif self.__editable is not None:
+        elif input.type == xindmap.input.InputType.delete:
+            self.__editable.remove_next_char()
+        elif input.type == xindmap.input.InputType.end:
+            self.__editable.cursor_move_to_end()
+        elif input.type == xindmap.input.InputType.home:
+            self.__editable.cursor_move_to_start()
+        elif input.type == xindmap.input.InputType.left:
+            self.__editable.cursor_move(-1)
+        elif input.type == xindmap.input.InputType.right:
+            self.__editable.cursor_move(1)
+        else:
             self.__editable.add_text(text)
 
     def on_state_holder_state_set(self, state_hoder, event):
@@ -29,6 +29,16 @@ class InputController:
             input = xindmap.input.Input(xindmap.input.InputType.backspace)
         elif event.keysym == "Return":
             input = xindmap.input.Input(xindmap.input.InputType.enter)
+        elif event.keysym == "Delete":
+            input = xindmap.input.Input(xindmap.input.InputType.delete)
+        elif event.keysym == "End":
+            input = xindmap.input.Input(xindmap.input.InputType.end)
+        elif event.keysym == "Home":
+            input = xindmap.input.Input(xindmap.input.InputType.home)
+        elif event.keysym == "Left":
+            input = xindmap.input.Input(xindmap.input.InputType.left)
+        elif event.keysym == "Right":
+            input = xindmap.input.Input(xindmap.input.InputType.right)
         elif event.keycode == 50:
             input = None
         else:
@@ -7,5 +7,20 @@ class Editable:
     def add_text(self, text):
         raise NotImplemented("editable add_text not implemented")
 
+    def cursor_move(self, offset):
+        raise NotImplemented("editable cursor_move not implemented")
+
+    def cursor_move_to_end(self):
+        raise NotImplemented("editable cursor_move_to_end not implemented")
+
+    def cursor_move_to_start(self):
+        raise NotImplemented("editable cursor_move_to_start not implemented")
+
+    def edit_end(self):
+        raise NotImplemented("editable edit_end not implemented")
+
     def remove_last_char(self):
         raise NotImplemented("editable remove_last_char not implemented")
+
+    def remove_next_char(self):
+        raise NotImplemented("editable remove_next_char not implemented")
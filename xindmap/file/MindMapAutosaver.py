@@ -0,0 +1,200 @@
+import contextlib
+import logging
+import threading
+import time
+import traceback
+
+import xindmap.config
+
+
+class MindMapAutosaver(xindmap.config.Configurable):
+    """Saves a [mind map][xindmap.mind_map.MindMap.MindMap] in the background
+    once it changed.
+
+    Changes are tracked from the
+    [events][xindmap.mind_map.MindMapEvent.MindMapEvent] of the mind map,
+    whose callbacks only record the time of the change.
+    A worker thread calls the save function once no change was made for
+    [`autosave_debounce_s`][xindmap.config.Variables.Variables.autosave_debounce_s],
+    or at the latest
+    [`autosave_interval_s`][xindmap.config.Variables.Variables.autosave_interval_s]
+    after the first unsaved change, so that saving never blocks the user
+    interface.
+
+    The save function is expected to save a snapshot of the mind map, the
+    changes being forgotten right before so that a change made meanwhile is
+    saved next time.
+
+    Attributes:
+        __condition: Condition guarding the attributes below, notified upon
+            any of them changing.
+        __debounce_s: The delay without change before saving.
+        __first_change_time:
+            The [monotonic time][time.monotonic] of the first unsaved change,
+            [`None`][] if there is none.
+        __interval_s: The maximum delay before saving a change, autosave being
+            disabled if not positive.
+        __is_running: Whether the worker thread must keep running.
+        __last_change_time:
+            The [monotonic time][time.monotonic] of the last unsaved change.
+        __pause_count: The number of nested pauses.
+        __save: The function saving the mind map.
+        __thread: The worker thread.
+    """
+    # change *******************************************************************
+    def change_record(self):
+        """Records a change of the mind map to be saved."""
+        now = time.monotonic()
+
+        with self.__condition:
+            if self.__first_change_time is None:
+                self.__first_change_time = now
+
+            self.__last_change_time = now
+            self.__condition.notify()
+
+    def clear(self):
+        """Forgets the unsaved changes, the mind map being about to be saved."""
+        with self.__condition:
+            self.__first_change_time = None
+            self.__last_change_time = None
+
+    # config callback **********************************************************
+    def on_config_variable_autosave_debounce_s_set(self, value):
+        """Config callback called whenever
+        [`autosave_debounce_s`][xindmap.config.Variables.Variables.autosave_debounce_s]
+        config variable is set.
+        """
+        with self.__condition:
+            self.__debounce_s = value
+            self.__condition.notify()
+
+    def on_config_variable_autosave_interval_s_set(self, value):
+        """Config callback called whenever
+        [`autosave_interval_s`][xindmap.config.Variables.Variables.autosave_interval_s]
+        config variable is set.
+        """
+        with self.__condition:
+            self.__interval_s = value
+            self.__condition.notify()
+
+    # constructor **************************************************************
+    def __init__(self, save):
+        """Instantiates this autosaver and starts its worker thread.
+
+        Args:
+            save: The function, called without argument from the worker
+                thread, saving the mind map.
+        """
+        xindmap.config.Configurable.__init__(
+            self,
+            [
+                xindmap.config.Variables.autosave_debounce_s,
+                xindmap.config.Variables.autosave_interval_s,
+            ],
+        )
+
+        self.__condition = threading.Condition()
+        self.__debounce_s = xindmap.config.Variables.autosave_debounce_s.default
+        self.__first_change_time = None
+        self.__interval_s = xindmap.config.Variables.autosave_interval_s.default
+        self.__is_running = True
+        self.__last_change_time = None
+        self.__pause_count = 0
+        self.__save = save
+
+        self.__thread = threading.Thread(target=self.__thread_target, daemon=True)
+        self.__thread.start()
+
+    # mind map callback ********************************************************
+    def on_mind_map_changed(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_cleared(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_node_added(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_node_deleted(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_node_moved(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_node_title_set(self, mind_map, event):
+        self.change_record()
+
+    def on_mind_map_subtree_added(self, mind_map, event):
+        self.change_record()
+
+    # pause ********************************************************************
+    @contextlib.contextmanager
+    def paused(self):
+        """Context manager preventing autosaves, such as while a mind map is
+        loaded.
+
+        Changes made while paused are forgotten, the mind map being expected
+        to be in sync with its file afterwards.
+        """
+        with self.__condition:
+            self.__pause_count += 1
+
+        try:
+            yield self
+        finally:
+            with self.__condition:
+                self.__pause_count -= 1
+                self.__first_change_time = None
+                self.__last_change_time = None
+                self.__condition.notify()
+
+    # thread *******************************************************************
+    def __save_delay(self):
+        """Returns the delay before the next save, [`None`][] if there is none
+        planned.
+        """
+        if (
+            self.__first_change_time is None
+            or self.__pause_count
+            or self.__interval_s <= 0
+        ):
+            return None
+
+        save_time = min(
+            self.__last_change_time + self.__debounce_s,
+            self.__first_change_time + self.__interval_s,
+        )
+
+        return save_time - time.monotonic()
+
+    def stop(self):
+        """Stops the worker thread, dropping the unsaved changes."""
+        with self.__condition:
+            self.__is_running = False
+            self.__condition.notify()
+
+    def __thread_target(self):
+        while True:
+            with self.__condition:
+                while True:
+                    if not self.__is_running:
+                        return
+
+                    delay = self.__save_delay()
+
+                    if delay is not None and delay <= 0:
+                        break
+
+                    self.__condition.wait(delay)
+
+                self.__first_change_time = None
+                self.__last_change_time = None
+
+            try:
+                self.__save()
+            except Exception as error:
+                logging.warning(f"autosave failed: {error}")
+                logging.warning(traceback.format_exc())
+
+                self.change_record()
@@ -0,0 +1,127 @@
+import array
+import contextlib
+import mmap
+import sys
+
+from .MindMapBinaryWriter import MindMapBinaryWriter
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapBinaryReader:
+    """Reader of mind map binary files, as written by
+    [`MindMapBinaryWriter`][xindmap.file.MindMapBinaryWriter.MindMapBinaryWriter].
+
+    The file is memory mapped and its arrays are read in place through
+    [`memoryview`][] casts, only the titles being decoded, so nothing is
+    parsed nor copied as a whole.
+
+    Nodes are yielded as `(depth, title)` pairs in pre order, as expected by
+    [`populate_from_nodes`][xindmap.mind_map.MindMap.MindMap.populate_from_nodes].
+
+    Attributes:
+        __file: The binary file to read, backed by a file descriptor.
+    """
+    # constructor **************************************************************
+    def __init__(self, file):
+        self.__file = file
+
+    # node *********************************************************************
+    def nodes(self):
+        """Yields the nodes of the file as `(depth, title)` pairs in pre order.
+
+        Raises:
+            MindMapFileError: If the file is not a valid mind map binary file.
+        """
+        with contextlib.ExitStack() as exit_stack:
+            try:
+                file_map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise MindMapFileError(f"empty file")
+
+            exit_stack.callback(file_map.close)
+
+            parent_indexes, title_ends, titles = self.__sections(file_map)
+
+            # views must be released before the map is closed
+            for view in (parent_indexes, title_ends, titles):
+                exit_stack.callback(view.release)
+
+            # indexes of the ancestors of the current node, the deepest last
+            stack = []
+            title_start = 0
+
+            for index in range(len(parent_indexes)):
+                parent_index = parent_indexes[index]
+
+                while stack and stack[-1] != parent_index:
+                    stack.pop()
+
+                if (parent_index == -1) != (index == 0) or (
+                    parent_index != -1 and not stack
+                ):
+                    raise MindMapFileError(f"invalid parent index {parent_index}")
+
+                title_end = title_ends[index]
+
+                if not title_start <= title_end <= len(titles):
+                    raise MindMapFileError(f"invalid title end {title_end}")
+
+                try:
+                    title = str(titles[title_start:title_end], "utf-8")
+                except UnicodeDecodeError as error:
+                    raise MindMapFileError(f"invalid title: {error}")
+
+                yield len(stack), title
+
+                stack.append(index)
+                title_start = title_end
+
+    @staticmethod
+    def __sections(file_map):
+        """Returns views on the parent array, the title end array and the title
+        table of a mapped file.
+        """
+        header_struct = MindMapBinaryWriter.header_struct
+        padding = MindMapBinaryWriter.padding
+
+        if len(file_map) < header_struct.size:
+            raise MindMapFileError(f"truncated header")
+
+        magic, version, node_count, title_size = header_struct.unpack_from(file_map)
+
+        if magic != MindMapBinaryWriter.magic:
+            raise MindMapFileError(f"not a mind map binary file")
+
+        if version != MindMapBinaryWriter.version:
+            raise MindMapFileError(f"unsupported version {version}")
+
+        titles_start = header_struct.size + padding(header_struct.size)
+        parent_indexes_start = titles_start + title_size + padding(title_size)
+        title_ends_start = parent_indexes_start + 4 * node_count + padding(4 * node_count)
+        title_ends_end = title_ends_start + 8 * node_count
+
+        if len(file_map) < title_ends_end:
+            raise MindMapFileError(f"truncated file")
+
+        view = memoryview(file_map)
+
+        parent_indexes = view[parent_indexes_start:title_ends_start - padding(4 * node_count)].cast("i")
+        title_ends = view[title_ends_start:title_ends_end].cast("q")
+        titles = view[titles_start:titles_start + title_size]
+
+        view.release()
+
+        # arrays are little endian, big endian hosts read swapped copies
+        if sys.byteorder == "big":
+            parent_indexes = MindMapBinaryReader.__swapped(parent_indexes, "i")
+            title_ends = MindMapBinaryReader.__swapped(title_ends, "q")
+
+        return parent_indexes, title_ends, titles
+
+    @staticmethod
+    def __swapped(view, typecode):
+        values = array.array(typecode, view)
+        values.byteswap()
+        view.release()
+
+        return memoryview(values)
@@ -0,0 +1,106 @@
+import array
+import struct
+import sys
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapBinaryWriter:
+    """Writer of mind map binary files.
+
+    A binary file is made of, each section being aligned on 8 bytes:
+
+    - a header holding a magic, the format version, the number of nodes and
+      the size of the title table,
+    - the title table, the utf-8 titles of the nodes one after the other,
+    - the parent array, the index of the parent of each node as a little
+      endian `int32`, `-1` for the root,
+    - the title end array, the offset of the end of the title of each node in
+      the title table as a little endian `int64`.
+
+    Nodes are indexed in pre order.
+    Such a file is read without parsing by
+    [`MindMapBinaryReader`][xindmap.file.MindMapBinaryReader.MindMapBinaryReader].
+
+    Titles are written as they come while the arrays, 12 bytes per node, are
+    written at the end, the header being rewritten last.
+    The file must therefore be seekable.
+
+    Attributes:
+        __file: The binary file to write to.
+    """
+    header_struct = struct.Struct("<4sIQQ")
+    """The layout of the header."""
+
+    magic = b"XMAP"
+    """The bytes starting any mind map binary file."""
+
+    version = 1
+    """The version of the format."""
+
+    # constructor **************************************************************
+    def __init__(self, file):
+        self.__file = file
+
+    # padding ******************************************************************
+    @staticmethod
+    def padding(size):
+        """Returns the number of bytes aligning a given size on 8 bytes."""
+        return -size % 8
+
+    # write ********************************************************************
+    def write(self, nodes):
+        """Writes the nodes of a mind map.
+
+        Args:
+            nodes: Iterable of `(depth, title)` pairs in pre order.
+
+        Raises:
+            MindMapFileError: If the nodes do not form a single tree.
+        """
+        parent_indexes = array.array("i")
+        title_ends = array.array("q")
+        title_size = 0
+
+        # indexes of the ancestors of the current node, by depth
+        stack = []
+
+        header_size = MindMapBinaryWriter.header_struct.size
+        self.__file.write(bytes(header_size + MindMapBinaryWriter.padding(header_size)))
+
+        for depth, title in nodes:
+            if not 0 <= depth <= len(stack) or (depth == 0 and parent_indexes):
+                raise MindMapFileError(f"unexpected node depth {depth}")
+
+            del stack[depth:]
+
+            parent_indexes.append(stack[-1] if stack else -1)
+            stack.append(len(parent_indexes) - 1)
+
+            title_bytes = title.encode("utf-8")
+            self.__file.write(title_bytes)
+            title_size += len(title_bytes)
+            title_ends.append(title_size)
+
+        if not parent_indexes:
+            raise MindMapFileError(f"can not write a mind map with no node")
+
+        if sys.byteorder == "big":
+            parent_indexes.byteswap()
+            title_ends.byteswap()
+
+        self.__file.write(bytes(MindMapBinaryWriter.padding(title_size)))
+        parent_indexes.tofile(self.__file)
+        self.__file.write(bytes(MindMapBinaryWriter.padding(4 * len(parent_indexes))))
+        title_ends.tofile(self.__file)
+
+        self.__file.seek(0)
+        self.__file.write(
+            MindMapBinaryWriter.header_struct.pack(
+                MindMapBinaryWriter.magic,
+                MindMapBinaryWriter.version,
+                len(parent_indexes),
+                title_size,
+            )
+        )
+        self.__file.seek(0, 2)
@@ -0,0 +1,244 @@
+import sqlite3
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapDatabase:
+    """SQLite database holding a mind map, one row per node.
+
+    Each row holds the id of a node, the ids of its parent and previous
+    sibling, `-1` if none, and its title.
+    The database can thus be queried directly, the children of a node being
+    ordered by following the previous sibling ids.
+
+    Saving only writes the rows of the nodes changed since the last save, as
+    tracked by a
+    [change tracker][xindmap.mind_map.MindMapChangeTracker.MindMapChangeTracker],
+    all in one transaction.
+    Besides the changed nodes, the rows whose previous sibling changed are
+    written as well: the next sibling of a changed node in the saved mind map
+    and the rows whose previous sibling was a changed node in the database.
+
+    Row ids are the node ids of the mind map the database is saved from, the
+    rows of folded nodes being read from their fold.
+    Loading into an empty mind map gives the nodes their index in pre order as
+    id, the database must then be
+    [compacted][xindmap.file.MindMapDatabase.MindMapDatabase.compact] first.
+
+    Attributes:
+        __connection: The connection to the database.
+        __file_path: The path of the database file.
+    """
+    suffix = ".sqlite"
+    """The suffix of mind map database files."""
+
+    # close ********************************************************************
+    def close(self):
+        self.__connection.close()
+
+    # compact ******************************************************************
+    def compact(self):
+        """Renumbers the rows so that their ids are their index in pre order,
+        the ids given to the nodes when loaded in an empty mind map.
+
+        Raises:
+            MindMapFileError: If the rows do not form a single tree.
+        """
+        node_ids, _ = self.__pre_order()
+
+        if all(node_id == index for index, (node_id, _) in enumerate(node_ids)):
+            return
+
+        new_ids = {node_id: index for index, (node_id, _) in enumerate(node_ids)}
+        new_ids[-1] = -1
+
+        with self.__connection:
+            rows = self.__connection.execute(
+                "SELECT id, parent_id, previous_sibling_id, title FROM nodes"
+            ).fetchall()
+
+            self.__connection.execute("DELETE FROM nodes")
+            self.__connection.executemany(
+                "INSERT INTO nodes VALUES (?, ?, ?, ?)",
+                (
+                    (new_ids[node_id], new_ids[parent_id], new_ids[previous_sibling_id], title)
+                    for node_id, parent_id, previous_sibling_id, title in rows
+                ),
+            )
+
+    # constructor **************************************************************
+    def __init__(self, file_path):
+        self.__file_path = file_path
+
+        try:
+            self.__connection = sqlite3.connect(
+                str(file_path), check_same_thread=False
+            )
+            self.__connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS nodes (
+                    id INTEGER PRIMARY KEY,
+                    parent_id INTEGER NOT NULL,
+                    previous_sibling_id INTEGER NOT NULL,
+                    title TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS nodes_previous_sibling_id
+                    ON nodes (previous_sibling_id);
+                CREATE TEMPORARY TABLE changed_nodes (id INTEGER PRIMARY KEY);
+                """
+            )
+        except sqlite3.Error as error:
+            raise MindMapFileError(f"can not open database \"{file_path}\": {error}")
+
+    # file *********************************************************************
+    @property
+    def file_path(self):
+        return self.__file_path
+
+    # load *********************************************************************
+    def nodes(self):
+        """Yields the nodes of the database as `(depth, title)` pairs in pre
+        order.
+
+        The database should be [compacted][xindmap.file.MindMapDatabase.MindMapDatabase.compact]
+        beforehand if the nodes are loaded in a mind map saved back to it.
+
+        Raises:
+            MindMapFileError: If the rows do not form a single tree.
+        """
+        node_ids, titles = self.__pre_order()
+
+        for node_id, depth in node_ids:
+            yield depth, titles[node_id]
+
+    def __pre_order(self):
+        """Returns the pairs of id and depth of the rows in pre order and the
+        dictionnary mapping their id to their title.
+        """
+        root_id = None
+        first_child_ids = {}
+        next_sibling_ids = {}
+        titles = {}
+
+        for node_id, parent_id, previous_sibling_id, title in self.__connection.execute(
+            "SELECT id, parent_id, previous_sibling_id, title FROM nodes"
+        ):
+            titles[node_id] = title
+
+            if parent_id == -1:
+                if root_id is not None:
+                    raise MindMapFileError(f"several root nodes")
+
+                root_id = node_id
+            elif previous_sibling_id == -1:
+                first_child_ids[parent_id] = node_id
+            else:
+                next_sibling_ids[previous_sibling_id] = node_id
+
+        if root_id is None:
+            raise MindMapFileError(f"no root node")
+
+        node_ids = []
+        stack = [(root_id, 0)]
+
+        while stack:
+            node_id, depth = stack.pop()
+            node_ids.append((node_id, depth))
+
+            if len(node_ids) > len(titles):
+                raise MindMapFileError(f"cycle in the nodes")
+
+            if node_id in next_sibling_ids:
+                stack.append((next_sibling_ids[node_id], depth))
+
+            if node_id in first_child_ids:
+                stack.append((first_child_ids[node_id], depth + 1))
+
+        if len(node_ids) != len(titles):
+            raise MindMapFileError(f"{len(titles) - len(node_ids)} unreachable nodes")
+
+        return node_ids, titles
+
+    # save *********************************************************************
+    def save(self, snapshot, node_ids=None):
+        """Saves a mind map in one transaction.
+
+        Args:
+            snapshot: A [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot]
+                of the mind map.
+            node_ids: The ids of the nodes changed since the last save, every
+                row being rewritten if [`None`][].
+        """
+        with self.__connection:
+            if node_ids is None:
+                self.__connection.execute("DELETE FROM nodes")
+                node_ids = snapshot.node_ids(include_folded=True)
+            else:
+                node_ids = self.__changed_ids(snapshot, node_ids)
+
+            deleted_ids = []
+            rows = []
+
+            for node_id in node_ids:
+                node_state = MindMapDatabase.__node_state(snapshot, node_id)
+
+                if node_state is None:
+                    deleted_ids.append((node_id,))
+                    continue
+
+                parent_id, previous_sibling_id, _, title = node_state
+
+                rows.append(
+                    (
+                        node_id,
+                        parent_id if parent_id is not None else -1,
+                        previous_sibling_id if previous_sibling_id is not None else -1,
+                        title,
+                    )
+                )
+
+            self.__connection.executemany("DELETE FROM nodes WHERE id = ?", deleted_ids)
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO nodes VALUES (?, ?, ?, ?)", rows
+            )
+
+    def __changed_ids(self, snapshot, node_ids):
+        """Returns the ids of the rows to write given the changed nodes."""
+        changed_ids = set(node_ids)
+
+        self.__connection.execute("DELETE FROM changed_nodes")
+        self.__connection.executemany(
+            "INSERT INTO changed_nodes VALUES (?)",
+            ((node_id,) for node_id in changed_ids),
+        )
+
+        # rows whose previous sibling changed may now follow another one
+        for (node_id,) in self.__connection.execute(
+            "SELECT nodes.id FROM nodes"
+            " JOIN changed_nodes ON nodes.previous_sibling_id = changed_nodes.id"
+        ):
+            changed_ids.add(node_id)
+
+        # nodes placed after a changed one follow it now
+        for node_id in list(changed_ids):
+            node_state = MindMapDatabase.__node_state(snapshot, node_id)
+
+            if node_state is not None and node_state[2] is not None:
+                changed_ids.add(node_state[2])
+
+        return changed_ids
+
+    @staticmethod
+    def __node_state(snapshot, node_id):
+        """Returns the parent id, previous sibling id, next sibling id and
+        title of a node, folded or not, [`None`][] if it does not exist.
+        """
+        if not snapshot.node_id_exists(node_id):
+            return snapshot.folded_node(node_id)
+
+        return (
+            snapshot.node_parent_id(node_id),
+            snapshot.node_previous_sibling_id(node_id),
+            snapshot.node_next_sibling_id(node_id),
+            snapshot.node_title(node_id),
+        )
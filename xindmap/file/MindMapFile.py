@@ -0,0 +1,236 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+from .MindMapBinaryReader import MindMapBinaryReader
+from .MindMapBinaryWriter import MindMapBinaryWriter
+from .MindMapFileError import MindMapFileError
+from .MindMapIndex import MindMapIndex
+from .MindMapJsonReader import MindMapJsonReader
+from .MindMapJsonWriter import MindMapJsonWriter
+
+
+class MindMapFile:
+    """Reads and writes mind map files, choosing their format from their
+    suffix.
+
+    Files ending with [`binary_suffix`][xindmap.file.MindMapFile.MindMapFile.binary_suffix]
+    are [binary files][xindmap.file.MindMapBinaryWriter.MindMapBinaryWriter],
+    any other file is a JSON file, kept for interchange.
+
+    JSON files ending with one of the
+    [`compression_suffixes`][xindmap.file.MindMapFile.MindMapFile.compression_suffixes],
+    such as `.json.gz`, are compressed with the matching standard library
+    codec.
+    They are streamed through the codec like any JSON file, so that neither
+    the compressed nor the uncompressed content is ever held in memory.
+
+    Plain JSON files can be written along with an
+    [index][xindmap.file.MindMapIndex.MindMapIndex] of their first levels,
+    from which the
+    [subtree][xindmap.file.MindMapFile.MindMapFile.subtree_nodes] of an
+    indexed node is read without parsing the rest of the file.
+
+    Attributes:
+        __file_path: The path of the file, an instance of [`pathlib.Path`][].
+    """
+    binary_suffix = ".xmap"
+    """The suffix of mind map binary files."""
+
+    compression_suffixes = {".bz2": bz2, ".gz": gzip, ".xz": lzma}
+    """The suffixes of compressed JSON files mapped to the module of their
+    codec.
+    """
+
+    # constructor **************************************************************
+    def __init__(self, file_path):
+        self.__file_path = file_path
+
+    # format *******************************************************************
+    @property
+    def compression(self):
+        """Returns the module of the codec of this file, [`None`][] if it is
+        not compressed.
+        """
+        return MindMapFile.compression_suffixes.get(self.__file_path.suffix)
+
+    @property
+    def is_binary(self):
+        return self.__file_path.suffix == MindMapFile.binary_suffix
+
+    # open *******************************************************************
+    def __compressed_open(self, file, mode, compression_level=None):
+        """Opens a compressed JSON file, given as a path or as a binary file,
+        in text mode through its codec.
+        """
+        compression = self.compression
+
+        if compression_level is None:
+            return compression.open(file, f"{mode}t")
+
+        # levels go from 1 to 9 for every codec, lzma naming them presets
+        compression_level = max(1, min(compression_level, 9))
+
+        if compression is lzma:
+            return lzma.open(file, f"{mode}t", preset=compression_level)
+
+        return compression.open(file, f"{mode}t", compresslevel=compression_level)
+
+    # read *********************************************************************
+    def nodes(self):
+        """Yields the nodes of the file as `(depth, title)` pairs in pre order,
+        the file being open until they are all read.
+        """
+        if self.is_binary:
+            with self.__file_path.open("rb") as file:
+                yield from MindMapBinaryReader(file).nodes()
+        elif self.compression is not None:
+            with self.__compressed_open(self.__file_path, "r") as file:
+                yield from MindMapJsonReader(file).nodes()
+        else:
+            with self.__file_path.open("r") as file:
+                yield from MindMapJsonReader(file).nodes()
+
+    # subtree ******************************************************************
+    def subtree_nodes(self, titles):
+        """Yields the nodes of a subtree of the file as `(depth, title)` pairs
+        in pre order, the depth of its root being `0`.
+
+        The root of the subtree is reached from the root of the file, each
+        node being the first child of the previous one with the given title.
+        Its deepest indexed ancestor, if the file has an up to date index, is
+        read from its range in the file, the rest of the file being skipped.
+        Otherwise the whole file is read.
+
+        Args:
+            titles: The titles of the nodes down to the root of the subtree,
+                the root of the file excluded.
+
+        Raises:
+            MindMapFileError: If no node matches the titles.
+        """
+        subtree_range = None
+
+        if not self.is_binary and self.compression is None:
+            index = MindMapIndex.read(self.__file_path)
+
+            if index is not None:
+                subtree_range = index.subtree_range(titles)
+
+        if subtree_range is None:
+            nodes = self.nodes()
+        else:
+            offset, length, title_count = subtree_range
+            titles = titles[title_count:]
+
+            with self.__file_path.open("rb") as file:
+                file.seek(offset)
+                data = file.read(length)
+
+            if len(data) != length or data[:1] != b"{" or data[-1:] != b"}":
+                raise MindMapFileError(f"index does not match the file")
+
+            nodes = MindMapJsonReader(io.StringIO(data.decode("ascii"))).nodes()
+
+        yield from MindMapFile.__branch_nodes(nodes, titles)
+
+    @staticmethod
+    def __branch_nodes(nodes, titles):
+        """Yields the nodes of the subtree reached by titles from the root of
+        nodes, rebasing their depths.
+        """
+        nodes = iter(nodes)
+        depth, title = next(nodes, (0, None))
+
+        if title is None:
+            raise MindMapFileError(f"no node in the file")
+
+        for child_title in titles:
+            is_found = False
+
+            for node_depth, node_title in nodes:
+                if node_depth <= depth:
+                    break
+
+                if node_depth == depth + 1 and node_title == child_title:
+                    depth, title = node_depth, node_title
+                    is_found = True
+                    break
+
+            if not is_found:
+                raise MindMapFileError(f"no node {child_title!r} in the file")
+
+        yield 0, title
+
+        for node_depth, node_title in nodes:
+            if node_depth <= depth:
+                break
+
+            yield node_depth - depth, node_title
+
+    # write ********************************************************************
+    def write(self, nodes, json_indent=2, compression_level=6, index_depth=0):
+        """Writes nodes given as `(depth, title)` pairs in pre order.
+
+        Nodes are written to a temporary file next to the file, which is then
+        renamed over the file so that the file is never seen half written.
+
+        Args:
+            nodes: Iterable of `(depth, title)` pairs in pre order.
+            json_indent: The indentation of JSON files, [`None`][] to write
+                them on a single line.
+            compression_level: The level, from 1 to 9, of compressed JSON
+                files.
+            index_depth: The number of levels below the root indexed along
+                plain JSON files, `0` for them not to be indexed.
+        """
+        temporary_file_path = self.__file_path.with_name(
+            f".{self.__file_path.name}.tmp"
+        )
+
+        try:
+            if self.is_binary:
+                with temporary_file_path.open("wb") as file:
+                    MindMapBinaryWriter(file).write(nodes)
+                    MindMapFile.__file_sync(file)
+            elif self.compression is not None:
+                with temporary_file_path.open("wb") as compressed_file:
+                    with self.__compressed_open(
+                        compressed_file, "w", compression_level
+                    ) as file:
+                        MindMapJsonWriter(file, json_indent).write(nodes)
+
+                    MindMapFile.__file_sync(compressed_file)
+            else:
+                # newlines are not translated for the offsets of the index to
+                # be byte offsets on every platform
+                with temporary_file_path.open(
+                    "w", encoding="ascii", newline="\n"
+                ) as file:
+                    json_writer = MindMapJsonWriter(
+                        file, json_indent, index_depth=index_depth
+                    )
+                    json_writer.write(nodes)
+                    MindMapFile.__file_sync(file)
+
+            os.replace(temporary_file_path, self.__file_path)
+        except BaseException:
+            temporary_file_path.unlink(missing_ok=True)
+            raise
+
+        if self.is_binary or self.compression is not None:
+            return
+
+        if index_depth > 0:
+            MindMapIndex(index_depth, json_writer.subtrees).write(
+                self.__file_path
+            )
+        else:
+            MindMapIndex.index_path(self.__file_path).unlink(missing_ok=True)
+
+    @staticmethod
+    def __file_sync(file):
+        file.flush()
+        os.fsync(file.fileno())
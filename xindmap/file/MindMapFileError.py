@@ -0,0 +1,2 @@
+class MindMapFileError(Exception):
+    pass
@@ -0,0 +1,199 @@
+import os
+import struct
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapIndex:
+    """Index of the subtrees of a mind map JSON file, for it to be partially
+    loaded.
+
+    The index lists, in pre order, the nodes of the first `depth` levels below
+    the root with the byte range of their object in the file, as recorded by
+    the [JSON writer][xindmap.file.MindMapJsonWriter.MindMapJsonWriter].
+    The subtree of one of them is loaded by reading and parsing its range
+    only, rather than the whole file.
+
+    The index is saved to a `.index` file next to the mind map file.
+    It starts with a header holding the size and modification time of the
+    mind map file it applies to, an index whose mind map file was written
+    since being stale and not read.
+
+    Attributes:
+        __depth: The depth of the deepest indexed nodes.
+        __subtrees: The indexed nodes as `[parent_index, title, offset,
+            length]` lists, the parent index being `-1` for the children of
+            the root.
+    """
+    entry_struct = struct.Struct("<iqqI")
+    """The structure of the entries: index of the parent entry, offset and
+    length of the object of the node and size of the encoded title following
+    the entry.
+    """
+
+    header_struct = struct.Struct("<4sqqii")
+    """The structure of the index header: magic bytes, size and modification
+    time in nanoseconds of the mind map file, depth and number of entries.
+    """
+
+    magic = b"XMIX"
+    """The bytes an index file starts with."""
+
+    suffix = ".index"
+    """The suffix appended to the name of a mind map file to get the one of
+    its index.
+    """
+
+    # constructor **************************************************************
+    def __init__(self, depth, subtrees):
+        self.__depth = depth
+        self.__subtrees = subtrees
+
+    # file *********************************************************************
+    @staticmethod
+    def index_path(file_path):
+        """Returns the path of the index of a mind map file."""
+        return file_path.with_name(file_path.name + MindMapIndex.suffix)
+
+    # read *********************************************************************
+    @staticmethod
+    def read(file_path):
+        """Reads the index of a mind map file.
+
+        Args:
+            file_path: The path of the mind map file, expected to be an
+                instance of [`pathlib.Path`][] class.
+
+        Returns:
+            The index, [`None`][] if the file has no index or if it is stale.
+
+        Raises:
+            MindMapFileError: If the index is not valid.
+        """
+        try:
+            data = MindMapIndex.index_path(file_path).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        entry_struct = MindMapIndex.entry_struct
+        header_struct = MindMapIndex.header_struct
+
+        if len(data) < header_struct.size:
+            raise MindMapFileError(f"truncated index header")
+
+        magic, size, mtime_ns, depth, count = header_struct.unpack_from(data)
+
+        if magic != MindMapIndex.magic:
+            raise MindMapFileError(f"not a mind map index")
+
+        file_stat = os.stat(file_path)
+        if (size, mtime_ns) != (file_stat.st_size, file_stat.st_mtime_ns):
+            return None
+
+        position = header_struct.size
+        subtrees = []
+
+        for index in range(count):
+            if position + entry_struct.size > len(data):
+                raise MindMapFileError(f"truncated index entry")
+
+            parent_index, offset, length, title_size = entry_struct.unpack_from(
+                data, position
+            )
+            position += entry_struct.size
+
+            if position + title_size > len(data):
+                raise MindMapFileError(f"truncated index entry")
+
+            if not -1 <= parent_index < index or offset + length > size:
+                raise MindMapFileError(f"invalid index entry {index}")
+
+            title = data[position:position + title_size].decode("utf-8")
+            position += title_size
+
+            subtrees.append([parent_index, title, offset, length])
+
+        return MindMapIndex(depth, subtrees)
+
+    # subtree ******************************************************************
+    @property
+    def depth(self):
+        return self.__depth
+
+    def subtree_range(self, titles):
+        """Returns the byte range of the deepest indexed node along a path.
+
+        The path goes down from the root, each node being the first child of
+        the previous one with the given title.
+
+        Args:
+            titles: The titles of the nodes of the path, the root excluded.
+
+        Returns:
+            A `(offset, length, title_count)` tuple, `title_count` being the
+            number of titles of the path matched by the node, [`None`][] if
+            none is indexed.
+        """
+        indexes = {}
+        for index, (parent_index, title, _, _) in enumerate(self.__subtrees):
+            indexes.setdefault((parent_index, title), index)
+
+        index = -1
+        title_count = 0
+
+        for title in titles:
+            child_index = indexes.get((index, title))
+            if child_index is None:
+                break
+
+            index = child_index
+            title_count += 1
+
+        if index == -1:
+            return None
+
+        _, _, offset, length = self.__subtrees[index]
+
+        return offset, length, title_count
+
+    # write ********************************************************************
+    def write(self, file_path):
+        """Writes the index of a mind map file just written.
+
+        The index is written to a temporary file next to its file, which is
+        then renamed over it.
+
+        Args:
+            file_path: The path of the mind map file, expected to be an
+                instance of [`pathlib.Path`][] class.
+        """
+        stat = os.stat(file_path)
+
+        index_path = MindMapIndex.index_path(file_path)
+        temporary_path = index_path.with_name(f".{index_path.name}.tmp")
+
+        try:
+            with open(temporary_path, "wb") as file:
+                file.write(
+                    MindMapIndex.header_struct.pack(
+                        MindMapIndex.magic,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        self.__depth,
+                        len(self.__subtrees),
+                    )
+                )
+
+                for parent_index, title, offset, length in self.__subtrees:
+                    encoded_title = title.encode("utf-8")
+                    file.write(
+                        MindMapIndex.entry_struct.pack(
+                            parent_index, offset, length, len(encoded_title)
+                        )
+                    )
+                    file.write(encoded_title)
+
+            os.replace(temporary_path, index_path)
+        except BaseException:
+            temporary_path.unlink(missing_ok=True)
+            raise
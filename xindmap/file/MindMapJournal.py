@@ -0,0 +1,594 @@
+import array
+import os
+import struct
+import sys
+import threading
+
+import xindmap.config
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapJournal(xindmap.config.Configurable):
+    """Append only write ahead journal of the changes made to a
+    [mind map][xindmap.mind_map.MindMap.MindMap] since it was last fully saved
+    to its file.
+
+    Each change dispatched by the mind map is appended to a `.journal` file next
+    to the mind map file as a compact record.
+    A node record holds the id of a node, the ids of its parent and previous
+    sibling, `-1` if none, and its title, a deletion record the id of a deleted
+    node and a clear record nothing.
+    Node records are states rather than edits so that replaying one twice, or
+    replaying one whose edit is already saved, is harmless.
+    The record of a node added or moved is followed by the one of its next
+    sibling, which now follows it.
+    Folding and unfolding nodes are not journaled, they change neither the
+    content of the mind map nor the ids of its nodes, but a folded node added
+    to the mind map, as by a compaction, is followed by the records of its
+    folded subtree.
+
+    Records are buffered and written by a worker thread, which
+    [syncs][os.fsync] them to disk at most every
+    [`journal_sync_interval_ms`][xindmap.config.Variables.Variables.journal_sync_interval_ms]
+    so that a burst of changes costs a single sync.
+
+    The journal starts with a header holding the size and modification time of
+    the mind map file it applies to and the ids of the saved nodes in pre
+    order, the order they are loaded in, folded nodes included.
+    Saving the mind map to its file compacts the journal: a new journal is
+    [opened][xindmap.file.MindMapJournal.MindMapJournal.open] with the header
+    of the saved file, replacing the former one.
+    A journal whose mind map file was saved since, for instance if the
+    application stopped in between, is stale and not replayed.
+
+    Attributes:
+        __condition: Condition guarding the attributes below but the file,
+            notified upon records being appended.
+        __file: The journal file, [`None`][] if changes are not journaled.
+        __file_lock: Lock guarding the file.
+        __is_held: Whether records are held back while the mind map is saved.
+        __is_running: Whether the worker thread must keep running.
+        __records: The records not written yet.
+        __sync_interval_s: The minimum delay between two syncs.
+        __thread: The worker thread.
+    """
+    header_struct = struct.Struct("<4sqqi")
+    """The structure of the journal header: magic bytes, size and modification
+    time in nanoseconds of the mind map file and number of node ids.
+    """
+
+    magic = b"XMJL"
+    """The bytes a journal file starts with."""
+
+    record_struct = struct.Struct("<ciiiI")
+    """The structure of the records: kind, node id, parent id, previous sibling
+    id and size of the encoded title following the record.
+    """
+
+    suffix = ".journal"
+    """The suffix appended to the name of a mind map file to get the one of
+    its journal.
+    """
+
+    # close ********************************************************************
+    def close(self):
+        """Writes the pending records and stops journaling the changes, such as
+        before another mind map is loaded.
+        """
+        self.flush()
+
+        with self.__file_lock:
+            with self.__condition:
+                file = self.__file
+                self.__file = None
+                self.__is_held = False
+                self.__records = []
+
+            if file is not None:
+                file.close()
+
+    # config callback **********************************************************
+    def on_config_variable_journal_sync_interval_ms_set(self, value):
+        """Config callback called whenever
+        [`journal_sync_interval_ms`][xindmap.config.Variables.Variables.journal_sync_interval_ms]
+        config variable is set.
+        """
+        with self.__condition:
+            self.__sync_interval_s = value / 1000
+
+    # constructor **************************************************************
+    def __init__(self):
+        """Instantiates this journal, journaling nothing until
+        [opened][xindmap.file.MindMapJournal.MindMapJournal.open], and starts
+        its worker thread.
+        """
+        xindmap.config.Configurable.__init__(
+            self, [xindmap.config.Variables.journal_sync_interval_ms]
+        )
+
+        self.__condition = threading.Condition()
+        self.__file = None
+        self.__file_lock = threading.Lock()
+        self.__is_held = False
+        self.__is_running = True
+        self.__records = []
+        self.__sync_interval_s = (
+            xindmap.config.Variables.journal_sync_interval_ms.default / 1000
+        )
+
+        self.__thread = threading.Thread(target=self.__thread_target, daemon=True)
+        self.__thread.start()
+
+    # file *********************************************************************
+    @staticmethod
+    def journal_path(file_path):
+        """Returns the path of the journal of a mind map file."""
+        return file_path.with_name(file_path.name + MindMapJournal.suffix)
+
+    def open(self, file_path, node_ids):
+        """Starts journaling the changes over a mind map file just loaded or
+        saved, replacing its former journal.
+
+        The records held back since
+        [`hold`][xindmap.file.MindMapJournal.MindMapJournal.hold] are written
+        to the new journal.
+
+        Args:
+            file_path: The path of the mind map file, expected to be an
+                instance of [`pathlib.Path`][] class.
+            node_ids: The ids of the nodes of the mind map file in pre order.
+        """
+        stat = os.stat(file_path)
+        node_ids = array.array("i", node_ids)
+        if sys.byteorder == "big":
+            node_ids.byteswap()
+
+        journal_path = MindMapJournal.journal_path(file_path)
+        temporary_path = journal_path.with_name(f".{journal_path.name}.tmp")
+
+        with self.__file_lock:
+            with self.__condition:
+                records = self.__records
+                self.__records = []
+
+            try:
+                with open(temporary_path, "wb") as file:
+                    file.write(
+                        MindMapJournal.header_struct.pack(
+                            MindMapJournal.magic,
+                            stat.st_size,
+                            stat.st_mtime_ns,
+                            len(node_ids),
+                        )
+                    )
+                    file.write(node_ids.tobytes())
+                    file.write(b"".join(records))
+                    file.flush()
+                    os.fsync(file.fileno())
+
+                os.replace(temporary_path, journal_path)
+            except BaseException:
+                temporary_path.unlink(missing_ok=True)
+
+                # the records go to the current journal instead
+                with self.__condition:
+                    self.__records[:0] = records
+                    self.__is_held = False
+                    self.__condition.notify()
+
+                raise
+
+            if self.__file is not None:
+                self.__file.close()
+
+            file = open(journal_path, "ab")
+
+            with self.__condition:
+                self.__file = file
+                self.__is_held = False
+
+    # flush ********************************************************************
+    def flush(self):
+        """Writes the pending records to the journal and syncs it, unless they
+        are held back.
+        """
+        self.__records_write(False)
+
+    def __records_write(self, is_held):
+        """Writes the pending records to the journal and syncs it, then holds
+        the records appended since back if asked.
+        """
+        with self.__file_lock:
+            with self.__condition:
+                if self.__is_held:
+                    return
+
+                records = self.__records
+                self.__records = []
+                self.__is_held = is_held
+
+            if records and self.__file is not None:
+                self.__file.write(b"".join(records))
+                self.__file.flush()
+                os.fsync(self.__file.fileno())
+
+    # hold *********************************************************************
+    def hold(self):
+        """Writes the pending records then holds the next ones back, the mind
+        map being about to be saved.
+
+        Records are written to the new journal once the mind map is saved and
+        the journal [opened][xindmap.file.MindMapJournal.MindMapJournal.open],
+        or to the current one on [`release`][xindmap.file.MindMapJournal.MindMapJournal.release]
+        if the save failed.
+        """
+        self.__records_write(True)
+
+    def release(self):
+        """Writes the records held back to the current journal."""
+        with self.__condition:
+            self.__is_held = False
+            self.__condition.notify()
+
+    # mind map callback ********************************************************
+    def on_mind_map_changed(self, mind_map, event):
+        if not self.__is_journaling():
+            return
+
+        records = [
+            self.__deletion_record(node_id) for node_id in event.deleted_node_ids
+        ]
+
+        for node_id in event.added_node_ids:
+            records.extend(self.__node_records(mind_map, node_id, False))
+
+        records.extend(self.__folded_records(mind_map, event.added_node_ids))
+
+        for node_id in event.moved_node_ids:
+            records.extend(self.__node_records(mind_map, node_id, True))
+
+        for node_id in event.title_set_node_ids:
+            records.extend(self.__node_records(mind_map, node_id, False))
+
+        self.__records_append(records)
+
+    def on_mind_map_cleared(self, mind_map, event):
+        if self.__is_journaling():
+            self.__records_append([MindMapJournal.record_struct.pack(b"C", 0, 0, 0, 0)])
+
+    def on_mind_map_node_added(self, mind_map, event):
+        if self.__is_journaling():
+            self.__records_append(self.__node_records(mind_map, event.node_id, True))
+
+    def on_mind_map_node_deleted(self, mind_map, event):
+        if self.__is_journaling():
+            self.__records_append([self.__deletion_record(event.node_id)])
+
+    def on_mind_map_node_moved(self, mind_map, event):
+        if self.__is_journaling():
+            self.__records_append(self.__node_records(mind_map, event.node_id, True))
+
+    def on_mind_map_node_title_set(self, mind_map, event):
+        if self.__is_journaling():
+            self.__records_append(self.__node_records(mind_map, event.node_id, False))
+
+    def on_mind_map_subtree_added(self, mind_map, event):
+        if not self.__is_journaling():
+            return
+
+        records = []
+
+        for node_id in event.node_ids:
+            is_placed = node_id == event.node_id
+            records.extend(self.__node_records(mind_map, node_id, is_placed))
+
+        records.extend(self.__folded_records(mind_map, event.node_ids))
+
+        self.__records_append(records)
+
+    # record *******************************************************************
+    @staticmethod
+    def __deletion_record(node_id):
+        return MindMapJournal.record_struct.pack(b"D", node_id, 0, 0, 0)
+
+    @staticmethod
+    def __folded_records(mind_map, node_ids):
+        """Returns the records of the subtrees of the folded nodes among some
+        nodes.
+        """
+        records = []
+        snapshot = None
+
+        for node_id in node_ids:
+            if not mind_map.node_id_exists(node_id) or not mind_map.node_is_folded(node_id):
+                continue
+
+            if snapshot is None:
+                snapshot = mind_map.snapshot()
+
+            for (
+                folded_node_id, parent_id, previous_sibling_id, title
+            ) in snapshot.folded_nodes(node_id):
+                records.extend(
+                    MindMapJournal.__node_record(
+                        folded_node_id, parent_id, previous_sibling_id, title
+                    )
+                )
+
+        return records
+
+    def __is_journaling(self):
+        return self.__file is not None or self.__is_held
+
+    @staticmethod
+    def __node_records(mind_map, node_id, is_placed):
+        """Returns the record of a node, followed by the one of its next sibling
+        if the node was placed among its siblings.
+
+        A node deleted since its change was dispatched has no record, its
+        deletion being dispatched next.
+        """
+        records = []
+
+        while mind_map.node_id_exists(node_id):
+            parent_id = mind_map.node_parent_id(node_id)
+
+            records.extend(
+                MindMapJournal.__node_record(
+                    node_id,
+                    parent_id,
+                    mind_map.node_previous_sibling_id(node_id),
+                    mind_map.node_title(node_id),
+                )
+            )
+
+            if not is_placed or parent_id is None:
+                break
+
+            node_id = mind_map.node_next_sibling_id(node_id)
+            is_placed = False
+
+            if node_id is None:
+                break
+
+        return records
+
+    @staticmethod
+    def __node_record(node_id, parent_id, previous_sibling_id, title):
+        """Returns the record of a node and its encoded title."""
+        title = title.encode("utf-8")
+
+        return [
+            MindMapJournal.record_struct.pack(
+                b"N",
+                node_id,
+                parent_id if parent_id is not None else -1,
+                previous_sibling_id if previous_sibling_id is not None else -1,
+                len(title),
+            ),
+            title,
+        ]
+
+    def __records_append(self, records):
+        with self.__condition:
+            if self.__file is None and not self.__is_held:
+                return
+
+            self.__records.extend(records)
+            self.__condition.notify()
+
+    # replay *******************************************************************
+    @staticmethod
+    def replay(file_path, mind_map, file_stat=None):
+        """Replays the journal of a mind map file over the mind map just loaded
+        from it, as a single [transaction][xindmap.mind_map.MindMap.MindMap.transaction].
+
+        The mind map is [unfolded][xindmap.mind_map.MindMap.MindMap.unfold_all]
+        first if the journal holds records.
+
+        A record cut by the end of the journal, as written by a sync that did
+        not complete, is ignored.
+
+        Args:
+            file_path: The path of the mind map file, expected to be an
+                instance of [`pathlib.Path`][] class.
+            mind_map: The mind map loaded from the file.
+            file_stat: The [stat][os.stat] of the mind map file taken before
+                it was loaded, if it may have been written since, as a
+                [compacted][xindmap.file.MindMapDatabase.MindMapDatabase.compact]
+                database.
+
+        Returns:
+            The number of records replayed, `0` if the file has no journal or
+            if it is stale.
+
+        Raises:
+            MindMapFileError: If the journal is not valid or does not match the
+                mind map.
+        """
+        try:
+            data = MindMapJournal.journal_path(file_path).read_bytes()
+        except FileNotFoundError:
+            return 0
+
+        header_struct = MindMapJournal.header_struct
+        record_struct = MindMapJournal.record_struct
+
+        if len(data) < header_struct.size:
+            raise MindMapFileError(f"truncated journal header")
+
+        magic, size, mtime_ns, node_count = header_struct.unpack_from(data)
+
+        if magic != MindMapJournal.magic:
+            raise MindMapFileError(f"not a mind map journal")
+
+        if file_stat is None:
+            file_stat = os.stat(file_path)
+
+        if (size, mtime_ns) != (file_stat.st_size, file_stat.st_mtime_ns):
+            return 0
+
+        position = header_struct.size + 4 * node_count
+        if node_count < 0 or position > len(data):
+            raise MindMapFileError(f"truncated journal node ids")
+
+        journal_node_ids = array.array("i")
+        journal_node_ids.frombytes(data[header_struct.size:position])
+        if sys.byteorder == "big":
+            journal_node_ids.byteswap()
+
+        mind_map_node_ids = list(mind_map.snapshot().node_ids(include_folded=True))
+
+        if node_count != len(mind_map_node_ids):
+            raise MindMapFileError(
+                f"journal of {node_count} nodes over a mind map of"
+                f" {len(mind_map_node_ids)}"
+            )
+
+        # maps the ids of the journal to the ones of the mind map and back
+        node_ids = dict(zip(journal_node_ids, mind_map_node_ids))
+        journaled_ids = {
+            node_id: journal_node_id for journal_node_id, node_id in node_ids.items()
+        }
+
+        record_count = 0
+
+        # records may refer to any node, folded nodes keep their ids unfolded
+        if position < len(data):
+            mind_map.unfold_all()
+
+        with mind_map.transaction():
+            while position + record_struct.size <= len(data):
+                kind, journal_node_id, parent_id, previous_sibling_id, title_size = (
+                    record_struct.unpack_from(data, position)
+                )
+
+                end = position + record_struct.size + title_size
+                if end > len(data):
+                    break
+
+                title = data[position + record_struct.size:end].decode("utf-8")
+                position = end
+                record_count += 1
+
+                if kind == b"C":
+                    mind_map.clear()
+                    node_ids.clear()
+                    journaled_ids.clear()
+                elif kind == b"D":
+                    node_id = node_ids.get(journal_node_id)
+
+                    if node_id is None:
+                        continue
+
+                    stack = [node_id]
+                    while stack:
+                        subtree_node_id = stack.pop()
+                        del node_ids[journaled_ids.pop(subtree_node_id)]
+                        stack.extend(mind_map.node_child_ids(subtree_node_id))
+
+                    mind_map.node_delete(node_id)
+                elif kind == b"N":
+                    MindMapJournal.__node_replay(
+                        mind_map,
+                        node_ids,
+                        journaled_ids,
+                        journal_node_id,
+                        parent_id,
+                        previous_sibling_id,
+                        title,
+                    )
+                else:
+                    raise MindMapFileError(f"unknown journal record {kind!r}")
+
+        return record_count
+
+    @staticmethod
+    def __node_replay(
+        mind_map,
+        node_ids,
+        journaled_ids,
+        journal_node_id,
+        journal_parent_id,
+        journal_previous_sibling_id,
+        title,
+    ):
+        """Replays a node record, adding the node if unknown, moving it if its
+        place changed and setting its title.
+        """
+        node_id = node_ids.get(journal_node_id)
+
+        if journal_parent_id == -1:
+            if node_id is None:
+                if mind_map.root_node_id is not None:
+                    raise MindMapFileError(f"journaled root over an existing one")
+
+                node_id = mind_map.node_add()
+                node_ids[journal_node_id] = node_id
+                journaled_ids[node_id] = journal_node_id
+        else:
+            parent_id = node_ids.get(journal_parent_id)
+
+            if parent_id is None:
+                raise MindMapFileError(f"unknown journaled node {journal_parent_id}")
+
+            if node_id is None:
+                node_id = mind_map.node_add(parent_id)
+                node_ids[journal_node_id] = node_id
+                journaled_ids[node_id] = journal_node_id
+
+            # a previous sibling unknown yet is journaled next, along with the
+            # node that follows it
+            previous_sibling_id = node_ids.get(journal_previous_sibling_id)
+            sibling_ids = [
+                child_id
+                for child_id in mind_map.node_child_ids(parent_id)
+                if child_id != node_id
+            ]
+
+            if journal_previous_sibling_id == -1:
+                position = 0
+            elif previous_sibling_id in sibling_ids:
+                position = sibling_ids.index(previous_sibling_id) + 1
+            else:
+                position = None
+
+            if position is None:
+                if mind_map.node_parent_id(node_id) != parent_id:
+                    mind_map.node_move(node_id, parent_id)
+            elif mind_map.node_parent_id(node_id) != parent_id or (
+                mind_map.node_previous_sibling_id(node_id)
+                != (sibling_ids[position - 1] if position else None)
+            ):
+                mind_map.node_move(node_id, parent_id, position)
+
+        if mind_map.node_title(node_id) != title:
+            mind_map.node_set_title(title, node_id)
+
+    # thread *******************************************************************
+    def stop(self):
+        """Writes the pending records and stops the worker thread."""
+        with self.__condition:
+            self.__is_running = False
+            self.__condition.notify()
+
+        self.__thread.join()
+        self.flush()
+
+    def __thread_target(self):
+        while True:
+            with self.__condition:
+                while self.__is_running and (self.__is_held or not self.__records):
+                    self.__condition.wait()
+
+                if not self.__is_running:
+                    return
+
+                sync_interval_s = self.__sync_interval_s
+
+            self.flush()
+
+            # changes made meanwhile are synced together
+            with self.__condition:
+                self.__condition.wait_for(lambda: not self.__is_running, sync_interval_s)
@@ -0,0 +1,309 @@
+import json
+import re
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapJsonReader:
+    """Streaming reader of mind map JSON files.
+
+    A mind map JSON file nests objects with a `"title"` string and a `"childs"`
+    array of objects.
+    The file is read by chunks and tokenized on the fly, nodes are yielded as
+    soon as their title is parsed so that neither the file nor a tree of
+    dictionnaries is ever held in memory.
+
+    Nodes are yielded as `(depth, title)` pairs in pre order, as expected by
+    [`populate_from_nodes`][xindmap.mind_map.MindMap.MindMap.populate_from_nodes].
+    The rare objects whose `"childs"` come before their `"title"` have their
+    children buffered until the title is known.
+
+    Attributes:
+        __buffer: The text read but not tokenized yet.
+        __chunk_size: The number of characters read at once.
+        __file: The text file to read.
+        __is_exhausted: Whether the file has been read to its end.
+        __position: The position of the next token in the buffer.
+    """
+    __scalar_regex = re.compile(
+        r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?|true|false|null"
+    )
+    __whitespace_regex = re.compile(r"[ \t\n\r]*")
+
+    # constructor **************************************************************
+    def __init__(self, file, chunk_size=65536):
+        self.__buffer = ""
+        self.__chunk_size = chunk_size
+        self.__file = file
+        self.__is_exhausted = False
+        self.__position = 0
+
+    # node *********************************************************************
+    @staticmethod
+    def __dict_nodes(node_dict, depth):
+        stack = [(node_dict, depth)]
+
+        while stack:
+            node_dict, depth = stack.pop()
+
+            if not isinstance(node_dict, dict):
+                raise MindMapFileError(f"expected a node object")
+
+            yield depth, node_dict.get("title", "")
+
+            for child_dict in reversed(node_dict.get("childs", [])):
+                stack.append((child_dict, depth + 1))
+
+    def nodes(self):
+        """Yields the nodes of the file as `(depth, title)` pairs in pre order.
+
+        Raises:
+            MindMapFileError: If the file is not a valid mind map JSON file.
+        """
+        tokens = self.__tokens()
+
+        self.__token_expect(tokens, "{")
+
+        # each open object holds its depth, title, whether it has been yielded
+        # and its buffered children
+        objects = [[0, "", False, None]]
+        state = "first_key"
+
+        while objects:
+            current_object = objects[-1]
+            token = self.__token_next(tokens)
+
+            if token == "}" and state == "first_key":
+                state = "object_end"
+            elif state in ("first_key", "key"):
+                if not isinstance(token, tuple) or token[0] != "string":
+                    raise MindMapFileError(f"expected a key, got {token!r}")
+
+                key = token[1]
+                self.__token_expect(tokens, ":")
+
+                if key == "title":
+                    title = self.__value_read(tokens, self.__token_next(tokens))
+
+                    if not isinstance(title, str):
+                        raise MindMapFileError(f"expected a string title")
+
+                    current_object[1] = title
+
+                    if not current_object[2] and current_object[3] is None:
+                        current_object[2] = True
+                        yield current_object[0], title
+                elif key == "childs" and current_object[1] == "" and not current_object[2]:
+                    # the title may still come, children are kept aside
+                    childs = self.__value_read(tokens, self.__token_next(tokens))
+
+                    if not isinstance(childs, list):
+                        raise MindMapFileError(f"expected a childs array")
+
+                    current_object[3] = childs
+                elif key == "childs":
+                    self.__token_expect(tokens, "[")
+
+                    if not current_object[2]:
+                        current_object[2] = True
+                        yield current_object[0], current_object[1]
+
+                    state = "first_child"
+                    continue
+                else:
+                    self.__value_read(tokens, self.__token_next(tokens))
+
+                state = "member_end"
+            elif state == "member_end":
+                if token == ",":
+                    state = "key"
+                elif token == "}":
+                    state = "object_end"
+                else:
+                    raise MindMapFileError(f"expected ',' or '}}', got {token!r}")
+            elif state in ("first_child", "child"):
+                if token == "]" and state == "first_child":
+                    state = "member_end"
+                elif token == "{":
+                    objects.append([current_object[0] + 1, "", False, None])
+                    state = "first_key"
+                else:
+                    raise MindMapFileError(f"expected a node object, got {token!r}")
+            elif state == "child_end":
+                if token == ",":
+                    state = "child"
+                elif token == "]":
+                    state = "member_end"
+                else:
+                    raise MindMapFileError(f"expected ',' or ']', got {token!r}")
+
+            if state == "object_end":
+                objects.pop()
+
+                if not current_object[2]:
+                    yield current_object[0], current_object[1]
+
+                for child_dict in current_object[3] or ():
+                    yield from MindMapJsonReader.__dict_nodes(
+                        child_dict, current_object[0] + 1
+                    )
+
+                state = "child_end"
+
+        for token in tokens:
+            raise MindMapFileError(f"unexpected {token!r} after the root node")
+
+    # token ********************************************************************
+    def __buffer_extend(self):
+        """Reads the next chunk of the file, returns [`False`][] at its end."""
+        if self.__is_exhausted:
+            return False
+
+        chunk = self.__file.read(self.__chunk_size)
+
+        if not chunk:
+            self.__is_exhausted = True
+            return False
+
+        self.__buffer = self.__buffer[self.__position:] + chunk
+        self.__position = 0
+
+        return True
+
+    def __token_expect(self, tokens, expected_token):
+        token = self.__token_next(tokens)
+
+        if token != expected_token:
+            raise MindMapFileError(f"expected {expected_token!r}, got {token!r}")
+
+    def __token_next(self, tokens):
+        token = next(tokens, None)
+
+        if token is None:
+            raise MindMapFileError(f"unexpected end of file")
+
+        return token
+
+    def __tokens(self):
+        """Yields the tokens of the file.
+
+        Punctuation is yielded as is, strings as `("string", value)` and other
+        scalars as `("scalar", value)`.
+        """
+        while True:
+            match = MindMapJsonReader.__whitespace_regex.match(
+                self.__buffer, self.__position
+            )
+            self.__position = match.end()
+
+            if self.__position == len(self.__buffer):
+                if self.__buffer_extend():
+                    continue
+
+                return
+
+            char = self.__buffer[self.__position]
+
+            if char in "{}[]:,":
+                self.__position += 1
+                yield char
+            elif char == "\"":
+                try:
+                    string, end = json.decoder.scanstring(
+                        self.__buffer, self.__position + 1
+                    )
+                except json.JSONDecodeError as error:
+                    # the string or one of its escape sequences may be cut by
+                    # the end of the buffer
+                    is_cut = (
+                        error.msg.startswith("Unterminated")
+                        or error.pos + 6 >= len(self.__buffer)
+                    )
+
+                    if is_cut and self.__buffer_extend():
+                        continue
+
+                    raise MindMapFileError(f"invalid string: {error}")
+
+                self.__position = end
+                yield "string", string
+            else:
+                match = MindMapJsonReader.__scalar_regex.match(
+                    self.__buffer, self.__position
+                )
+
+                # a scalar may be cut by the end of the buffer
+                is_cut = len(self.__buffer) - self.__position < 6 or (
+                    match is not None and match.end() == len(self.__buffer)
+                )
+
+                if is_cut and self.__buffer_extend():
+                    continue
+
+                if match is None:
+                    raise MindMapFileError(f"unexpected character {char!r}")
+
+                self.__position = match.end()
+                yield "scalar", json.loads(match.group())
+
+    # value ********************************************************************
+    def __value_read(self, tokens, token):
+        """Reads a whole value starting with a given token."""
+        # each open container holds the container and, for objects, the
+        # pending key
+        containers = []
+
+        while True:
+            if token == "{":
+                containers.append([{}, None])
+                token = self.__token_next(tokens)
+
+                if token == "}":
+                    value = containers.pop()[0]
+                else:
+                    continue
+            elif token == "[":
+                containers.append([[], None])
+                token = self.__token_next(tokens)
+
+                if token == "]":
+                    value = containers.pop()[0]
+                else:
+                    continue
+            elif isinstance(token, tuple):
+                value = token[1]
+            else:
+                raise MindMapFileError(f"unexpected {token!r}")
+
+            # closes every container the value completes
+            while True:
+                if not containers:
+                    return value
+
+                container = containers[-1]
+
+                if isinstance(container[0], dict) and container[1] is None:
+                    if not isinstance(value, str):
+                        raise MindMapFileError(f"expected a key, got {value!r}")
+
+                    container[1] = value
+                    self.__token_expect(tokens, ":")
+                    token = self.__token_next(tokens)
+                    break
+
+                if isinstance(container[0], dict):
+                    container[0][container[1]] = value
+                    container[1] = None
+                else:
+                    container[0].append(value)
+
+                token = self.__token_next(tokens)
+
+                if token == ",":
+                    token = self.__token_next(tokens)
+                    break
+
+                if token != ("}" if isinstance(container[0], dict) else "]"):
+                    raise MindMapFileError(f"unexpected {token!r}")
+
+                value = containers.pop()[0]
@@ -0,0 +1,157 @@
+import json
+
+from .MindMapFileError import MindMapFileError
+
+
+class MindMapJsonWriter:
+    """Streaming writer of mind map JSON files.
+
+    Nodes are written as they come, from `(depth, title)` pairs in pre order
+    such as the ones of
+    [`MindMapSnapshot.nodes`][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot.nodes],
+    so that no tree of dictionnaries is built.
+    The output is byte for byte the one of [`json.dump`][] on the equivalent
+    tree of dictionnaries with the same indentation.
+
+    Written text is gathered in chunks of about `chunk_size` characters
+    before being written to the file.
+
+    The range of the objects of the nodes down to `index_depth` is recorded
+    while writing, for the
+    [index][xindmap.file.MindMapIndex.MindMapIndex] of the file.
+    Titles being written with their non ASCII characters escaped, the
+    written text is ASCII and its offsets are offsets in bytes.
+
+    Attributes:
+        __chunk: The pieces of text not written yet.
+        __chunk_length: The length of the text not written yet.
+        __chunk_size: The length from which text is written to the file.
+        __file: The text file to write to.
+        __indent:
+            The number of spaces per indentation level, [`None`][] to write
+            everything on a single line.
+        __index_depth: The depth of the deepest nodes whose range is
+            recorded.
+        __item_separator: The text separating the members of an object.
+        __open_subtree_indexes: The indexes of the recorded subtrees whose
+            object is not closed yet, by depth.
+        __position: The length of the text written so far.
+        __subtrees: The recorded subtrees.
+    """
+    # constructor **************************************************************
+    def __init__(self, file, indent=2, chunk_size=65536, index_depth=0):
+        self.__chunk = []
+        self.__chunk_length = 0
+        self.__chunk_size = chunk_size
+        self.__file = file
+        self.__indent = indent
+        self.__index_depth = index_depth
+        self.__item_separator = "," if indent is not None else ", "
+        self.__open_subtree_indexes = []
+        self.__position = 0
+        self.__subtrees = []
+
+    # index ********************************************************************
+    @property
+    def subtrees(self):
+        """The subtrees of the nodes from depth `1` to `index_depth`, in pre
+        order, as `[parent_index, title, offset, length]` lists.
+
+        The parent index is the index of the subtree of the parent, `-1` for
+        the children of the root, the offset and the length being the range of
+        the object of the node in the written text.
+        """
+        return self.__subtrees
+
+    def __subtree_close(self, depth):
+        if 0 < depth <= self.__index_depth:
+            subtree = self.__subtrees[self.__open_subtree_indexes.pop()]
+            subtree[3] = self.__position - subtree[2]
+
+    def __subtree_open(self, depth, title):
+        if 0 < depth <= self.__index_depth:
+            parent_index = (
+                self.__open_subtree_indexes[-1] if depth > 1 else -1
+            )
+
+            self.__open_subtree_indexes.append(len(self.__subtrees))
+            self.__subtrees.append([parent_index, title, self.__position, 0])
+
+    # text *********************************************************************
+    def __flush(self):
+        self.__file.write("".join(self.__chunk))
+        self.__chunk.clear()
+        self.__chunk_length = 0
+
+    def __newline(self, level):
+        if self.__indent is None:
+            return ""
+
+        return "\n" + " " * (self.__indent * level)
+
+    def __text_write(self, text):
+        self.__chunk.append(text)
+        self.__chunk_length += len(text)
+        self.__position += len(text)
+
+        if self.__chunk_length >= self.__chunk_size:
+            self.__flush()
+
+    # write ********************************************************************
+    def write(self, nodes):
+        """Writes the nodes of a mind map.
+
+        The node at depth `d` is an object at indentation level `2 * d`, its
+        members being one level deeper.
+
+        Args:
+            nodes: Iterable of `(depth, title)` pairs in pre order.
+
+        Raises:
+            MindMapFileError: If the nodes do not form a single tree.
+        """
+        previous_depth = -1
+
+        for depth, title in nodes:
+            if depth == previous_depth + 1 and depth > 0:
+                self.__text_write("[" + self.__newline(2 * depth))
+            elif 0 < depth <= previous_depth:
+                self.__node_close(previous_depth, depth)
+                self.__text_write(self.__item_separator + self.__newline(2 * depth))
+            elif depth != 0 or previous_depth != -1:
+                raise MindMapFileError(f"unexpected node depth {depth}")
+
+            self.__subtree_open(depth, title)
+            self.__text_write(
+                "{"
+                + self.__newline(2 * depth + 1)
+                + "\"title\": "
+                + json.dumps(title)
+                + self.__item_separator
+                + self.__newline(2 * depth + 1)
+                + "\"childs\": "
+            )
+
+            previous_depth = depth
+
+        if previous_depth == -1:
+            raise MindMapFileError(f"can not write a mind map with no node")
+
+        self.__node_close(previous_depth, 0)
+        self.__flush()
+
+    def __node_close(self, depth, sibling_depth):
+        """Closes the node at a given depth, whose children were all written,
+        then its ancestors down to a given depth.
+        """
+        self.__text_write("[]" + self.__newline(2 * depth) + "}")
+        self.__subtree_close(depth)
+
+        for ancestor_depth in range(depth - 1, sibling_depth - 1, -1):
+            self.__text_write(
+                self.__newline(2 * ancestor_depth + 1)
+                + "]"
+                + self.__newline(2 * ancestor_depth)
+                + "}"
+            )
+            self.__subtree_close(ancestor_depth)
@@ -0,0 +1,267 @@
+import collections
+import time
+
+import xindmap.config
+import xindmap.event
+
+from .MindMapLoaderEvent import MindMapLoaderEvent
+
+
+class MindMapLoader(xindmap.event.EventSource, xindmap.config.Configurable):
+    """Loads a stream of nodes into a
+    [mind map][xindmap.mind_map.MindMap.MindMap] progressively, the first
+    levels first.
+
+    The nodes of the first
+    [`file_load_first_levels`][xindmap.config.Variables.Variables.file_load_first_levels]
+    levels are added as they are read so that the top of the mind map is
+    usable right away, the deeper subtrees being
+    [folded][xindmap.mind_map.MindMap.MindMap.node_fold] under them.
+    Nodes thus get their index in pre order as id, as the rows of a
+    [compacted][xindmap.file.MindMapDatabase.MindMapDatabase.compact]
+    database.
+
+    The folded subtrees are unfolded afterwards, in pre order, down to
+    [`file_load_unfolded_levels`][xindmap.config.Variables.Variables.file_load_unfolded_levels]
+    levels, by chunks of about
+    [`file_load_chunk_size`][xindmap.config.Variables.Variables.file_load_chunk_size]
+    nodes separated by
+    [`file_load_chunk_interval_ms`][xindmap.config.Variables.Variables.file_load_chunk_interval_ms].
+    The deeper levels stay folded, the memory and layout costs of the mind map
+    being the ones of its unfolded nodes only.
+    The mind map is only locked while a chunk is added, leaving it to the other
+    threads in between, such as the ones of navigation commands.
+    The load is not recorded in the history of the mind map, it can not be
+    undone, and it is cut short if a node still to be loaded is deleted
+    meanwhile.
+    Nodes still to be loaded that get folded meanwhile are loaded into the
+    fold, their subtrees coming back once it is unfolded.
+
+    A load is meant to run in a thread of its own and can be
+    [cancelled][xindmap.file.MindMapLoader.MindMapLoader.cancel] from any
+    other thread.
+
+    # Events
+
+    The mind map loader is an
+    [event source][xindmap.event.EventSource.EventSource].
+    It dispatches [events][xindmap.event.Event.Event] of types enumed in
+    [`MindMapLoaderEvent`][xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent]
+    class.
+
+    ### ended
+
+    **Type**:
+        [`MindMapLoaderEvent.ended`][xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent.ended]
+
+    Args:
+        is_complete: Whether all the nodes were loaded.
+
+    ### progressed
+
+    **Type**:
+        [`MindMapLoaderEvent.progressed`][xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent.progressed]
+
+    Args:
+        loaded_node_count: The number of unfolded nodes of the mind map.
+        node_count: The number of nodes to unfold, [`None`][] while they are
+            read.
+
+    Attributes:
+        __chunk_interval_s: The delay between two chunks.
+        __chunk_size: The number of nodes of a chunk.
+        __first_level_count: The number of levels added at once.
+        __is_cancelled: Whether the current load is cancelled.
+        __unfolded_level_count: The number of levels unfolded, `0` for all.
+    """
+    # cancel *******************************************************************
+    def cancel(self):
+        """Cancels the current load, which stops at the end of its current
+        chunk.
+        """
+        self.__is_cancelled = True
+
+    # config callback **********************************************************
+    def on_config_variable_file_load_chunk_interval_ms_set(self, value):
+        """Config callback called whenever
+        [`file_load_chunk_interval_ms`][xindmap.config.Variables.Variables.file_load_chunk_interval_ms]
+        config variable is set.
+        """
+        self.__chunk_interval_s = value / 1000
+
+    def on_config_variable_file_load_chunk_size_set(self, value):
+        """Config callback called whenever
+        [`file_load_chunk_size`][xindmap.config.Variables.Variables.file_load_chunk_size]
+        config variable is set.
+        """
+        self.__chunk_size = max(1, value)
+
+    def on_config_variable_file_load_first_levels_set(self, value):
+        """Config callback called whenever
+        [`file_load_first_levels`][xindmap.config.Variables.Variables.file_load_first_levels]
+        config variable is set.
+        """
+        self.__first_level_count = max(1, value)
+
+    def on_config_variable_file_load_unfolded_levels_set(self, value):
+        """Config callback called whenever
+        [`file_load_unfolded_levels`][xindmap.config.Variables.Variables.file_load_unfolded_levels]
+        config variable is set.
+        """
+        self.__unfolded_level_count = max(0, value)
+
+    # constructor **************************************************************
+    def __init__(self):
+        xindmap.event.EventSource.__init__(self, MindMapLoaderEvent)
+        xindmap.config.Configurable.__init__(
+            self,
+            [
+                xindmap.config.Variables.file_load_chunk_interval_ms,
+                xindmap.config.Variables.file_load_chunk_size,
+                xindmap.config.Variables.file_load_first_levels,
+                xindmap.config.Variables.file_load_unfolded_levels,
+            ],
+        )
+
+        self.__chunk_interval_s = (
+            xindmap.config.Variables.file_load_chunk_interval_ms.default / 1000
+        )
+        self.__chunk_size = xindmap.config.Variables.file_load_chunk_size.default
+        self.__first_level_count = (
+            xindmap.config.Variables.file_load_first_levels.default
+        )
+        self.__is_cancelled = False
+        self.__unfolded_level_count = (
+            xindmap.config.Variables.file_load_unfolded_levels.default
+        )
+
+    # load *********************************************************************
+    def load(self, mind_map, nodes):
+        """Loads nodes into an empty mind map, returning once they are all
+        added or the load is cancelled.
+
+        Args:
+            mind_map: The empty mind map.
+            nodes: Iterable of `(depth, title)` pairs in pre order.
+
+        Returns:
+            [`True`][] if all the nodes were loaded, [`False`][] if the load was
+            cancelled or cut short.
+        """
+        self.__is_cancelled = False
+        is_complete = False
+
+        try:
+            is_complete = self.__load(mind_map, nodes)
+        finally:
+            event = xindmap.event.Event(
+                MindMapLoaderEvent.ended, is_complete=is_complete
+            )
+            self._dispatch_event(event)
+
+        return is_complete
+
+    def __load(self, mind_map, nodes):
+        chunk_size = self.__chunk_size
+        first_level_count = self.__first_level_count
+        unfolded_level_count = self.__unfolded_level_count
+
+        if unfolded_level_count:
+            first_level_count = min(first_level_count, unfolded_level_count)
+
+        self.__progressed_dispatch(0, None)
+
+        depth_counts = collections.Counter()
+
+        root_id = mind_map.populate_from_nodes(
+            self.__nodes_read(mind_map, nodes, depth_counts, chunk_size),
+            None,
+            chunk_size,
+            first_level_count - 1,
+            False,
+        )
+
+        if self.__is_cancelled or root_id is None:
+            return False
+
+        node_count = sum(
+            count
+            for depth, count in depth_counts.items()
+            if not unfolded_level_count or depth < unfolded_level_count
+        )
+        loaded_node_count = len(mind_map)
+        self.__progressed_dispatch(loaded_node_count, node_count)
+
+        # the mind map may have been emptied meanwhile
+        if unfolded_level_count == first_level_count:
+            return mind_map.node_id_exists(root_id)
+
+        levels = (
+            unfolded_level_count - first_level_count if unfolded_level_count else None
+        )
+
+        # the folded subtrees hang under the nodes of the last first level, they
+        # are unfolded in pre order, the nodes folded meanwhile staying folded
+        snapshot = mind_map.snapshot()
+        folded_node_ids = [
+            node_id
+            for node_id in snapshot.node_ids()
+            if snapshot.node_is_folded(node_id)
+            and snapshot.node_depth(node_id) == first_level_count - 1
+        ]
+
+        chunk_node_count = 0
+
+        for node_id in folded_node_ids:
+            # the subtree of a node hidden in a fold meanwhile is loaded with
+            # it, the one of a node unfolded meanwhile already is, the one of a
+            # node deleted meanwhile is not
+            if mind_map.node_is_hidden(node_id):
+                continue
+
+            if not mind_map.node_id_exists(node_id):
+                return False
+
+            if not mind_map.node_is_folded(node_id):
+                continue
+
+            unfolded_node_count = len(mind_map.node_unfold(node_id, levels))
+
+            chunk_node_count += unfolded_node_count
+            loaded_node_count += unfolded_node_count
+
+            if chunk_node_count >= chunk_size:
+                chunk_node_count = 0
+                self.__progressed_dispatch(loaded_node_count, node_count)
+
+                if self.__is_cancelled:
+                    return False
+
+                time.sleep(self.__chunk_interval_s)
+
+        self.__progressed_dispatch(loaded_node_count, node_count)
+
+        return mind_map.node_id_exists(root_id)
+
+    def __nodes_read(self, mind_map, nodes, depth_counts, chunk_size):
+        """Yields the nodes of a stream until the load is cancelled, counting
+        them by depth and dispatching the progress every chunk.
+        """
+        for index, (depth, title) in enumerate(nodes, 1):
+            depth_counts[depth] += 1
+
+            yield depth, title
+
+            if index % chunk_size == 0:
+                self.__progressed_dispatch(len(mind_map), None)
+
+                if self.__is_cancelled:
+                    return
+
+    def __progressed_dispatch(self, loaded_node_count, node_count):
+        event = xindmap.event.Event(
+            MindMapLoaderEvent.progressed,
+            loaded_node_count=loaded_node_count,
+            node_count=node_count,
+        )
+        self._dispatch_event(event)
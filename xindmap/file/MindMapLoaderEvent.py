@@ -0,0 +1,11 @@
+import enum
+
+
+class MindMapLoaderEvent(enum.Enum):
+    """Event types dispatched by
+    [`MindMapLoader`][xindmap.file.MindMapLoader.MindMapLoader] class.
+    """
+    ended = enum.auto()
+    """The load ended, whether all the nodes were loaded or not."""
+    progressed = enum.auto()
+    """More nodes were loaded."""
@@ -0,0 +1,38 @@
+"""Xindmap file module.
+
+# `xindmap.file`
+
+Mind maps are saved to and loaded from JSON files, possibly compressed, binary
+files, or SQLite databases saved incrementally.
+Changes made since the last save are journaled to be replayed after a crash.
+Files are read and written as streams of nodes so that a mind map never has to
+exist twice in memory.
+
+## Module exported content
+
+- [`xindmap.file.MindMapAutosaver.MindMapAutosaver`][]
+- [`xindmap.file.MindMapBinaryReader.MindMapBinaryReader`][]
+- [`xindmap.file.MindMapBinaryWriter.MindMapBinaryWriter`][]
+- [`xindmap.file.MindMapDatabase.MindMapDatabase`][]
+- [`xindmap.file.MindMapFile.MindMapFile`][]
+- [`xindmap.file.MindMapFileError.MindMapFileError`][]
+- [`xindmap.file.MindMapIndex.MindMapIndex`][]
+- [`xindmap.file.MindMapJournal.MindMapJournal`][]
+- [`xindmap.file.MindMapJsonReader.MindMapJsonReader`][]
+- [`xindmap.file.MindMapJsonWriter.MindMapJsonWriter`][]
+- [`xindmap.file.MindMapLoader.MindMapLoader`][]
+- [`xindmap.file.MindMapLoaderEvent.MindMapLoaderEvent`][]
+"""
+
+from .MindMapAutosaver import MindMapAutosaver
+from .MindMapBinaryReader import MindMapBinaryReader
+from .MindMapBinaryWriter import MindMapBinaryWriter
+from .MindMapDatabase import MindMapDatabase
+from .MindMapFile import MindMapFile
+from .MindMapFileError import MindMapFileError
+from .MindMapIndex import MindMapIndex
+from .MindMapJournal import MindMapJournal
+from .MindMapJsonReader import MindMapJsonReader
+from .MindMapJsonWriter import MindMapJsonWriter
+from .MindMapLoader import MindMapLoader
+from .MindMapLoaderEvent import MindMapLoaderEvent
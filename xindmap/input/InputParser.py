@@ -15,8 +15,13 @@ class InputParser:
     __input_type_to_regex = {
         InputType.backspace: "<BS>",
         InputType.default: ".",
+        InputType.delete: "<Del>",
+        InputType.end: "<End>",
         InputType.enter: "<CR>",
         InputType.escape: "<ESC>",
+        InputType.home: "<Home>",
+        InputType.left: "<Left>",
+        InputType.right: "<Right>",
     }
 
     __input_type_to_compiled_regex = {
@@ -92,8 +97,13 @@ class InputParser:
     __input_type_to_text = {
         InputType.backspace: "",
         InputType.default: "",
+        InputType.delete: "",
+        InputType.end: "",
         InputType.enter: "\n",
         InputType.escape: "",
+        InputType.home: "",
+        InputType.left: "",
+        InputType.right: "",
     }
 
     @classmethod
@@ -10,9 +10,24 @@ class InputType(enum.Enum):
     default = enum.auto()
     """Default.
     """
+    delete = enum.auto()
+    """Delete key, erasing the character after the cursor.
+    """
+    end = enum.auto()
+    """End key.
+    """
     enter = enum.auto()
     """Validate / enter key.
     """
     escape = enum.auto()
     """Escape key.
     """
+    home = enum.auto()
+    """Home key.
+    """
+    left = enum.auto()
+    """Left arrow key.
+    """
+    right = enum.auto()
+    """Right arrow key.
+    """
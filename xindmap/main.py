@@ -1,23 +1,29 @@
 import logging
 import pathlib
+import sys
 
 import rich.logging
 import rich.traceback
 import rich_click as click
 
 import xindmap.app
+import xindmap.file
+import xindmap.mind_map
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.option(
     "--init-file",
     "init_file_path",
     type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
     help="path to the initialization file",
 )
-def main(init_file_path):
+@click.pass_context
+def main(context, init_file_path):
     """Main function to run xindmap.
 
+    Runs the application unless a subcommand is given.
+
     Args:
         init_file_path:
             Path to the init file that is read before starting the application.
@@ -32,6 +38,9 @@ def main(init_file_path):
 
     rich.traceback.install()
 
+    if context.invoked_subcommand is not None:
+        return
+
     if init_file_path is not None:
         init_file_path = pathlib.Path(init_file_path)
 
@@ -40,5 +49,98 @@ def main(init_file_path):
     app.start()
 
 
+@main.command()
+@click.argument(
+    "old_file_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+@click.argument(
+    "new_file_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+def diff(old_file_path, new_file_path):
+    """Prints the differences between two mind map files.
+
+    Exits with status 1 if the mind maps differ.
+    """
+    mind_map_diff = xindmap.mind_map.MindMapDiff(
+        snapshot_read(pathlib.Path(old_file_path)),
+        snapshot_read(pathlib.Path(new_file_path)),
+    )
+
+    for line in mind_map_diff.lines():
+        click.echo(line)
+
+    sys.exit(0 if mind_map_diff.is_empty else 1)
+
+
+@main.command()
+@click.argument(
+    "base_file_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+@click.argument(
+    "ours_file_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+@click.argument(
+    "theirs_file_path",
+    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+)
+@click.option(
+    "--output",
+    "output_file_path",
+    type=click.Path(file_okay=True, dir_okay=False, writable=True),
+    help="path to the merged file, the ours file if not given",
+)
+def merge(base_file_path, ours_file_path, theirs_file_path, output_file_path):
+    """Merges two mind map files edited from a common base file.
+
+    The arguments follow the order of a git merge driver, `%O %A %B`.
+    Conflicts are printed, ours being kept for each, and make the command exit
+    with status 1.
+    """
+    mind_map_merge = xindmap.mind_map.MindMapMerge(
+        snapshot_read(pathlib.Path(base_file_path)),
+        snapshot_read(pathlib.Path(ours_file_path)),
+        snapshot_read(pathlib.Path(theirs_file_path)),
+    )
+
+    if output_file_path is None:
+        output_file_path = ours_file_path
+
+    output_file_path = pathlib.Path(output_file_path)
+
+    if output_file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+        mind_map_database = xindmap.file.MindMapDatabase(output_file_path)
+        mind_map_database.save(mind_map_merge.snapshot)
+        mind_map_database.close()
+    else:
+        mind_map_file = xindmap.file.MindMapFile(output_file_path)
+        mind_map_file.write(mind_map_merge.snapshot.nodes())
+
+    for conflict in mind_map_merge.conflicts:
+        click.echo(f"conflict: {conflict}", err=True)
+
+    sys.exit(1 if mind_map_merge.conflicts else 0)
+
+
+def snapshot_read(file_path):
+    """Reads a mind map file, or database, into a
+    [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot].
+    """
+    if file_path.suffix == xindmap.file.MindMapDatabase.suffix:
+        mind_map_database = xindmap.file.MindMapDatabase(file_path)
+        nodes = list(mind_map_database.nodes())
+        mind_map_database.close()
+    else:
+        nodes = xindmap.file.MindMapFile(file_path).nodes()
+
+    mind_map = xindmap.mind_map.MindMap()
+    mind_map.populate_from_nodes(nodes, None)
+
+    return mind_map.snapshot()
+
+
 if __name__ == "__main__":
     main()
@@ -1,31 +1,158 @@
-import collections
+import contextlib
+import heapq
+import threading
 
 import xindmap.editable
 import xindmap.event
 
 from .MindMapEvent import MindMapEvent
 from .MindMapError import MindMapError
-from .MindNode import MindNode
+from .MindMapFold import MindMapFold
+from .MindMapHistory import MindMapHistory
+from .MindMapStore import MindMapStore
+from .MindMapTitleBuffer import MindMapTitleBuffer
+from .MindMapTitleIndex import MindMapTitleIndex
 
 
 class MindMap(xindmap.event.EventSource, xindmap.editable.Editable):
+    # ancestor *****************************************************************
+    def is_ancestor(self, ancestor_id, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        for checked_node_id in (ancestor_id, node_id):
+            if not self.__store.node_exists(checked_node_id):
+                raise MindMapError(f"unknown node id {checked_node_id}")
+
+        return self.__store.is_ancestor(ancestor_id, node_id)
+
+    def lowest_common_ancestor(self, node_a_id, node_b_id):
+        for checked_node_id in (node_a_id, node_b_id):
+            if not self.__store.node_exists(checked_node_id):
+                raise MindMapError(f"unknown node id {checked_node_id}")
+
+        return self.__store.lowest_common_ancestor(node_a_id, node_b_id)
+
+    def path_to_root(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        return self.__store.path_to_root(node_id)
+
     # clear ********************************************************************
     def clear(self):
-        self.__node_id_to_node = {}
-        self.__root = None
-        self.__current_node_id = None
+        with self.__lock:
+            self.__store.clear()
+            self.__title_index.clear()
+            self.__history.clear()
+            self.__folds = {}
+            self.__title_buffer = None
+            self.__root_id = None
+            self.__current_node_id = None
 
         event = xindmap.event.Event(MindMapEvent.cleared)
-        self._dispatch_event(event)
+        self.__event_dispatch(event)
+
+    # compact ******************************************************************
+    def compact(self):
+        """Renumbers the nodes so that their ids are `0` to `n - 1` in pre
+        order, the nodes of the folded subtrees included.
+
+        Freed ids are already reused by the next added nodes, compacting only
+        matters after removing many nodes.
+        A freshly populated empty mind map is already compact.
+
+        The [history][xindmap.mind_map.MindMapHistory.MindMapHistory] is
+        cleared as it refers to the former ids.
+        Dispatches [cleared][xindmap.mind_map.MindMapEvent.MindMapEvent.cleared]
+        then [subtree added][xindmap.mind_map.MindMapEvent.MindMapEvent.subtree_added]
+        with the new ids of the unfolded nodes, folded nodes staying folded.
+
+        Returns:
+            Dictionnary mapping the former ids to the new ones.
+        """
+        self.title_edit_flush()
+
+        with self.__lock:
+            if self.__root_id is None:
+                return {}
+
+            store = MindMapStore()
+            title_index = MindMapTitleIndex()
+            folds = {}
+            node_id_to_new_id = {}
+            new_node_ids = []
+
+            for node_id in self.__store.subtree_ids_pre_order(self.__root_id):
+                parent_id = self.__store.parent_id(node_id)
+                new_parent_id = node_id_to_new_id[parent_id] if parent_id != -1 else -1
+                new_id = store.node_add(new_parent_id, False)
+                node_id_to_new_id[node_id] = new_id
+                new_node_ids.append(new_id)
+
+                title = self.__store.title(node_id)
+                store.set_title(new_id, title, False)
+                title_index.node_add(new_id, title)
+
+                # folded nodes come right after their folded node in pre order
+                fold = self.__folds.get(node_id)
+                if fold is not None:
+                    folds[new_id] = MindMap.__fold_renumber(
+                        fold, new_id, store, node_id_to_new_id
+                    )
+                    store.fold_set(new_id, fold.child_hash_sum)
+
+            store.aggregates_update(0)
+
+            self.__store = store
+            self.__title_index = title_index
+            self.__folds = folds
+            self.__history.clear()
+            self.__title_buffer = None
+            self.__root_id = 0
+
+            current_node_id = self.__current_node_id
+            if current_node_id is not None:
+                self.__current_node_id = node_id_to_new_id[current_node_id]
+
+        self.__event_dispatch(xindmap.event.Event(MindMapEvent.cleared))
+
+        event = xindmap.event.Event(
+            MindMapEvent.subtree_added,
+            node_id=0,
+            node_ids=new_node_ids,
+        )
+        self.__event_dispatch(event)
+
+        if current_node_id is not None:
+            event = xindmap.event.Event(
+                MindMapEvent.node_selected,
+                previous_node_id=None,
+                node_id=self.__current_node_id,
+            )
+            self.__event_dispatch(event)
+
+        return node_id_to_new_id
 
     # constructor **************************************************************
     def __init__(self):
         xindmap.event.EventSource.__init__(self, MindMapEvent)
         xindmap.editable.Editable.__init__(self)
 
-        self.__node_id_to_node = {}
-        self.__root = None
+        self.__lock = threading.RLock()
+        self.__store = MindMapStore()
+        self.__title_index = MindMapTitleIndex()
+        self.__history = MindMapHistory()
+        self.__folds = {}
+        self.__root_id = None
         self.__current_node_id = None
+        self.__title_buffer = None
+        self.__title_buffer_is_pending = False
+        self.__transaction_depth = 0
+        self.__transaction_events = None
 
     # current ******************************************************************
     @property
@@ -34,39 +161,264 @@ class MindMap(xindmap.event.EventSource, xindmap.editable.Editable):
 
     # dict *********************************************************************
     def populate_from_dict(self, node_dict, parent_id=None):
-        def from_dict_recursivity(node_dict, parent_id=None):
-            node_id = self.node_add(parent_id)
-
-            if "title" in node_dict:
-                self.node_set_title(node_dict["title"], node_id)
-
-            if "childs" in node_dict:
-                for child_dict in node_dict["childs"]:
-                    from_dict_recursivity(child_dict, node_id)
+        return self.populate_from_nodes(
+            MindMap.__dict_nodes(node_dict), parent_id
+        )
 
+    @staticmethod
+    def __dict_nodes(node_dict):
+        stack = [(node_dict, 0)]
+
+        while stack:
+            node_dict, depth = stack.pop()
+
+            yield depth, node_dict.get("title", "")
+
+            for child_dict in reversed(node_dict.get("childs", [])):
+                stack.append((child_dict, depth + 1))
+
+    @staticmethod
+    def __nodes_chunk(nodes, next_node, chunk_size, folded_depth):
+        """Reads the next chunk of a stream of nodes.
+
+        A chunk holds `chunk_size` unfolded nodes along with the folded nodes
+        following them, it ends right before an unfolded node so that the
+        subtree of a folded node is always part of the chunk of its node.
+
+        Returns:
+            The chunk and the node following it, [`None`][] if the stream is
+            exhausted.
+        """
+        chunk = []
+        unfolded_node_count = 0
+
+        while next_node is not None:
+            if folded_depth is None or next_node[0] <= folded_depth:
+                if unfolded_node_count == chunk_size:
+                    break
+
+                unfolded_node_count += 1
+
+            chunk.append(next_node)
+            next_node = next(nodes, None)
+
+        return chunk, next_node
+
+    def populate_from_nodes(
+        self, nodes, parent_id=None, chunk_size=None, folded_depth=None, is_recorded=True
+    ):
+        """Adds a subtree given as a stream of nodes.
+
+        Nodes are `(depth, title)` pairs in pre order, the depth being relative
+        to the root of the subtree, the first node.
+        They are consumed as they come so that the subtree never exists as a
+        whole outside of this mind map.
+
+        If `chunk_size` is given, nodes are added by chunks, starting with
+        `chunk_size` nodes and doubling, each chunk being dispatched in its own
+        [`subtree_added`][xindmap.mind_map.MindMapEvent.MindMapEvent.subtree_added]
+        event so that the first nodes are usable before the stream is
+        exhausted.
+        Population is cut short if a node still being populated is deleted in
+        between, the nodes streamed under a node folded in between being added
+        to its fold.
+
+        If `folded_depth` is given, the nodes deeper than it are
+        [folded][xindmap.mind_map.MindMap.MindMap.node_fold] right away under
+        the nodes at that depth, only the unfolded nodes being added, counted
+        in the chunks and dispatched.
+
+        Args:
+            nodes: Iterable of `(depth, title)` pairs.
+            parent_id: The id of the parent of the subtree, the current node if
+                [`None`][].
+            chunk_size: The size of the first chunk, all nodes are added at once
+                if [`None`][].
+            folded_depth: The depth of the deepest unfolded nodes, all nodes
+                being unfolded if [`None`][].
+            is_recorded: Whether the addition is recorded in the
+                [history][xindmap.mind_map.MindMapHistory.MindMapHistory], an
+                addition not recorded can not be undone, such as the one of a
+                loaded mind map.
+
+        Returns:
+            The id of the root of the added subtree, [`None`][] if population
+            was cut short.
+        """
         if parent_id is None:
             parent_id = self.__current_node_id
 
-        if parent_id is None and self.__root is not None:
-            raise MindMapError(f"can not populate from dict with no parent id if mind map is not empty")
+        if parent_id is None and self.__root_id is not None:
+            raise MindMapError(f"can not populate with no parent id if mind map is not empty")
+
+        if parent_id is not None and not self.__store.node_exists(parent_id):
+            raise MindMapError(f"unknown node id {parent_id}")
 
-        from_dict_recursivity(node_dict, parent_id)
+        if parent_id is not None:
+            self.__node_open(parent_id)
+
+        nodes = iter(nodes)
+        next_node = next(nodes, None)
+        is_cut_short = False
+        root_id = None
+        stack = [parent_id]
+
+        # folded nodes of the stack are not in the mind map, the deepest
+        # unfolded one never getting children
+        unfolded_stack_size = folded_depth + 2 if folded_depth is not None else None
+        parent_stack_size = folded_depth + 1 if folded_depth is not None else None
+
+        while next_node is not None:
+            chunk, next_node = MindMap.__nodes_chunk(
+                nodes, next_node, chunk_size, folded_depth
+            )
+
+            error = None
+            is_first_chunk = root_id is None
+            node_ids = []
+
+            with self.__lock:
+                # nodes still being populated may have been deleted meanwhile,
+                # their ids being possibly given to other nodes
+                if not all(
+                    (
+                        self.__store.node_exists(node_id)
+                        or self.__store.node_is_reserved(node_id)
+                    )
+                    and self.__store.parent_id(node_id) == (
+                        parent_node_id if parent_node_id is not None else -1
+                    )
+                    for parent_node_id, node_id in zip(
+                        stack, stack[1:unfolded_stack_size]
+                    )
+                ):
+                    is_cut_short = True
+                    break
+
+                # or folded, the chunk is then added to the fold
+                folded_id = next(
+                    (
+                        node_id
+                        for node_id in stack[:parent_stack_size]
+                        if node_id in self.__folds
+                    ),
+                    None,
+                )
+                if folded_id is not None:
+                    self.__fold_path_open(stack[:parent_stack_size][-1])
+
+                fold = None
+
+                for depth, title in chunk:
+                    if not 0 < depth + 1 <= len(stack) or (
+                        depth == 0 and root_id is not None
+                    ):
+                        error = MindMapError(f"unexpected node depth {depth}")
+                        break
+
+                    del stack[depth + 1:]
+
+                    if folded_depth is not None and depth > folded_depth:
+                        node_id = self.__store.node_reserve(stack[-1])
+                        stack.append(node_id)
+
+                        fold[1].append(node_id)
+                        fold[2].append(depth - folded_depth)
+                        fold[3].append(title)
+                        continue
+
+                    if fold is not None:
+                        self.__fold_set(*fold)
+                        fold = None
+
+                    node_id = self.__node_add(stack[-1], False)
+                    node_ids.append(node_id)
+                    stack.append(node_id)
+
+                    if title:
+                        self.__store.set_title(node_id, title, False)
+                        self.__title_index.node_add(node_id, title)
+
+                    if root_id is None:
+                        root_id = node_id
+
+                    if depth == folded_depth:
+                        fold = (node_id, [], [], [])
+
+                if fold is not None:
+                    self.__fold_set(*fold)
+
+                if node_ids and is_first_chunk:
+                    self.__store.aggregates_update(root_id)
+
+                    if is_recorded:
+                        self.__history.record(
+                            MindMapHistory.SubtreeEntry(True, root_id, None)
+                        )
+                elif node_ids:
+                    self.__store.aggregates_refresh(root_id)
+
+                if folded_id is not None:
+                    self.__fold(folded_id)
+                    node_ids = []
+
+            if node_ids:
+                event = xindmap.event.Event(
+                    MindMapEvent.subtree_added,
+                    node_id=root_id,
+                    node_ids=node_ids
+                )
+                self.__event_dispatch(event)
+
+            if error is not None:
+                raise error
+
+            if chunk_size is not None:
+                chunk_size *= 2
+
+        if root_id is None:
+            raise MindMapError(f"can not populate from no node")
+
+        return root_id if not is_cut_short else None
 
     def to_dict(self):
-        def to_dict_recursivity(node_id):
-            node = self.__node_id_to_node[node_id]
+        self.title_edit_flush()
+
+        root_dict = {
+            "title": self.__store.title(self.__root_id),
+            "childs": []
+        }
+        stack = [(self.__root_id, root_dict)]
+
+        while stack:
+            node_id, node_dict = stack.pop()
+
+            fold = self.__folds.get(node_id)
+            if fold is not None:
+                dict_stack = [node_dict]
+
+                for depth, title in fold.nodes():
+                    del dict_stack[depth:]
+
+                    child_dict = {
+                        "title": title,
+                        "childs": []
+                    }
+                    dict_stack[-1]["childs"].append(child_dict)
+                    dict_stack.append(child_dict)
 
-            node_dict = {
-                "title": node.title,
-                "childs": []
-            }
-            
-            for child_id in node.child_ids():
-                node_dict["childs"].append(to_dict_recursivity(child_id))
+                continue
 
-            return node_dict
+            for child_id in self.__store.child_ids(node_id):
+                child_dict = {
+                    "title": self.__store.title(child_id),
+                    "childs": []
+                }
+                node_dict["childs"].append(child_dict)
 
-        return to_dict_recursivity(self.root_node_id)
+                stack.append((child_id, child_dict))
+
+        return root_dict
 
     # edit *********************************************************************
     def add_text(self, text):
@@ -75,140 +427,885 @@ class MindMap(xindmap.event.EventSource, xindmap.editable.Editable):
 
         text = text.replace("\n", "")
 
-        node = self.__node_id_to_node[self.__current_node_id]
-        node.title += text
+        if not text:
+            return
 
-        event = xindmap.event.Event(MindMapEvent.node_title_set, node_id=node.id, title=node.title)
-        self._dispatch_event(event)
+        with self.__lock:
+            self.__title_buffer_open().insert(text)
+
+        self.__title_edited()
+
+    def cursor_move(self, offset):
+        if self.__current_node_id is None:
+            return
+
+        with self.__lock:
+            self.__title_buffer_open().cursor_move(offset)
+
+        self.__title_edited()
+
+    def cursor_move_to_end(self):
+        if self.__current_node_id is None:
+            return
+
+        with self.__lock:
+            title_buffer = self.__title_buffer_open()
+            title_buffer.cursor_move_to(len(title_buffer))
+
+        self.__title_edited()
+
+    def cursor_move_to_start(self):
+        if self.__current_node_id is None:
+            return
+
+        with self.__lock:
+            self.__title_buffer_open().cursor_move_to(0)
+
+        self.__title_edited()
+
+    def edit_end(self):
+        """Ends the edition of the title of the current node, flushing it."""
+        self.__title_buffer_close()
 
     def remove_last_char(self):
         if self.__current_node_id is None:
             return
 
-        node = self.__node_id_to_node[self.__current_node_id]
-        node.title = node.title[:-1]
+        with self.__lock:
+            is_removed = self.__title_buffer_open().delete_before()
+
+        if is_removed:
+            self.__title_edited()
+
+    def remove_next_char(self):
+        if self.__current_node_id is None:
+            return
+
+        with self.__lock:
+            is_removed = self.__title_buffer_open().delete_after()
+
+        if is_removed:
+            self.__title_edited()
+
+    def title_edit_flush(self):
+        """Writes the title being edited to the mind map.
+
+        Edits of the current node title are made in a
+        [gap buffer][xindmap.mind_map.MindMapTitleBuffer.MindMapTitleBuffer]
+        and only dispatch a
+        [title edited][xindmap.mind_map.MindMapEvent.MindMapEvent.node_title_edited]
+        event on the first edit since the last flush.
+        Flushing stores the title, records it in the history and dispatches a
+        single [title set][xindmap.mind_map.MindMapEvent.MindMapEvent.node_title_set]
+        event, it is meant to be called once per rendered frame.
+
+        Every operation reading the stored titles flushes first.
+        """
+        with self.__lock:
+            if not self.__title_buffer_is_pending:
+                return
+
+            self.__title_buffer_is_pending = False
+
+            node_id = self.__title_buffer.node_id
+            cursor = self.__title_buffer.cursor
+            title = self.__title_buffer.title()
+            previous_title = self.__store.title(node_id)
+
+            if title != previous_title:
+                self.__store.set_title(node_id, title)
+                self.__title_index.node_title_set(node_id, previous_title, title)
+                self.__history.record(
+                    MindMapHistory.TitleEntry(node_id, previous_title, title, True)
+                )
+
+        self.__title_set_dispatch(node_id, title, cursor)
+
+    def __title_buffer_close(self):
+        self.title_edit_flush()
+
+        with self.__lock:
+            title_buffer = self.__title_buffer
+            self.__title_buffer = None
+
+        if title_buffer is not None and self.__store.node_exists(title_buffer.node_id):
+            self.__title_set_dispatch(
+                title_buffer.node_id, self.__store.title(title_buffer.node_id)
+            )
+
+    def __title_buffer_open(self):
+        node_id = self.__current_node_id
+
+        if self.__title_buffer is None or self.__title_buffer.node_id != node_id:
+            self.__title_buffer = MindMapTitleBuffer(node_id, self.__store.title(node_id))
+
+        return self.__title_buffer
+
+    def __title_edited(self):
+        with self.__lock:
+            if self.__title_buffer_is_pending:
+                return
+
+            self.__title_buffer_is_pending = True
+            node_id = self.__title_buffer.node_id
+
+        event = xindmap.event.Event(MindMapEvent.node_title_edited, node_id=node_id)
+        self.__event_dispatch(event)
+
+    # event ********************************************************************
+    def __event_dispatch(self, event):
+        if self.__transaction_events is not None:
+            self.__transaction_events.append(event)
+            return
 
-        event = xindmap.event.Event(MindMapEvent.node_title_set, node_id=node.id, title=node.title)
         self._dispatch_event(event)
 
+    # fold *********************************************************************
+    def __fold(self, node_id):
+        """Folds the subtree of a node, without dispatching.
+
+        Returns:
+            The ids of the folded nodes and whether the current node is one of
+            them.
+        """
+        node_ids = self.__store.subtree_ids_pre_order(node_id)[1:]
+
+        if not node_ids:
+            return node_ids, False
+
+        depth = self.__store.depth(node_id)
+        depths = []
+        titles = []
+        folds = {}
+
+        for folded_node_id in node_ids:
+            title = self.__store.title(folded_node_id)
+            self.__title_index.node_remove(folded_node_id, title)
+            depths.append(self.__store.depth(folded_node_id) - depth)
+            titles.append(title)
+
+            if folded_node_id in self.__folds:
+                folds[folded_node_id] = self.__folds.pop(folded_node_id)
+
+        child_hash_sum = self.__store.subtree_fold(node_id)
+        self.__folds[node_id] = MindMapFold(
+            node_ids, depths, titles, child_hash_sum, folds
+        )
+
+        if (
+            self.__title_buffer is not None
+            and not self.__store.node_exists(self.__title_buffer.node_id)
+        ):
+            self.__title_buffer = None
+
+        is_current_node_folded = self.__store.node_is_reserved(
+            self.__current_node_id
+        ) if self.__current_node_id is not None else False
+
+        return node_ids, is_current_node_folded
+
+    def __fold_open(self, node_id, levels):
+        """Adds back the nodes of the fold of a node, without dispatching.
+
+        The nodes more than `levels` levels below the node are folded again
+        under the nodes of the last added level, the whole subtree is added
+        back if `levels` is [`None`][].
+
+        Returns:
+            The ids of the added nodes in pre order.
+        """
+        fold = self.__folds.pop(node_id)
+        self.__store.fold_remove(node_id)
+
+        node_ids = []
+        stack = [node_id]
+        refold = None
+
+        for folded_node_id, depth, title in fold.expanded_entries():
+            if levels is not None and depth > levels:
+                refold[1].append(folded_node_id)
+                refold[2].append(depth - levels)
+                refold[3].append(title)
+                continue
+
+            if refold is not None:
+                self.__fold_set(*refold)
+                refold = None
+
+            del stack[depth:]
+            parent_id = stack[-1]
+
+            self.__store.node_restore(
+                folded_node_id, parent_id, self.__store.last_child_id(parent_id), False
+            )
+
+            if title:
+                self.__store.set_title(folded_node_id, title, False)
+                self.__title_index.node_add(folded_node_id, title)
+
+            node_ids.append(folded_node_id)
+            stack.append(folded_node_id)
+
+            if depth == levels:
+                refold = (folded_node_id, [], [], [])
+
+        if refold is not None:
+            self.__fold_set(*refold)
+
+        self.__store.aggregates_refresh(node_id)
+
+        return node_ids
+
+    def __fold_path_open(self, node_id):
+        """Adds back a node hidden in a fold and unfolds it, one level at a
+        time, without dispatching.
+        """
+        ancestor_ids = []
+        ancestor_id = node_id
+
+        while self.__store.node_is_reserved(ancestor_id):
+            ancestor_id = self.__store.parent_id(ancestor_id)
+            ancestor_ids.append(ancestor_id)
+
+        for ancestor_id in reversed(ancestor_ids):
+            self.__fold_open(ancestor_id, 1)
+
+        if node_id in self.__folds:
+            self.__fold_open(node_id, 1)
+
+    @staticmethod
+    def __fold_renumber(fold, node_id, store, node_id_to_new_id):
+        """Reserves new ids in a store for the nodes of a fold, in pre order.
+
+        Returns:
+            The fold with the new ids.
+        """
+        new_ids = []
+        folds = {}
+        stack = [node_id]
+
+        for folded_node_id, depth, _ in fold.entries():
+            del stack[depth:]
+
+            new_id = store.node_reserve(stack[-1])
+            node_id_to_new_id[folded_node_id] = new_id
+            new_ids.append(new_id)
+            stack.append(new_id)
+
+            nested_fold = fold.folds.get(folded_node_id)
+            if nested_fold is not None:
+                folds[new_id] = MindMap.__fold_renumber(
+                    nested_fold, new_id, store, node_id_to_new_id
+                )
+
+        return fold.renumbered(new_ids, folds)
+
+    def __fold_set(self, node_id, node_ids, depths, titles):
+        """Folds a node added without propagation over the nodes of its
+        subtree, whose ids are reserved.
+        """
+        if not node_ids:
+            return
+
+        child_hash_sum = MindMapStore.fold_child_hash_sum(zip(depths, titles))
+        self.__folds[node_id] = MindMapFold(node_ids, depths, titles, child_hash_sum)
+        self.__store.fold_set(node_id, child_hash_sum)
+
+    def node_fold(self, node_id=None):
+        """Folds the subtree of a node.
+
+        The descendants of the node are taken out of the mind map into a
+        compact [fold][xindmap.mind_map.MindMapFold.MindMapFold], their ids
+        being kept for them until they are
+        [unfolded][xindmap.mind_map.MindMap.MindMap.node_unfold].
+        Folding changes neither the content of the mind map nor its
+        [hash][xindmap.mind_map.MindMap.MindMap.node_hash] and is not recorded
+        in the history, folded nodes are however out of reach of the other
+        operations, such as the search.
+        The current node, if folded, is moved to the folded node.
+
+        Dispatches a [node folded][xindmap.mind_map.MindMapEvent.MindMapEvent.node_folded]
+        event with the ids of the folded nodes, nothing if the node has no
+        children.
+        """
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        self.title_edit_flush()
+
+        with self.__lock:
+            node_ids, is_current_node_folded = self.__fold(node_id)
+
+        if not node_ids:
+            return
+
+        event = xindmap.event.Event(
+            MindMapEvent.node_folded, node_id=node_id, node_ids=node_ids
+        )
+        self.__event_dispatch(event)
+
+        if is_current_node_folded:
+            self.node_select(node_id)
+
+    def node_is_folded(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        return node_id in self.__folds
+
+    def node_is_hidden(self, node_id):
+        """Tells whether a node is hidden in the fold of one of its ancestors,
+        out of the mind map until it is
+        [revealed][xindmap.mind_map.MindMap.MindMap.node_reveal].
+        """
+        return self.__store.node_is_reserved(node_id)
+
+    def __node_open(self, node_id):
+        """Reveals a node and unfolds it, for children to be added under it."""
+        self.node_reveal(node_id)
+
+        if node_id in self.__folds:
+            self.node_unfold(node_id, 1)
+
+    def node_reveal(self, node_id):
+        """Unfolds the ancestors of a folded node, one level at a time, so that
+        it is back in the mind map.
+
+        Does nothing if the node is not folded.
+
+        Raises:
+            MindMapError: If the node is unknown.
+        """
+        with self.__lock:
+            if not self.__store.node_is_reserved(node_id):
+                if not self.__store.node_exists(node_id):
+                    raise MindMapError(f"unknown node id {node_id}")
+
+                return
+
+            ancestor_ids = []
+            ancestor_id = node_id
+
+            while self.__store.node_is_reserved(ancestor_id):
+                ancestor_id = self.__store.parent_id(ancestor_id)
+                ancestor_ids.append(ancestor_id)
+
+        for ancestor_id in reversed(ancestor_ids):
+            self.node_unfold(ancestor_id, 1)
+
+    def node_unfold(self, node_id=None, levels=None):
+        """Unfolds the subtree of a folded node.
+
+        The folded nodes are added back with their ids, the deeper ones being
+        left folded under the nodes of the last unfolded level.
+        Unfolding costs the size of the fold, the nodes left folded only being
+        moved to new folds.
+
+        Dispatches a [node unfolded][xindmap.mind_map.MindMapEvent.MindMapEvent.node_unfolded]
+        event with the ids of the unfolded nodes, nothing if the node is not
+        folded.
+
+        Args:
+            node_id: The id of the folded node, the current node if [`None`][].
+            levels: The number of levels to unfold below the node, the whole
+                subtree is unfolded if [`None`][].
+
+        Returns:
+            The ids of the unfolded nodes in pre order.
+        """
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        if levels is not None and levels < 1:
+            raise MindMapError(f"can not unfold {levels} levels")
+
+        with self.__lock:
+            if node_id not in self.__folds:
+                return []
+
+            node_ids = self.__fold_open(node_id, levels)
+
+        event = xindmap.event.Event(
+            MindMapEvent.node_unfolded, node_id=node_id, node_ids=node_ids
+        )
+        self.__event_dispatch(event)
+
+        return node_ids
+
+    def unfold_all(self):
+        """Unfolds every folded node, such as before editing the mind map as a
+        whole.
+        """
+        while True:
+            with self.__lock:
+                node_id = next(iter(self.__folds), None)
+
+            if node_id is None:
+                return
+
+            self.node_unfold(node_id)
+
+    # history ******************************************************************
+    def __entry_revert(self, entry):
+        """Reverts an entry of the history.
+
+        Returns:
+            The entry reverting this revert and the id of the node the most
+            related to the revert still in the mind map, if any.
+        """
+        if isinstance(entry, MindMapHistory.GroupEntry):
+            reverted_entries = []
+            node_id = None
+
+            with self.transaction():
+                for grouped_entry in reversed(entry.entries):
+                    reverted_entry, node_id = self.__entry_revert(grouped_entry)
+                    reverted_entries.append(reverted_entry)
+
+            return MindMapHistory.GroupEntry(reverted_entries), node_id
+
+        # the nodes of the entry may have been folded since
+        if isinstance(entry, MindMapHistory.MoveEntry):
+            self.node_reveal(entry.node_id)
+            self.__node_open(entry.previous_parent_id)
+
+            with self.__lock:
+                reverted_entry = self.__node_move(
+                    entry.node_id,
+                    entry.previous_parent_id,
+                    entry.previous_previous_sibling_id,
+                )
+
+            self.__node_moved_dispatch(reverted_entry)
+
+            return reverted_entry, entry.node_id
+
+        if isinstance(entry, MindMapHistory.TitleEntry):
+            self.node_reveal(entry.node_id)
+
+            with self.__lock:
+                self.__title_set(entry.node_id, entry.previous_title)
+
+            self.__title_set_dispatch(entry.node_id, entry.previous_title)
+
+            reverted_entry = MindMapHistory.TitleEntry(
+                entry.node_id, entry.title, entry.previous_title, False
+            )
+
+            return reverted_entry, entry.node_id
+
+        if entry.is_addition:
+            self.node_reveal(entry.node_id)
+
+            subtree = self.__subtree_delete(entry.node_id)
+            reverted_entry = MindMapHistory.SubtreeEntry(False, entry.node_id, subtree)
+            parent_id = subtree.parent_ids[0]
+
+            return reverted_entry, parent_id if parent_id != -1 else None
+
+        if entry.subtree.parent_ids[0] != -1:
+            self.__node_open(entry.subtree.parent_ids[0])
+
+        self.__subtree_restore(entry.subtree)
+        reverted_entry = MindMapHistory.SubtreeEntry(True, entry.node_id, None)
+
+        return reverted_entry, entry.node_id
+
+    @property
+    def edit_count(self):
+        """The number of edits made, undone or redone so far, telling whether
+        the mind map was edited in between two reads.
+
+        Selecting, folding and unfolding nodes are not edits, neither is the
+        addition of a subtree not recorded in the history.
+        """
+        return self.__history.edit_count
+
+    def history_clear(self):
+        """Forgets every edit made so far, they can no longer be undone."""
+        with self.__lock:
+            self.__history.clear()
+
+    def redo(self):
+        """Redoes the latest undone edit.
+
+        Returns:
+            The id of the node the most related to the redone edit, [`None`][]
+            if there was nothing to redo or if the mind map is now empty.
+        """
+        self.title_edit_flush()
+
+        entry = self.__history.redo_pop()
+
+        if entry is None:
+            return None
+
+        reverted_entry, node_id = self.__entry_revert(entry)
+        self.__history.undo_push(reverted_entry)
+
+        return node_id
+
+    def undo(self):
+        """Undoes the latest edit.
+
+        Deleted nodes are restored with their former ids.
+
+        Returns:
+            The id of the node the most related to the undone edit, [`None`][]
+            if there was nothing to undo or if the mind map is now empty.
+        """
+        self.title_edit_flush()
+
+        entry = self.__history.undo_pop()
+
+        if entry is None:
+            return None
+
+        reverted_entry, node_id = self.__entry_revert(entry)
+        self.__history.redo_push(reverted_entry)
+
+        return node_id
 
     # node *********************************************************************
     def node_add(self, parent_id=None):
         if parent_id is None:
             parent_id = self.__current_node_id
 
-        if self.__root is None:
-            node = MindNode(None)
-            self.__root = node
-        elif parent_id in self.__node_id_to_node:
-            node = MindNode(self.__node_id_to_node[parent_id])
-            parent = self.__node_id_to_node[parent_id]
-            parent.add_child(node)
+        if self.__store.node_exists(parent_id):
+            self.__node_open(parent_id)
+
+        with self.__lock:
+            node_id = self.__node_add(parent_id)
+            self.__history.record(MindMapHistory.SubtreeEntry(True, node_id, None))
+
+        event = xindmap.event.Event(MindMapEvent.node_added, node_id=node_id)
+        self.__event_dispatch(event)
+
+        return node_id
+
+    def __node_add(self, parent_id, propagate=True):
+        if self.__root_id is None:
+            node_id = self.__store.node_add(-1, propagate)
+            self.__root_id = node_id
+        elif self.__store.node_exists(parent_id):
+            node_id = self.__store.node_add(parent_id, propagate)
         else:
             raise MindMapError(f"unknown node id {parent_id}")
 
-        self.__node_id_to_node[node.id] = node
+        return node_id
 
-        event = xindmap.event.Event(MindMapEvent.node_added, node_id=node.id)
-        self._dispatch_event(event)
+    def node_child_ids(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
 
-        return node.id
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
 
-    def node_child_ids(self, node_id=None):
+        return self.__store.child_ids(node_id)
+
+    def node_delete(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node if {node_id}")
+
+        subtree = self.__subtree_delete(node_id)
+
+        with self.__lock:
+            self.__history.record(MindMapHistory.SubtreeEntry(False, node_id, subtree))
+
+    def node_depth(self, node_id=None):
         if node_id is None:
             node_id = self.__current_node_id
 
-        if node_id not in self.__node_id_to_node:
+        if not self.__store.node_exists(node_id):
             raise MindMapError(f"unknown node id {node_id}")
 
-        node = self.__node_id_to_node[node_id]
+        return self.__store.depth(node_id)
 
-        return node.child_ids()
+    def node_first_child_id(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
 
-    def node_delete(self, node_id=None):
-        def node_delete_recursivity(node_id):
-            node = self.__node_id_to_node[node_id]
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
 
-            for child_id in node.child_ids():
-                node_delete_recursivity(child_id)
+        first_child_id = self.__store.first_child_id(node_id)
 
-            if node.parent is not None:
-                node.parent.remove_child(node)
+        return first_child_id if first_child_id != -1 else None
 
-            del self.__node_id_to_node[node.id]
+    def node_hash(self, node_id=None):
+        """Returns the hash of the content of the subtree of a node.
 
-            if node == self.__root:
-                self.__root = None
-            if node_id == self.__current_node_id:
-                self.node_unselect()
+        Subtrees with the same titles in the same shape have the same hash
+        whatever their node ids, the hash of the root thus tells whether a
+        mind map changed.
+        The title being edited in the gap buffer only counts once flushed.
+        """
+        if node_id is None:
+            node_id = self.__current_node_id
 
-            event = xindmap.event.Event(MindMapEvent.node_deleted, node_id=node_id)
-            self._dispatch_event(event)
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        return self.__store.node_hash(node_id)
 
+    def node_height(self, node_id=None):
         if node_id is None:
             node_id = self.__current_node_id
 
-        if node_id not in self.__node_id_to_node:
-            raise MindMapError(f"unknown node if {node_id}")
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
 
-        node_delete_recursivity(node_id)
+        return self.__store.height(node_id)
 
     def node_id_exists(self, node_id):
-        return node_id in self.__node_id_to_node
+        return self.__store.node_exists(node_id)
+
+    def node_last_child_id(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        last_child_id = self.__store.last_child_id(node_id)
+
+        return last_child_id if last_child_id != -1 else None
+
+    def node_move(self, node_id, parent_id, position=None):
+        """Moves a node and its subtree under a new parent.
+
+        Nodes keep their ids.
+        The place of the node is found by walking the children of the new
+        parent up to `position`, [`node_move_after`][xindmap.mind_map.MindMap.MindMap.node_move_after]
+        finds it in a constant time from a sibling instead.
+        Reordering a node among its siblings then costs a constant time,
+        moving it under another parent costs the depth of both parents plus
+        the size of the subtree whose depths are updated.
+
+        Args:
+            node_id: The id of the node to move.
+            parent_id: The id of the new parent.
+            position:
+                The index of the node among the children of its new parent,
+                last if [`None`][].
+
+        Raises:
+            MindMapError: If a node is unknown, if the node is the root or if
+                the new parent is in the subtree of the node.
+        """
+        self.__node_move_check(node_id, parent_id)
+        self.__node_open(parent_id)
+
+        with self.__lock:
+            previous_sibling_id = self.__store.last_child_id(parent_id)
+
+            if position is not None:
+                previous_sibling_id = -1
+                child_id = self.__store.first_child_id(parent_id)
+
+                while child_id != -1 and position > 0:
+                    if child_id != node_id:
+                        previous_sibling_id = child_id
+                        position -= 1
+                    child_id = self.__store.next_sibling_id(child_id)
+
+            if previous_sibling_id == node_id:
+                previous_sibling_id = self.__store.previous_sibling_id(node_id)
+
+            entry = self.__node_move(node_id, parent_id, previous_sibling_id)
+            self.__history.record(entry)
+
+        self.__node_moved_dispatch(entry)
+
+    def node_move_after(self, node_id, parent_id, previous_sibling_id=None):
+        """Moves a node and its subtree under a new parent, right after one of
+        its children.
+
+        Unlike [`node_move`][xindmap.mind_map.MindMap.MindMap.node_move], the
+        place of the node is found in a constant time, whatever the number of
+        children of the new parent.
+
+        Args:
+            node_id: The id of the node to move.
+            parent_id: The id of the new parent.
+            previous_sibling_id:
+                The id of the child of the new parent the node is placed
+                after, first if [`None`][].
+
+        Raises:
+            MindMapError: If a node is unknown, if the node is the root, if the
+                new parent is in the subtree of the node or if the previous
+                sibling is not a child of the new parent.
+        """
+        self.__node_move_check(node_id, parent_id)
+        self.__node_open(parent_id)
+
+        if previous_sibling_id is None:
+            previous_sibling_id = -1
+        elif (
+            not self.__store.node_exists(previous_sibling_id)
+            or self.__store.parent_id(previous_sibling_id) != parent_id
+        ):
+            raise MindMapError(
+                f"node {previous_sibling_id} is not a child of node {parent_id}"
+            )
+
+        with self.__lock:
+            if previous_sibling_id == node_id:
+                previous_sibling_id = self.__store.previous_sibling_id(node_id)
+
+            entry = self.__node_move(node_id, parent_id, previous_sibling_id)
+            self.__history.record(entry)
+
+        self.__node_moved_dispatch(entry)
+
+    def __node_move(self, node_id, parent_id, previous_sibling_id):
+        """Moves a node right after a given sibling, `-1` for first child.
+
+        Returns:
+            The [entry][xindmap.mind_map.MindMapHistory.MindMapHistory.MoveEntry]
+            of the move.
+        """
+        entry = MindMapHistory.MoveEntry(
+            node_id,
+            self.__store.parent_id(node_id),
+            self.__store.previous_sibling_id(node_id),
+            parent_id,
+            previous_sibling_id,
+        )
+
+        self.__store.node_move(node_id, parent_id, previous_sibling_id)
+
+        return entry
+
+    def __node_move_check(self, node_id, parent_id):
+        for checked_node_id in (node_id, parent_id):
+            if not self.__store.node_exists(checked_node_id):
+                raise MindMapError(f"unknown node id {checked_node_id}")
+
+        if node_id == self.__root_id:
+            raise MindMapError(f"can not move root node {node_id}")
+
+        if parent_id == node_id or self.__store.is_ancestor(node_id, parent_id):
+            raise MindMapError(f"can not move node {node_id} under its own subtree")
+
+    def __node_moved_dispatch(self, entry):
+        event = xindmap.event.Event(
+            MindMapEvent.node_moved,
+            node_id=entry.node_id,
+            previous_parent_id=entry.previous_parent_id,
+            parent_id=entry.parent_id,
+            previous_sibling_id=(
+                entry.previous_sibling_id if entry.previous_sibling_id != -1 else None
+            ),
+        )
+        self.__event_dispatch(event)
+
+    def node_next_sibling_id(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        next_sibling_id = self.__store.next_sibling_id(node_id)
+
+        return next_sibling_id if next_sibling_id != -1 else None
 
     def node_parent_id(self, node_id=None):
         if node_id is None:
             node_id = self.__current_node_id
 
-        if node_id not in self.__node_id_to_node:
+        if not self.__store.node_exists(node_id):
             raise MindMapError(f"unknown node id {node_id}")
 
-        node = self.__node_id_to_node[node_id]
+        parent_id = self.__store.parent_id(node_id)
 
-        return node.parent.id if node.parent is not None else None
+        return parent_id if parent_id != -1 else None
+
+    def node_previous_sibling_id(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        previous_sibling_id = self.__store.previous_sibling_id(node_id)
+
+        return previous_sibling_id if previous_sibling_id != -1 else None
 
     def node_select(self, node_id):
-        if node_id not in self.__node_id_to_node:
+        if not self.__store.node_exists(node_id):
             raise MindMapError(f"unknown node id {node_id}")
+
+        if node_id != self.__current_node_id:
+            self.__title_buffer_close()
+
         previous_node_id = self.__current_node_id
         self.__current_node_id = node_id
+        self.__history.checkpoint()
 
         event = xindmap.event.Event(
             MindMapEvent.node_selected,
             previous_node_id=previous_node_id,
             node_id=node_id,
         )
-        self._dispatch_event(event)
+        self.__event_dispatch(event)
 
     def node_set_title(self, title, node_id=None):
         if node_id is None:
             node_id = self.__current_node_id
 
-        if node_id not in self.__node_id_to_node:
+        if not self.__store.node_exists(node_id):
             raise MindMapError(f"unknown node id {node_id}")
 
-        node = self.__node_id_to_node[node_id]
-        node.title = title
+        self.title_edit_flush()
 
-        event = xindmap.event.Event(
-            MindMapEvent.node_title_set,
-            node_id=node_id,
-            title=title
-        )
-        self._dispatch_event(event)
+        with self.__lock:
+            previous_title = self.__title_set(node_id, title)
+            self.__history.record(
+                MindMapHistory.TitleEntry(node_id, previous_title, title, False)
+            )
+
+        self.__title_set_dispatch(node_id, title)
+
+    def node_subtree_size(self, node_id=None):
+        if node_id is None:
+            node_id = self.__current_node_id
+
+        if not self.__store.node_exists(node_id):
+            raise MindMapError(f"unknown node id {node_id}")
+
+        return self.__store.subtree_size(node_id)
 
     def node_title(self, node_id=None):
         if node_id is None:
             node_id = self.__current_node_id
 
-        if node_id not in self.__node_id_to_node:
+        if not self.__store.node_exists(node_id):
             raise MindMapError(f"unknown node id {node_id}")
 
-        node = self.__node_id_to_node[node_id]
+        title_buffer = self.__title_buffer
+        if title_buffer is not None and title_buffer.node_id == node_id:
+            return title_buffer.title()
 
-        return node.title
+        return self.__store.title(node_id)
 
     def node_unselect(self):
+        self.__title_buffer_close()
+
         previous_node_id = self.__current_node_id
         self.__current_node_id = None
 
@@ -216,14 +1313,308 @@ class MindMap(xindmap.event.EventSource, xindmap.editable.Editable):
             MindMapEvent.node_unselected,
             previous_node_id=previous_node_id
         )
-        self._dispatch_event(event)
+        self.__event_dispatch(event)
 
 
     # root *********************************************************************
     @property
     def root_node_id(self):
-        return self.__root.id if self.__root is not None else None
+        return self.__root_id
+
+    # search *******************************************************************
+    def node_search(self, query, limit=None):
+        """Searches the nodes whose title contains a query, ignoring case.
+
+        Nodes are ranked by exact match first, then match at the start of the
+        title, then match at the start of a word, then position of the match
+        and finally title length.
+
+        Args:
+            query: The text to search.
+            limit: The maximum number of node ids to return, all if [`None`][].
+
+        Returns:
+            The ranked list of matching node ids.
+        """
+        self.title_edit_flush()
+
+        query = query.casefold()
+
+        if not query:
+            return []
+
+        candidate_ids = self.__title_index.candidate_ids(query)
+
+        if candidate_ids is None and self.__root_id is None:
+            candidate_ids = []
+        elif candidate_ids is None:
+            candidate_ids = self.__store.subtree_ids(self.__root_id)
+
+        ranked_node_ids = []
+        for node_id in candidate_ids:
+            title = self.__store.title(node_id).casefold()
+            index = title.find(query)
+
+            if index == -1:
+                continue
+
+            if index == 0:
+                match_rank = 0 if len(title) == len(query) else 1
+            elif title[index - 1].isspace():
+                match_rank = 2
+            else:
+                match_rank = 3
+
+            ranked_node_ids.append((match_rank, index, len(title), node_id))
+
+        if limit is not None:
+            ranked_node_ids = heapq.nsmallest(limit, ranked_node_ids)
+        else:
+            ranked_node_ids.sort()
+
+        return [node_id for _, _, _, node_id in ranked_node_ids]
+
+    # snapshot *****************************************************************
+    def snapshot(self):
+        """Takes an immutable
+        [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot] of this
+        mind map.
+
+        The snapshot shares the parts of the mind map left unchanged since the
+        previous snapshot, its cost is proportional to the changes made since
+        then.
+        The title being edited is taken as of its last
+        [flush][xindmap.mind_map.MindMap.MindMap.title_edit_flush].
+        Folded subtrees are shared with the snapshot as they are.
+        """
+        with self.__lock:
+            return self.__store.snapshot(self.__root_id, dict(self.__folds))
 
     # size *********************************************************************
     def __len__(self):
-        return len(self.__node_id_to_node)
+        return len(self.__store)
+
+    # subtree ******************************************************************
+    def __subtree_delete(self, node_id):
+        """Removes a subtree and dispatches the deletion of its nodes.
+
+        Returns:
+            The [content][xindmap.mind_map.MindMapHistory.MindMapHistory.Subtree]
+            of the removed subtree.
+        """
+        self.title_edit_flush()
+
+        with self.__lock:
+            # the history keeps the subtree as a whole, folded nodes included
+            for subtree_node_id in self.__store.subtree_ids_pre_order(node_id):
+                if subtree_node_id in self.__folds:
+                    self.__fold_open(subtree_node_id, None)
+
+            subtree_node_ids = self.__store.subtree_ids_pre_order(node_id)
+            parent_ids = []
+            titles = []
+
+            for subtree_node_id in subtree_node_ids:
+                title = self.__store.title(subtree_node_id)
+                self.__title_index.node_remove(subtree_node_id, title)
+                parent_ids.append(self.__store.parent_id(subtree_node_id))
+                titles.append(title)
+
+            subtree = MindMapHistory.Subtree(
+                subtree_node_ids,
+                parent_ids,
+                titles,
+                self.__store.previous_sibling_id(node_id),
+            )
+
+            if node_id == self.__root_id:
+                self.__root_id = None
+
+            node_ids = self.__store.subtree_remove(node_id)
+
+            if (
+                self.__title_buffer is not None
+                and not self.__store.node_exists(self.__title_buffer.node_id)
+            ):
+                self.__title_buffer = None
+
+        for node_id in node_ids:
+            if node_id == self.__current_node_id:
+                self.node_unselect()
+
+            event = xindmap.event.Event(MindMapEvent.node_deleted, node_id=node_id)
+            self.__event_dispatch(event)
+
+        return subtree
+
+    def __subtree_restore(self, subtree):
+        """Adds back a removed subtree with its former ids and dispatches its
+        addition.
+        """
+        with self.__lock:
+            previous_sibling_id = subtree.previous_sibling_id
+
+            for node_id, parent_id, title in zip(
+                subtree.node_ids, subtree.parent_ids, subtree.titles
+            ):
+                if parent_id == -1:
+                    self.__root_id = node_id
+
+                # below the subtree root, nodes come in pre order and are
+                # appended to their parent
+                if node_id != subtree.node_ids[0]:
+                    previous_sibling_id = self.__store.last_child_id(parent_id)
+
+                self.__store.node_restore(node_id, parent_id, previous_sibling_id, False)
+                self.__store.set_title(node_id, title, False)
+                self.__title_index.node_add(node_id, title)
+
+            self.__store.aggregates_update(subtree.node_ids[0])
+
+        event = xindmap.event.Event(
+            MindMapEvent.subtree_added,
+            node_id=subtree.node_ids[0],
+            node_ids=subtree.node_ids,
+        )
+        self.__event_dispatch(event)
+
+    # title ********************************************************************
+    def __title_set(self, node_id, title):
+        # a title set from elsewhere than the gap buffer makes it stale
+        if self.__title_buffer is not None and self.__title_buffer.node_id == node_id:
+            self.__title_buffer = None
+
+        previous_title = self.__store.title(node_id)
+        self.__store.set_title(node_id, title)
+        self.__title_index.node_title_set(node_id, previous_title, title)
+
+        return previous_title
+
+    def __title_set_dispatch(self, node_id, title, cursor=None):
+        event = xindmap.event.Event(
+            MindMapEvent.node_title_set,
+            node_id=node_id,
+            title=title,
+            cursor=cursor,
+        )
+        self.__event_dispatch(event)
+
+    # transaction **************************************************************
+    @contextlib.contextmanager
+    def transaction(self):
+        """Groups the edits made within a `with` statement.
+
+        Edits are applied right away but their events are held back until the
+        outermost transaction ends.
+        Additions, deletions, moves and title changes are then consolidated
+        into a single [changed][xindmap.mind_map.MindMapEvent.MindMapEvent.changed]
+        event, followed by the other events in their order.
+        Folds and unfolds are dispatched in their order among the changes, the
+        changes made before each of them being consolidated apart.
+        The edits are undone and redone as a whole.
+
+        The mind map is locked for the other threads during the transaction.
+        """
+        self.__lock.acquire()
+
+        self.__transaction_depth += 1
+        if self.__transaction_depth == 1:
+            self.__transaction_events = []
+            self.__history.group_begin()
+
+        try:
+            yield self
+        finally:
+            self.__transaction_depth -= 1
+
+            events = None
+            if self.__transaction_depth == 0:
+                self.__history.group_end()
+                events = self.__transaction_events
+                self.__transaction_events = None
+
+            self.__lock.release()
+
+            if events is not None:
+                self.__transaction_events_dispatch(events)
+
+    def __transaction_events_dispatch(self, events):
+        other_events = []
+        changed_events = []
+
+        for event in events:
+            # folds and unfolds change which nodes are drawn, the changes made
+            # before them are dispatched first
+            if event.type in (MindMapEvent.node_folded, MindMapEvent.node_unfolded):
+                self.__transaction_changes_dispatch(changed_events)
+                changed_events.clear()
+                self._dispatch_event(event)
+            elif event.type in (
+                MindMapEvent.cleared,
+                MindMapEvent.node_added,
+                MindMapEvent.node_deleted,
+                MindMapEvent.node_moved,
+                MindMapEvent.node_title_set,
+                MindMapEvent.subtree_added,
+            ):
+                changed_events.append(event)
+            else:
+                other_events.append(event)
+
+        self.__transaction_changes_dispatch(changed_events)
+
+        for event in other_events:
+            self._dispatch_event(event)
+
+    def __transaction_changes_dispatch(self, events):
+        """Consolidates additions, deletions, moves and title changes into a
+        single [changed][xindmap.mind_map.MindMapEvent.MindMapEvent.changed]
+        event, preceded by a
+        [cleared][xindmap.mind_map.MindMapEvent.MindMapEvent.cleared] event if
+        the mind map was cleared.
+        """
+        is_cleared = False
+        added_node_ids = {}
+        deleted_node_ids = []
+        moved_node_ids = {}
+        title_set_node_ids = {}
+
+        for event in events:
+            if event.type == MindMapEvent.cleared:
+                is_cleared = True
+                added_node_ids.clear()
+                deleted_node_ids.clear()
+                moved_node_ids.clear()
+                title_set_node_ids.clear()
+            elif event.type == MindMapEvent.node_added:
+                added_node_ids[event.node_id] = None
+            elif event.type == MindMapEvent.subtree_added:
+                added_node_ids.update(dict.fromkeys(event.node_ids))
+            elif event.type == MindMapEvent.node_deleted:
+                # nodes added during the transaction are unknown to the
+                # callbacks, they are simply forgotten
+                if event.node_id in added_node_ids:
+                    del added_node_ids[event.node_id]
+                else:
+                    deleted_node_ids.append(event.node_id)
+                    moved_node_ids.pop(event.node_id, None)
+                    title_set_node_ids.pop(event.node_id, None)
+            elif event.type == MindMapEvent.node_moved:
+                if event.node_id not in added_node_ids:
+                    moved_node_ids[event.node_id] = None
+            elif event.type == MindMapEvent.node_title_set:
+                if event.node_id not in added_node_ids:
+                    title_set_node_ids[event.node_id] = None
+
+        if is_cleared:
+            self._dispatch_event(xindmap.event.Event(MindMapEvent.cleared))
+
+        if added_node_ids or deleted_node_ids or moved_node_ids or title_set_node_ids:
+            event = xindmap.event.Event(
+                MindMapEvent.changed,
+                added_node_ids=list(added_node_ids),
+                deleted_node_ids=deleted_node_ids,
+                moved_node_ids=list(moved_node_ids),
+                title_set_node_ids=list(title_set_node_ids),
+            )
+            self._dispatch_event(event)
@@ -0,0 +1,93 @@
+import threading
+
+
+class MindMapChangeTracker:
+    """Tracks the nodes of a [mind map][xindmap.mind_map.MindMap.MindMap]
+    changed since the changes were last taken, from its
+    [events][xindmap.mind_map.MindMapEvent.MindMapEvent].
+
+    A node is changed when it is added, deleted, moved or retitled.
+    Clearing the mind map, which also happens when it is compacted, changes it
+    as a whole.
+
+    Changes must be taken before the state they are applied from, such as a
+    [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot], is read:
+    an event dispatched late then only makes a node changed once more.
+
+    Attributes:
+        __is_cleared: Whether the mind map was cleared.
+        __lock: Lock guarding the changes, callbacks being called from any
+            thread.
+        __node_ids: The ids of the changed nodes.
+    """
+    # change *******************************************************************
+    @property
+    def is_changed(self):
+        with self.__lock:
+            return self.__is_cleared or bool(self.__node_ids)
+
+    def changes_take(self):
+        """Returns the changes and forgets them.
+
+        Returns:
+            A pair of whether the mind map was cleared, in which case it
+            changed as a whole, and of the set of the ids of the changed nodes.
+        """
+        with self.__lock:
+            changes = self.__is_cleared, self.__node_ids
+
+            self.__is_cleared = False
+            self.__node_ids = set()
+
+        return changes
+
+    def changes_put_back(self, is_cleared, node_ids):
+        """Puts back changes taken but not applied, merging them with the ones
+        made since.
+        """
+        with self.__lock:
+            self.__is_cleared = self.__is_cleared or is_cleared
+            self.__node_ids.update(node_ids)
+
+    def clear(self):
+        """Forgets the changes, the mind map being in sync with its copy."""
+        self.changes_take()
+
+    # constructor **************************************************************
+    def __init__(self):
+        self.__is_cleared = False
+        self.__lock = threading.Lock()
+        self.__node_ids = set()
+
+    # mind map callback ********************************************************
+    def on_mind_map_changed(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.update(event.added_node_ids)
+            self.__node_ids.update(event.deleted_node_ids)
+            self.__node_ids.update(event.moved_node_ids)
+            self.__node_ids.update(event.title_set_node_ids)
+
+    def on_mind_map_cleared(self, mind_map, event):
+        with self.__lock:
+            self.__is_cleared = True
+            self.__node_ids.clear()
+
+    def on_mind_map_node_added(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.add(event.node_id)
+
+    def on_mind_map_node_deleted(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.add(event.node_id)
+
+    def on_mind_map_node_moved(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.add(event.node_id)
+
+    def on_mind_map_node_title_set(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.add(event.node_id)
+
+    def on_mind_map_subtree_added(self, mind_map, event):
+        with self.__lock:
+            self.__node_ids.update(event.node_ids)
@@ -0,0 +1,604 @@
+import bisect
+
+
+class MindMapDiff:
+    """Structural difference between two
+    [snapshots][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot] of mind
+    maps, an old one and a new one.
+
+    Nodes of both snapshots are aligned first, an old node and a new one being
+    matched if they are the same node, possibly moved or retitled.
+    Nodes known to be the same, such as nodes with the same persisted id, can
+    be given as pairs of ids.
+    The other nodes are aligned from the roots down by path and title hashing:
+
+    - the roots are matched;
+    - the children of two matched nodes are matched if their subtrees have
+      the same [hash][xindmap.mind_map.MindMap.MindMap.node_hash], the whole
+      subtrees being matched at once, then if they have the same title, in
+      order;
+    - subtrees left over anywhere are matched if they have the same hash,
+      which finds the moved subtrees, then if they have the same title found
+      once among the ones left over, which finds the moved and edited
+      subtrees;
+    - children still left over under two matched nodes are matched in order,
+      which finds the retitled nodes.
+
+    Every node is visited a constant number of times, besides the sort of the
+    children whose order changed, so that aligning costs a near linear time.
+
+    The difference can then be
+    [applied][xindmap.mind_map.MindMapDiff.MindMapDiff.apply] to the mind
+    map of the old snapshot, turning it into the new one as a single change.
+
+    Attributes:
+        __mixed_new_ids:
+            The new nodes without counterpart having a matched descendant.
+        __mixed_old_ids:
+            The old nodes without counterpart having a matched descendant.
+        __new_snapshot: The new snapshot.
+        __new_to_old_ids: Dictionnary mapping the matched new ids to the old
+            ones.
+        __old_snapshot: The old snapshot.
+        __old_to_new_ids: Dictionnary mapping the matched old ids to the new
+            ones.
+        __whole_new_ids:
+            The matched new nodes whose subtree is matched as a whole.
+    """
+    # align ********************************************************************
+    def __align(self, node_id_pairs):
+        old_snapshot = self.__old_snapshot
+        new_snapshot = self.__new_snapshot
+
+        old_root_id = old_snapshot.root_node_id
+        new_root_id = new_snapshot.root_node_id
+
+        if old_root_id is None or new_root_id is None:
+            return
+
+        self.__match(old_root_id, new_root_id)
+
+        for old_id, new_id in node_id_pairs:
+            if (
+                old_snapshot.node_id_exists(old_id)
+                and new_snapshot.node_id_exists(new_id)
+                and old_id not in self.__old_to_new_ids
+                and new_id not in self.__new_to_old_ids
+            ):
+                self.__match(old_id, new_id)
+
+        # children left over under the matched nodes
+        aligned_new_ids = set()
+        left_overs = []
+
+        stack = list(self.__old_to_new_ids.items())
+        self.__children_align(stack, aligned_new_ids, left_overs, False)
+
+        # moved subtrees
+        old_ids_by_hash = {}
+        for old_ids, _ in left_overs:
+            for old_id in old_ids:
+                old_ids_by_hash.setdefault(old_snapshot.node_hash(old_id), []).append(
+                    old_id
+                )
+
+        for old_ids in old_ids_by_hash.values():
+            old_ids.reverse()
+
+        for _, new_ids in left_overs:
+            for new_id in new_ids:
+                old_ids = old_ids_by_hash.get(new_snapshot.node_hash(new_id))
+
+                while old_ids:
+                    old_id = old_ids.pop()
+
+                    if old_id not in self.__old_to_new_ids:
+                        self.__subtree_match(old_id, new_id)
+                        break
+
+        # moved nodes whose subtree changed, if their title is unique among
+        # the nodes left over
+        old_ids_by_title = {}
+        for old_ids, _ in left_overs:
+            for old_id in old_ids:
+                if old_id not in self.__old_to_new_ids:
+                    old_ids_by_title.setdefault(
+                        old_snapshot.node_title(old_id), []
+                    ).append(old_id)
+
+        new_ids_by_title = {}
+        for _, new_ids in left_overs:
+            for new_id in new_ids:
+                if new_id not in self.__new_to_old_ids:
+                    new_ids_by_title.setdefault(
+                        new_snapshot.node_title(new_id), []
+                    ).append(new_id)
+
+        for title, old_ids in old_ids_by_title.items():
+            new_ids = new_ids_by_title.get(title, ())
+
+            if len(old_ids) == 1 and len(new_ids) == 1:
+                self.__match(old_ids[0], new_ids[0])
+                stack.append((old_ids[0], new_ids[0]))
+
+        # retitled nodes
+        for old_ids, new_ids in left_overs:
+            old_ids = [
+                old_id for old_id in old_ids if old_id not in self.__old_to_new_ids
+            ]
+            new_ids = [
+                new_id for new_id in new_ids if new_id not in self.__new_to_old_ids
+            ]
+
+            for old_id, new_id in zip(old_ids, new_ids):
+                self.__match(old_id, new_id)
+                stack.append((old_id, new_id))
+
+        self.__children_align(stack, aligned_new_ids, None, True)
+
+    def __children_align(self, stack, aligned_new_ids, left_overs, is_in_order):
+        """Aligns the children of matched nodes, then theirs, and so on.
+
+        Args:
+            stack: The pairs of matched nodes whose children to align.
+            aligned_new_ids: The new nodes whose children are aligned already,
+                updated.
+            left_overs: The list the children left over are appended to, as
+                pairs of lists of old and new ids.
+            is_in_order: Whether the children left over are matched in order.
+        """
+        old_snapshot = self.__old_snapshot
+        new_snapshot = self.__new_snapshot
+        old_to_new_ids = self.__old_to_new_ids
+        new_to_old_ids = self.__new_to_old_ids
+
+        while stack:
+            old_id, new_id = stack.pop()
+
+            if new_id in aligned_new_ids or new_id in self.__whole_new_ids:
+                continue
+
+            aligned_new_ids.add(new_id)
+
+            if old_snapshot.node_hash(old_id) == new_snapshot.node_hash(new_id):
+                if self.__subtree_match(old_id, new_id):
+                    continue
+
+            old_child_ids = [
+                child_id
+                for child_id in old_snapshot.node_child_ids(old_id)
+                if child_id not in old_to_new_ids
+            ]
+            new_child_ids = [
+                child_id
+                for child_id in new_snapshot.node_child_ids(new_id)
+                if child_id not in new_to_old_ids
+            ]
+
+            for child_id in new_snapshot.node_child_ids(new_id):
+                if child_id in new_to_old_ids:
+                    stack.append((new_to_old_ids[child_id], child_id))
+
+            if not old_child_ids or not new_child_ids:
+                if left_overs is not None and (old_child_ids or new_child_ids):
+                    left_overs.append((old_child_ids, new_child_ids))
+
+                continue
+
+            # equal subtrees first, then equal titles
+            for old_key, new_key in (
+                (old_snapshot.node_hash, new_snapshot.node_hash),
+                (old_snapshot.node_title, new_snapshot.node_title),
+            ):
+                new_ids_by_key = {}
+                for child_id in reversed(new_child_ids):
+                    new_ids_by_key.setdefault(new_key(child_id), []).append(child_id)
+
+                for child_id in old_child_ids:
+                    new_ids = new_ids_by_key.get(old_key(child_id))
+
+                    if new_ids:
+                        new_child_id = new_ids.pop()
+                        self.__match(child_id, new_child_id)
+                        stack.append((child_id, new_child_id))
+
+                old_child_ids = [
+                    child_id
+                    for child_id in old_child_ids
+                    if child_id not in old_to_new_ids
+                ]
+                new_child_ids = [
+                    child_id
+                    for child_id in new_child_ids
+                    if child_id not in new_to_old_ids
+                ]
+
+            if is_in_order:
+                for child_id, new_child_id in zip(old_child_ids, new_child_ids):
+                    self.__match(child_id, new_child_id)
+                    stack.append((child_id, new_child_id))
+            elif old_child_ids or new_child_ids:
+                left_overs.append((old_child_ids, new_child_ids))
+
+    def __match(self, old_id, new_id):
+        self.__old_to_new_ids[old_id] = new_id
+        self.__new_to_old_ids[new_id] = old_id
+
+    def __subtree_match(self, old_id, new_id):
+        """Matches two subtrees of the same hash node by node.
+
+        Returns:
+            [`False`][] if a node of a subtree is already matched elsewhere,
+            nothing being matched then.
+        """
+        pairs = list(
+            zip(
+                self.__old_snapshot.node_ids(old_id),
+                self.__new_snapshot.node_ids(new_id),
+            )
+        )
+
+        for pair_old_id, pair_new_id in pairs:
+            if (
+                self.__old_to_new_ids.get(pair_old_id, pair_new_id) != pair_new_id
+                or self.__new_to_old_ids.get(pair_new_id, pair_old_id) != pair_old_id
+            ):
+                return False
+
+        for pair_old_id, pair_new_id in pairs:
+            self.__match(pair_old_id, pair_new_id)
+
+        self.__whole_new_ids.add(new_id)
+
+        return True
+
+    # apply ********************************************************************
+    def apply(self, mind_map):
+        """Turns a mind map whose snapshot is the old one into the new one, in
+        one [transaction][xindmap.mind_map.MindMap.MindMap.transaction].
+
+        Matched nodes keep their ids, being moved and retitled as needed,
+        the other old nodes are deleted and the other new nodes added.
+        Subtrees matched as a whole are not walked.
+
+        Args:
+            mind_map: The mind map of the old snapshot.
+        """
+        old_snapshot = self.__old_snapshot
+        new_snapshot = self.__new_snapshot
+
+        with mind_map.transaction():
+            old_root_id = old_snapshot.root_node_id
+            new_root_id = new_snapshot.root_node_id
+
+            if new_root_id is None:
+                if old_root_id is not None:
+                    mind_map.node_delete(old_root_id)
+
+                return
+
+            if old_root_id is None:
+                mind_map.populate_from_nodes(new_snapshot.nodes(), None)
+                return
+
+            # deleted subtrees without matched node are deleted first so that
+            # the kept nodes are mostly in place already
+            deleted_ids = self.deleted_node_ids()
+
+            for old_id in deleted_ids:
+                if old_id not in self.__mixed_old_ids:
+                    mind_map.node_delete(old_id)
+
+            node_ids = {}
+            stack = [new_root_id]
+
+            old_id = self.__new_to_old_ids[new_root_id]
+            node_ids[new_root_id] = old_id
+
+            if old_snapshot.node_title(old_id) != new_snapshot.node_title(new_root_id):
+                mind_map.node_set_title(new_snapshot.node_title(new_root_id), old_id)
+
+            while stack:
+                new_id = stack.pop()
+                parent_id = node_ids[new_id]
+                child_ids = []
+
+                for new_child_id in new_snapshot.node_child_ids(new_id):
+                    node_id = self.__new_to_old_ids.get(new_child_id)
+                    title = new_snapshot.node_title(new_child_id)
+
+                    if node_id is None and new_child_id not in self.__mixed_new_ids:
+                        node_id = mind_map.populate_from_nodes(
+                            new_snapshot.nodes(new_child_id), parent_id
+                        )
+                    elif node_id is None:
+                        node_id = mind_map.node_add(parent_id)
+                        mind_map.node_set_title(title, node_id)
+                        stack.append(new_child_id)
+                    else:
+                        if old_snapshot.node_title(node_id) != title:
+                            mind_map.node_set_title(title, node_id)
+
+                        if new_child_id not in self.__whole_new_ids:
+                            stack.append(new_child_id)
+
+                    node_ids[new_child_id] = node_id
+                    child_ids.append(node_id)
+
+                # the children already in order stay in place, the other ones
+                # and the ones still to be moved elsewhere or deleted being
+                # moved around them
+                positions = {
+                    child_id: position
+                    for position, child_id in enumerate(
+                        mind_map.node_child_ids(parent_id)
+                    )
+                }
+                placed_indices = [
+                    index
+                    for index, child_id in enumerate(child_ids)
+                    if child_id in positions
+                ]
+                in_order_ids = {
+                    child_ids[placed_indices[index]]
+                    for index in MindMapDiff.__increasing_indices(
+                        [positions[child_ids[index]] for index in placed_indices]
+                    )
+                }
+
+                previous_sibling_id = None
+
+                for node_id in child_ids:
+                    if node_id not in in_order_ids and (
+                        mind_map.node_parent_id(node_id) != parent_id
+                        or mind_map.node_previous_sibling_id(node_id)
+                        != previous_sibling_id
+                    ):
+                        mind_map.node_move_after(node_id, parent_id, previous_sibling_id)
+
+                    previous_sibling_id = node_id
+
+            # deleted nodes with matched descendants are emptied by now
+            for old_id in deleted_ids:
+                if (
+                    old_id in self.__mixed_old_ids
+                    and old_snapshot.node_parent_id(old_id) in self.__old_to_new_ids
+                ):
+                    mind_map.node_delete(old_id)
+
+    # constructor **************************************************************
+    def __init__(self, old_snapshot, new_snapshot, node_id_pairs=()):
+        """Aligns the nodes of two snapshots.
+
+        Args:
+            old_snapshot: The old snapshot.
+            new_snapshot: The new snapshot.
+            node_id_pairs: Iterable of pairs of the ids of an old node and of a
+                new one known to be the same.
+        """
+        self.__old_snapshot = old_snapshot
+        self.__new_snapshot = new_snapshot
+        self.__old_to_new_ids = {}
+        self.__new_to_old_ids = {}
+        self.__whole_new_ids = set()
+
+        self.__align(node_id_pairs)
+
+        self.__mixed_old_ids = MindMapDiff.__mixed_ids(
+            old_snapshot, self.__old_to_new_ids
+        )
+        self.__mixed_new_ids = MindMapDiff.__mixed_ids(
+            new_snapshot, self.__new_to_old_ids
+        )
+
+    @staticmethod
+    def __mixed_ids(snapshot, matched_ids):
+        """Returns the nodes without counterpart having a matched
+        descendant.
+        """
+        mixed_ids = set()
+
+        for node_id in matched_ids:
+            parent_id = snapshot.node_parent_id(node_id)
+
+            while (
+                parent_id is not None
+                and parent_id not in matched_ids
+                and parent_id not in mixed_ids
+            ):
+                mixed_ids.add(parent_id)
+                parent_id = snapshot.node_parent_id(parent_id)
+
+        return mixed_ids
+
+    # difference ***************************************************************
+    def added_node_ids(self):
+        """Returns the ids of the new nodes without counterpart whose parent
+        has one or is itself such a node with a matched descendant.
+
+        The subtrees of these nodes are added as a whole, but for their
+        matched descendants.
+        """
+        return MindMapDiff.__unmatched_ids(
+            self.__new_snapshot, self.__new_to_old_ids, self.__mixed_new_ids
+        )
+
+    def deleted_node_ids(self):
+        """Returns the ids of the old nodes without counterpart whose parent
+        has one or is itself such a node with a matched descendant.
+
+        The subtrees of these nodes are deleted as a whole, but for their
+        matched descendants.
+        """
+        return MindMapDiff.__unmatched_ids(
+            self.__old_snapshot, self.__old_to_new_ids, self.__mixed_old_ids
+        )
+
+    @property
+    def is_empty(self):
+        """Whether both snapshots hold the same mind map."""
+        return (
+            not self.added_node_ids()
+            and not self.deleted_node_ids()
+            and not self.moved_node_ids()
+            and not self.retitled_node_ids()
+        )
+
+    def moved_node_ids(self):
+        """Returns the pairs of ids of the matched nodes that have another
+        parent or whose place among their siblings changed.
+
+        Among the children kept under the same parent, the longest sequence
+        kept in order is not moved.
+        """
+        old_snapshot = self.__old_snapshot
+        new_snapshot = self.__new_snapshot
+        moved_node_ids = []
+
+        for new_id, old_id in self.__new_to_old_ids.items():
+            if (
+                new_id in self.__whole_new_ids
+                or new_snapshot.node_first_child_id(new_id) is None
+            ):
+                continue
+
+            old_positions = {
+                child_id: position
+                for position, child_id in enumerate(old_snapshot.node_child_ids(old_id))
+            }
+
+            # pairs of the old position and of the ids of the kept children,
+            # in their new order
+            kept_children = []
+
+            for new_child_id in new_snapshot.node_child_ids(new_id):
+                old_child_id = self.__new_to_old_ids.get(new_child_id)
+
+                if old_child_id is None:
+                    continue
+
+                if old_child_id in old_positions:
+                    kept_children.append(
+                        (old_positions[old_child_id], old_child_id, new_child_id)
+                    )
+                else:
+                    moved_node_ids.append((old_child_id, new_child_id))
+
+            in_order_indices = MindMapDiff.__increasing_indices(
+                [old_position for old_position, _, _ in kept_children]
+            )
+
+            for index, (_, old_child_id, new_child_id) in enumerate(kept_children):
+                if index not in in_order_indices:
+                    moved_node_ids.append((old_child_id, new_child_id))
+
+        return moved_node_ids
+
+    def new_node_id(self, old_id):
+        """Returns the id of the new node matched with an old one, [`None`][]
+        if none.
+        """
+        return self.__old_to_new_ids.get(old_id)
+
+    def old_node_id(self, new_id):
+        """Returns the id of the old node matched with a new one, [`None`][]
+        if none.
+        """
+        return self.__new_to_old_ids.get(new_id)
+
+    def retitled_node_ids(self):
+        """Returns the pairs of ids of the matched nodes whose title
+        changed.
+        """
+        return [
+            (old_id, new_id)
+            for old_id, new_id in self.__old_to_new_ids.items()
+            if self.__old_snapshot.node_title(old_id)
+            != self.__new_snapshot.node_title(new_id)
+        ]
+
+    @staticmethod
+    def __increasing_indices(values):
+        """Returns the indices of a longest increasing subsequence."""
+        tail_values = []
+        tail_indices = []
+        previous_indices = []
+
+        for index, value in enumerate(values):
+            position = bisect.bisect_left(tail_values, value)
+
+            previous_indices.append(tail_indices[position - 1] if position else -1)
+
+            if position == len(tail_values):
+                tail_values.append(value)
+                tail_indices.append(index)
+            else:
+                tail_values[position] = value
+                tail_indices[position] = index
+
+        indices = set()
+        index = tail_indices[-1] if tail_indices else -1
+
+        while index != -1:
+            indices.add(index)
+            index = previous_indices[index]
+
+        return indices
+
+    @staticmethod
+    def __unmatched_ids(snapshot, matched_ids, mixed_ids):
+        if snapshot.root_node_id is None:
+            return []
+
+        if snapshot.root_node_id not in matched_ids:
+            return [snapshot.root_node_id]
+
+        unmatched_ids = []
+        parent_ids = list(matched_ids)
+        parent_ids.extend(mixed_ids)
+
+        for parent_id in parent_ids:
+            for child_id in snapshot.node_child_ids(parent_id):
+                if child_id not in matched_ids:
+                    unmatched_ids.append(child_id)
+
+        return unmatched_ids
+
+    # line *********************************************************************
+    def lines(self):
+        """Yields the differences as lines of text.
+
+        Lines start with `+` for an added subtree, `-` for a deleted one, `>`
+        for a moved node and `~` for a retitled one, followed by the path of
+        titles to the node, in the new snapshot but for deleted nodes.
+        """
+        old_snapshot = self.__old_snapshot
+        new_snapshot = self.__new_snapshot
+
+        for old_id in self.deleted_node_ids():
+            yield f"- {MindMapDiff.__path(old_snapshot, old_id)}"
+
+        for new_id in self.added_node_ids():
+            yield f"+ {MindMapDiff.__path(new_snapshot, new_id)}"
+
+        for old_id, new_id in self.moved_node_ids():
+            yield (
+                f"> {MindMapDiff.__path(old_snapshot, old_id)}"
+                f" -> {MindMapDiff.__path(new_snapshot, new_id)}"
+            )
+
+        for old_id, new_id in self.retitled_node_ids():
+            yield (
+                f"~ {MindMapDiff.__path(new_snapshot, new_id)}"
+                f" (was {old_snapshot.node_title(old_id)!r})"
+            )
+
+    @staticmethod
+    def __path(snapshot, node_id):
+        titles = []
+
+        while node_id is not None:
+            titles.append(snapshot.node_title(node_id))
+            node_id = snapshot.node_parent_id(node_id)
+
+        return " / ".join(reversed(titles))
@@ -1,9 +1,15 @@
 import enum
 
 class MindMapEvent(enum.Enum):
+    changed = enum.auto()
     cleared = enum.auto()
     node_added = enum.auto()
     node_deleted = enum.auto()
+    node_folded = enum.auto()
+    node_moved = enum.auto()
     node_selected = enum.auto()
+    node_title_edited = enum.auto()
     node_title_set = enum.auto()
+    node_unfolded = enum.auto()
     node_unselected = enum.auto()
+    subtree_added = enum.auto()
@@ -0,0 +1,135 @@
+import array
+
+
+class MindMapFold:
+    """Compact content of a folded subtree of a
+    [mind map][xindmap.mind_map.MindMap.MindMap].
+
+    A fold holds the nodes below a folded node, out of the
+    [store][xindmap.mind_map.MindMapStore.MindMapStore]: their ids, their
+    depths relative to the folded node, its children being at depth `1`, and
+    their titles in a single utf-8 buffer, nodes being in pre order.
+    Nodes of the fold that were folded themselves keep a fold of their own,
+    their subtree not being part of the fold.
+
+    Ids stay reserved in the store while nodes are folded, unfolding gives the
+    nodes back their ids.
+
+    A fold is never modified, it is shared as is by
+    [snapshots][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot].
+
+    Attributes:
+        __child_hash_sum: The sum of the hashes of the pairs of consecutive
+            children of the folded node, as computed by the store.
+        __depths: The depth of each node.
+        __folds: Dictionnary mapping the ids of the folded nodes of the fold
+            to their fold.
+        __node_ids: The id of each node.
+        __title_buffer: Utf-8 buffer holding the titles.
+        __title_lengths: Length in bytes of the title of each node.
+    """
+    # constructor **************************************************************
+    def __init__(self, node_ids, depths, titles, child_hash_sum, folds=None):
+        """Instantiates a fold.
+
+        Args:
+            node_ids: The ids of the nodes in pre order.
+            depths: The depths of the nodes, relative to the folded node.
+            titles: The titles of the nodes.
+            child_hash_sum: The sum of the hashes of the pairs of consecutive
+                children of the folded node.
+            folds: Dictionnary mapping the ids of the folded nodes of the fold
+                to their fold.
+        """
+        encoded_titles = [title.encode("utf-8") for title in titles]
+
+        self.__child_hash_sum = child_hash_sum
+        self.__depths = array.array("i", depths)
+        self.__folds = folds if folds is not None else {}
+        self.__node_ids = array.array("i", node_ids)
+        self.__title_buffer = b"".join(encoded_titles)
+        self.__title_lengths = array.array(
+            "I", (len(encoded_title) for encoded_title in encoded_titles)
+        )
+
+    # fold *********************************************************************
+    @property
+    def child_hash_sum(self):
+        return self.__child_hash_sum
+
+    @property
+    def folds(self):
+        """The folds of the folded nodes of this fold, by node id."""
+        return self.__folds
+
+    # node *********************************************************************
+    def entries(self):
+        """Yields the nodes of this fold as `(node_id, depth, title)` triplets
+        in pre order, the subtrees of its folded nodes excluded.
+        """
+        title_buffer = self.__title_buffer
+        offset = 0
+
+        for node_id, depth, length in zip(
+            self.__node_ids, self.__depths, self.__title_lengths
+        ):
+            yield node_id, depth, title_buffer[offset:offset + length].decode("utf-8")
+            offset += length
+
+    def expanded_entries(self, depth=0):
+        """Yields the nodes of this fold as `(node_id, depth, title)` triplets
+        in pre order, the subtrees of its folded nodes included.
+
+        Args:
+            depth: The depth of the folded node.
+        """
+        for node_id, node_depth, title in self.entries():
+            yield node_id, depth + node_depth, title
+
+            fold = self.__folds.get(node_id)
+            if fold is not None:
+                yield from fold.expanded_entries(depth + node_depth)
+
+    def node_ids(self):
+        """Yields the ids of the nodes of this fold in pre order, the subtrees
+        of its folded nodes included.
+        """
+        for node_id, _, _ in self.expanded_entries():
+            yield node_id
+
+    def nodes(self, depth=0):
+        """Yields the nodes of this fold as `(depth, title)` pairs in pre order,
+        the subtrees of its folded nodes included.
+
+        Args:
+            depth: The depth of the folded node.
+        """
+        for _, node_depth, title in self.expanded_entries(depth):
+            yield node_depth, title
+
+    def renumbered(self, node_ids, folds):
+        """Returns a copy of this fold whose nodes have other ids.
+
+        Args:
+            node_ids: The new ids of the nodes in pre order, the subtrees of
+                the folded nodes excluded.
+            folds: Dictionnary mapping the new ids of the folded nodes to their
+                fold.
+        """
+        fold = MindMapFold.__new__(MindMapFold)
+
+        fold.__child_hash_sum = self.__child_hash_sum
+        fold.__depths = self.__depths
+        fold.__folds = folds
+        fold.__node_ids = array.array("i", node_ids)
+        fold.__title_buffer = self.__title_buffer
+        fold.__title_lengths = self.__title_lengths
+
+        return fold
+
+    # size *********************************************************************
+    def __len__(self):
+        """Returns the number of nodes of this fold, the subtrees of its folded
+        nodes excluded.
+        """
+        return len(self.__node_ids)
@@ -0,0 +1,273 @@
+import collections
+
+import xindmap.config
+
+
+class MindMapHistory(xindmap.config.Configurable):
+    """Journal of the edits made on a
+    [mind map][xindmap.mind_map.MindMap.MindMap], used to undo and redo them.
+
+    Each entry records how to revert one edit rather than a copy of the mind
+    map.
+    Reverting an entry yields the entry reverting the revert, undone entries
+    are thus pushed as is to the redo stack and the other way around.
+
+    Consecutive keystrokes on the same node are coalesced into a single title
+    edit until a [checkpoint][xindmap.mind_map.MindMapHistory.MindMapHistory.checkpoint]
+    is made.
+
+    The estimated size of the entries is kept under
+    [`mind_map_history_max_size_kb`][xindmap.config.Variables.Variables.mind_map_history_max_size_kb],
+    the oldest entries being evicted first.
+
+    Attributes:
+        __coalescable:
+            Whether the next typing entry can be coalesced with the latest one.
+        __edit_count: The number of edits recorded, undone or redone so far.
+        __group_entries:
+            The entries recorded since the start of a group, [`None`][] out of
+            a group.
+        __max_size: The maximum estimated size of the entries, in bytes.
+        __redo_entries: The entries to redo, latest last.
+        __size: The estimated size of the entries, in bytes.
+        __undo_entries:
+            [`deque`][collections.deque] of the entries to undo, latest last.
+    """
+    # entry ********************************************************************
+    GroupEntry = collections.namedtuple("GroupEntry", ["entries"])
+    """Edits made during a transaction, undone and redone as a whole."""
+
+    MoveEntry = collections.namedtuple(
+        "MoveEntry",
+        [
+            "node_id",
+            "previous_parent_id",
+            "previous_previous_sibling_id",
+            "parent_id",
+            "previous_sibling_id",
+        ],
+    )
+    """Move of a node, siblings being `-1` for first child."""
+
+    Subtree = collections.namedtuple(
+        "Subtree", ["node_ids", "parent_ids", "titles", "previous_sibling_id"]
+    )
+    """Content of a removed subtree, nodes being in pre order."""
+
+    SubtreeEntry = collections.namedtuple(
+        "SubtreeEntry", ["is_addition", "node_id", "subtree"]
+    )
+    """Addition or deletion of a subtree.
+
+    The content of an added subtree is only captured once it is undone.
+    """
+
+    TitleEntry = collections.namedtuple(
+        "TitleEntry", ["node_id", "previous_title", "title", "is_typing"]
+    )
+    """Change of the title of a node."""
+
+    @staticmethod
+    def __entry_size(entry):
+        if isinstance(entry, MindMapHistory.GroupEntry):
+            return 64 + sum(
+                MindMapHistory.__entry_size(grouped_entry)
+                for grouped_entry in entry.entries
+            )
+
+        if isinstance(entry, MindMapHistory.MoveEntry):
+            return 64
+
+        if isinstance(entry, MindMapHistory.TitleEntry):
+            return 64 + len(entry.previous_title) + len(entry.title)
+
+        if entry.subtree is None:
+            return 64
+
+        return (
+            64
+            + 64 * len(entry.subtree.node_ids)
+            + sum(len(title) for title in entry.subtree.titles)
+        )
+
+    # checkpoint ***************************************************************
+    def checkpoint(self):
+        """Prevents the next keystrokes from being coalesced with the previous
+        ones.
+        """
+        self.__coalescable = False
+
+    # clear ********************************************************************
+    def clear(self):
+        self.__coalescable = False
+        self.__group_entries = None
+        self.__redo_entries = []
+        self.__size = 0
+        self.__undo_entries = collections.deque()
+
+    # config callback **********************************************************
+    def on_config_variable_mind_map_history_max_size_kb_set(self, value):
+        """Config callback called whenever
+        [`mind_map_history_max_size_kb`][xindmap.config.Variables.Variables.mind_map_history_max_size_kb]
+        config variable is set.
+        """
+        self.__max_size = value * 1024
+        self.__evict()
+
+    # constructor **************************************************************
+    def __init__(self):
+        xindmap.config.Configurable.__init__(
+            self, [xindmap.config.Variables.mind_map_history_max_size_kb]
+        )
+
+        self.__edit_count = 0
+        self.__max_size = (
+            xindmap.config.Variables.mind_map_history_max_size_kb.default * 1024
+        )
+        self.clear()
+
+    # edit count ***************************************************************
+    @property
+    def edit_count(self):
+        """The number of edits recorded, undone or redone so far.
+
+        Unlike the number of entries, it is never reset, telling whether the
+        mind map was edited in between two reads.
+        """
+        return self.__edit_count
+
+    # eviction *****************************************************************
+    def __evict(self):
+        while self.__size > self.__max_size and self.__undo_entries:
+            entry = self.__undo_entries.popleft()
+            self.__size -= MindMapHistory.__entry_size(entry)
+
+        while self.__size > self.__max_size and self.__redo_entries:
+            entry = self.__redo_entries.pop(0)
+            self.__size -= MindMapHistory.__entry_size(entry)
+
+    # group ********************************************************************
+    def group_begin(self):
+        """Starts gathering the recorded entries into a single group."""
+        self.__group_entries = []
+
+    def group_end(self):
+        """Records the entries gathered since
+        [`group_begin`][xindmap.mind_map.MindMapHistory.MindMapHistory.group_begin]
+        as a single entry.
+        """
+        entries = self.__group_entries
+        self.__group_entries = None
+
+        if not entries:
+            return
+
+        if len(entries) == 1:
+            self.record(entries[0])
+        else:
+            self.record(MindMapHistory.GroupEntry(entries))
+
+    # record *******************************************************************
+    def record(self, entry):
+        """Records a new edit, dropping the entries to redo."""
+        self.__edit_count += 1
+
+        self.__size -= sum(
+            MindMapHistory.__entry_size(redo_entry)
+            for redo_entry in self.__redo_entries
+        )
+        self.__redo_entries.clear()
+
+        if self.__group_entries is not None:
+            self.__group_entries.append(entry)
+            return
+
+        if (
+            isinstance(entry, MindMapHistory.TitleEntry)
+            and entry.is_typing
+            and self.__coalescable
+            and self.__undo_entries
+        ):
+            latest_entry = self.__undo_entries[-1]
+
+            if (
+                isinstance(latest_entry, MindMapHistory.TitleEntry)
+                and latest_entry.is_typing
+                and latest_entry.node_id == entry.node_id
+            ):
+                self.__undo_entries.pop()
+                self.__size -= MindMapHistory.__entry_size(latest_entry)
+
+                entry = entry._replace(previous_title=latest_entry.previous_title)
+
+        self.__undo_push(entry)
+
+        self.__coalescable = (
+            isinstance(entry, MindMapHistory.TitleEntry) and entry.is_typing
+        )
+
+    # redo *********************************************************************
+    def redo_pop(self):
+        """Pops the latest undone entry, [`None`][] if there is none."""
+        self.__coalescable = False
+
+        if not self.__redo_entries:
+            return None
+
+        entry = self.__redo_entries.pop()
+        self.__size -= MindMapHistory.__entry_size(entry)
+
+        return entry
+
+    def redo_push(self, entry):
+        self.__edit_count += 1
+        self.__redo_entries.append(entry)
+        self.__size += MindMapHistory.__entry_size(entry)
+        self.__evict()
+
+    # size *********************************************************************
+    @property
+    def redo_count(self):
+        return len(self.__redo_entries)
+
+    @property
+    def size(self):
+        """Returns the estimated size of the entries, in bytes."""
+        return self.__size
+
+    @property
+    def undo_count(self):
+        return len(self.__undo_entries)
+
+    # undo *********************************************************************
+    def undo_pop(self):
+        """Pops the latest entry to undo, [`None`][] if there is none."""
+        self.__coalescable = False
+
+        # entries of the pending group are the latest ones
+        if self.__group_entries:
+            return self.__group_entries.pop()
+
+        if not self.__undo_entries:
+            return None
+
+        entry = self.__undo_entries.pop()
+        self.__size -= MindMapHistory.__entry_size(entry)
+
+        return entry
+
+    def undo_push(self, entry):
+        """Pushes a redone entry, keeping the entries to redo."""
+        self.__coalescable = False
+        self.__edit_count += 1
+
+        if self.__group_entries is not None:
+            self.__group_entries.append(entry)
+            return
+
+        self.__undo_push(entry)
+
+    def __undo_push(self, entry):
+        self.__undo_entries.append(entry)
+        self.__size += MindMapHistory.__entry_size(entry)
+        self.__evict()
@@ -0,0 +1,61 @@
+import heapq
+
+
+class MindMapIdAllocator:
+    """Allocates the ids of the nodes of a
+    [mind map][xindmap.mind_map.MindMap.MindMap].
+
+    Ids index the arrays of the
+    [store][xindmap.mind_map.MindMapStore.MindMapStore], they must stay dense.
+    Freed ids are thus reused, lowest first, before allocating new ones.
+
+    Freed ids are kept in a heap from which ids taken back through
+    [`take`][xindmap.mind_map.MindMapIdAllocator.MindMapIdAllocator.take] are
+    lazily discarded.
+
+    Attributes:
+        __free_id_heap:
+            Heap of the freed ids, possibly holding ids already taken back.
+        __free_ids: Set of the freed ids.
+        __id_count: Number of ids allocated at least once.
+    """
+    # allocation ***************************************************************
+    def allocate(self):
+        """Returns the lowest free id, or a new id if none is free."""
+        while self.__free_id_heap:
+            node_id = heapq.heappop(self.__free_id_heap)
+
+            if node_id in self.__free_ids:
+                self.__free_ids.remove(node_id)
+                return node_id
+
+        node_id = self.__id_count
+        self.__id_count += 1
+
+        return node_id
+
+    def free(self, node_id):
+        self.__free_ids.add(node_id)
+        heapq.heappush(self.__free_id_heap, node_id)
+
+    def take(self, node_id):
+        """Allocates a given free id."""
+        self.__free_ids.remove(node_id)
+
+    # clear ********************************************************************
+    def clear(self):
+        self.__free_id_heap = []
+        self.__free_ids = set()
+        self.__id_count = 0
+
+    # constructor **************************************************************
+    def __init__(self):
+        self.clear()
+
+    # size *********************************************************************
+    @property
+    def id_count(self):
+        """Returns the number of ids allocated at least once, the upper bound of
+        the allocated ids.
+        """
+        return self.__id_count
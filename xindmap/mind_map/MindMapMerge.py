@@ -0,0 +1,408 @@
+from .MindMap import MindMap
+from .MindMapDiff import MindMapDiff
+
+
+class MindMapMerge:
+    """Three-way merge of two
+    [snapshots][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot] of mind
+    maps, ours and theirs, edited from a common base.
+
+    The nodes of ours and of theirs are aligned with the ones of the base by
+    [differences][xindmap.mind_map.MindMapDiff.MindMapDiff], the merged mind
+    map then holding:
+
+    - the base nodes kept by both sides, a node deleted on a side being
+      deleted;
+    - the nodes added on either side;
+    - for each kept base node, the title and the place given by the side that
+      changed it, ours if both did.
+
+    Changes of both sides that can not be merged are reported as conflicts,
+    ours being kept, such as titles changed to different values, a node
+    moved by both sides, a node changed on a side and deleted on the other or
+    a node added or moved under a node deleted on the other side.
+
+    The merged mind map is built as a snapshot of its own, which can be saved
+    as is or [applied][xindmap.mind_map.MindMapMerge.MindMapMerge.apply] to
+    the mind map of ours as a single change.
+
+    Nodes are identified while merging by their base id, or by `("ours", id)`
+    and `("theirs", id)` pairs for the added ones.
+
+    Attributes:
+        __conflicts: The descriptions of the conflicts.
+        __node_id_pairs: The pairs of the ids of a node of ours and of the same
+            node in the merged snapshot.
+        __ours_diff: The difference between the base and ours.
+        __ours_snapshot: The snapshot of ours.
+        __snapshot: The merged snapshot.
+        __theirs_diff: The difference between the base and theirs.
+        __theirs_snapshot: The snapshot of theirs.
+    """
+    # apply ********************************************************************
+    def apply(self, mind_map):
+        """Turns the mind map of ours into the merged one in one
+        [transaction][xindmap.mind_map.MindMap.MindMap.transaction], the nodes
+        of ours keeping their ids.
+
+        Args:
+            mind_map: The mind map whose snapshot is ours.
+
+        Returns:
+            The [difference][xindmap.mind_map.MindMapDiff.MindMapDiff]
+            applied.
+        """
+        diff = MindMapDiff(self.__ours_snapshot, self.__snapshot, self.__node_id_pairs)
+        diff.apply(mind_map)
+
+        return diff
+
+    # conflict *****************************************************************
+    def __conflict(self, snapshot, node_id, description):
+        titles = []
+
+        while node_id is not None:
+            titles.append(snapshot.node_title(node_id))
+            node_id = snapshot.node_parent_id(node_id)
+
+        self.__conflicts.append(f"{' / '.join(reversed(titles))}: {description}")
+
+    @property
+    def conflicts(self):
+        """The descriptions of the conflicts, ours being kept for each."""
+        return self.__conflicts
+
+    # constructor **************************************************************
+    def __init__(self, base_snapshot, ours_snapshot, theirs_snapshot):
+        """Merges two snapshots edited from a common base.
+
+        Args:
+            base_snapshot: The snapshot of the base.
+            ours_snapshot: The snapshot of ours.
+            theirs_snapshot: The snapshot of theirs.
+        """
+        self.__conflicts = []
+        self.__node_id_pairs = []
+        self.__ours_snapshot = ours_snapshot
+        self.__theirs_snapshot = theirs_snapshot
+
+        if (
+            base_snapshot.root_node_id is None
+            or ours_snapshot.root_node_id is None
+            or theirs_snapshot.root_node_id is None
+        ):
+            nodes = self.__whole_merge(base_snapshot)
+        else:
+            self.__ours_diff = MindMapDiff(base_snapshot, ours_snapshot)
+            self.__theirs_diff = MindMapDiff(base_snapshot, theirs_snapshot)
+
+            nodes = self.__merge(base_snapshot)
+
+        mind_map = MindMap()
+
+        if nodes:
+            mind_map.populate_from_nodes(nodes, None)
+
+        self.__snapshot = mind_map.snapshot()
+
+    # key **********************************************************************
+    def __ours_key(self, node_id):
+        if node_id is None:
+            return None
+
+        base_id = self.__ours_diff.old_node_id(node_id)
+
+        return base_id if base_id is not None else ("ours", node_id)
+
+    def __ours_node_id(self, key):
+        if isinstance(key, tuple):
+            return key[1] if key[0] == "ours" else None
+
+        return self.__ours_diff.new_node_id(key)
+
+    def __theirs_key(self, node_id):
+        if node_id is None:
+            return None
+
+        base_id = self.__theirs_diff.old_node_id(node_id)
+
+        return base_id if base_id is not None else ("theirs", node_id)
+
+    def __theirs_node_id(self, key):
+        if isinstance(key, tuple):
+            return key[1] if key[0] == "theirs" else None
+
+        return self.__theirs_diff.new_node_id(key)
+
+    # merge ********************************************************************
+    def __merge(self, base_snapshot):
+        """Merges non empty snapshots.
+
+        Returns:
+            The merged nodes as `(depth, title)` pairs in pre order.
+        """
+        ours_snapshot = self.__ours_snapshot
+        theirs_snapshot = self.__theirs_snapshot
+        ours_diff = self.__ours_diff
+        theirs_diff = self.__theirs_diff
+
+        ours_moved_ids = {base_id for base_id, _ in ours_diff.moved_node_ids()}
+        theirs_moved_ids = {base_id for base_id, _ in theirs_diff.moved_node_ids()}
+
+        # the parent of each node, whether it is placed as in theirs and its
+        # title
+        parent_keys = {}
+        theirs_placed_keys = set()
+        titles = {}
+
+        for base_id in base_snapshot.node_ids():
+            ours_id = ours_diff.new_node_id(base_id)
+            theirs_id = theirs_diff.new_node_id(base_id)
+            base_title = base_snapshot.node_title(base_id)
+
+            if ours_id is None or theirs_id is None:
+                if ours_id is not None and (
+                    ours_snapshot.node_title(ours_id) != base_title
+                    or base_id in ours_moved_ids
+                ):
+                    self.__conflict(
+                        base_snapshot,
+                        base_id,
+                        f"changed in ours and deleted in theirs, deleted",
+                    )
+                elif theirs_id is not None and (
+                    theirs_snapshot.node_title(theirs_id) != base_title
+                    or base_id in theirs_moved_ids
+                ):
+                    self.__conflict(
+                        base_snapshot,
+                        base_id,
+                        f"changed in theirs and deleted in ours, deleted",
+                    )
+
+                continue
+
+            ours_title = ours_snapshot.node_title(ours_id)
+            theirs_title = theirs_snapshot.node_title(theirs_id)
+
+            if ours_title == base_title:
+                titles[base_id] = theirs_title
+            else:
+                titles[base_id] = ours_title
+
+                if theirs_title not in (base_title, ours_title):
+                    self.__conflict(
+                        base_snapshot,
+                        base_id,
+                        f"title set to {ours_title!r} in ours and to"
+                        f" {theirs_title!r} in theirs, ours kept",
+                    )
+
+            ours_parent_key = self.__ours_key(ours_snapshot.node_parent_id(ours_id))
+            theirs_parent_key = self.__theirs_key(
+                theirs_snapshot.node_parent_id(theirs_id)
+            )
+
+            if base_id in theirs_moved_ids and base_id not in ours_moved_ids:
+                parent_keys[base_id] = theirs_parent_key
+                theirs_placed_keys.add(base_id)
+            else:
+                parent_keys[base_id] = ours_parent_key
+
+                if base_id in theirs_moved_ids and theirs_parent_key != ours_parent_key:
+                    self.__conflict(
+                        base_snapshot,
+                        base_id,
+                        f"moved in both ours and theirs, ours kept",
+                    )
+
+        for node_id in ours_diff.added_node_ids():
+            for ours_id in ours_snapshot.node_ids(node_id):
+                if ours_diff.old_node_id(ours_id) is None:
+                    key = ("ours", ours_id)
+                    parent_keys[key] = self.__ours_key(
+                        ours_snapshot.node_parent_id(ours_id)
+                    )
+                    titles[key] = ours_snapshot.node_title(ours_id)
+
+        for node_id in theirs_diff.added_node_ids():
+            for theirs_id in theirs_snapshot.node_ids(node_id):
+                if theirs_diff.old_node_id(theirs_id) is None:
+                    key = ("theirs", theirs_id)
+                    parent_keys[key] = self.__theirs_key(
+                        theirs_snapshot.node_parent_id(theirs_id)
+                    )
+                    theirs_placed_keys.add(key)
+                    titles[key] = theirs_snapshot.node_title(theirs_id)
+
+        root_key = base_snapshot.root_node_id
+
+        # nodes moved by both sides under the subtrees of each other form
+        # cycles unreachable from the root, their base nodes placed as in
+        # theirs are placed as in ours instead
+        while True:
+            child_keys = self.__child_keys(root_key, parent_keys, theirs_placed_keys)
+            cycle_keys = MindMapMerge.__cycle_keys(parent_keys, child_keys)
+
+            if not cycle_keys:
+                break
+
+            for key in cycle_keys:
+                if key in theirs_placed_keys and not isinstance(key, tuple):
+                    parent_keys[key] = self.__ours_key(
+                        ours_snapshot.node_parent_id(self.__ours_node_id(key))
+                    )
+                    theirs_placed_keys.discard(key)
+
+                    self.__conflict(
+                        base_snapshot, key, f"moved in both ours and theirs, ours kept"
+                    )
+
+        # nodes placed under a deleted node are deleted as well
+        for key, parent_key in parent_keys.items():
+            if (
+                key != root_key
+                and parent_key not in child_keys
+                and parent_key not in parent_keys
+            ):
+                if isinstance(key, tuple):
+                    snapshot = ours_snapshot if key[0] == "ours" else theirs_snapshot
+                    node_id = key[1]
+                else:
+                    snapshot = base_snapshot
+                    node_id = key
+
+                self.__conflict(
+                    snapshot,
+                    node_id,
+                    f"placed under a node deleted in the other side, deleted",
+                )
+
+        nodes = []
+        stack = [(root_key, 0)]
+
+        while stack:
+            key, depth = stack.pop()
+
+            ours_id = self.__ours_node_id(key)
+            if ours_id is not None:
+                self.__node_id_pairs.append((ours_id, len(nodes)))
+
+            nodes.append((depth, titles[key]))
+
+            for child_key in reversed(child_keys[key]):
+                stack.append((child_key, depth + 1))
+
+        return nodes
+
+    def __child_keys(self, root_key, parent_keys, theirs_placed_keys):
+        """Orders the children of the nodes reached from the root.
+
+        The children placed as in ours keep the order of ours, the ones placed
+        as in theirs being inserted after the child they follow in theirs.
+
+        Returns:
+            Dictionnary mapping the keys of the reached nodes to the keys of
+            their children.
+        """
+        child_keys = {}
+        stack = [root_key]
+
+        while stack:
+            key = stack.pop()
+
+            ours_child_keys = []
+            following_keys = {None: []}
+
+            ours_id = self.__ours_node_id(key)
+            if ours_id is not None:
+                for child_id in self.__ours_snapshot.node_child_ids(ours_id):
+                    child_key = self.__ours_key(child_id)
+
+                    if (
+                        child_key in parent_keys
+                        and parent_keys[child_key] == key
+                        and child_key not in theirs_placed_keys
+                    ):
+                        ours_child_keys.append(child_key)
+                        following_keys[child_key] = []
+
+            theirs_id = self.__theirs_node_id(key)
+            if theirs_id is not None:
+                anchor_key = None
+
+                for child_id in self.__theirs_snapshot.node_child_ids(theirs_id):
+                    child_key = self.__theirs_key(child_id)
+
+                    if child_key in theirs_placed_keys:
+                        if parent_keys[child_key] == key:
+                            following_keys[anchor_key].append(child_key)
+                    elif child_key in following_keys:
+                        anchor_key = child_key
+
+            ordered_keys = list(following_keys[None])
+            for child_key in ours_child_keys:
+                ordered_keys.append(child_key)
+                ordered_keys.extend(following_keys[child_key])
+
+            child_keys[key] = ordered_keys
+            stack.extend(ordered_keys)
+
+        return child_keys
+
+    @staticmethod
+    def __cycle_keys(parent_keys, child_keys):
+        """Returns the keys of the nodes in a cycle of parents."""
+        cycle_keys = []
+        walk_indices = {}
+
+        for walk_index, key in enumerate(parent_keys):
+            path = []
+
+            while (
+                key in parent_keys
+                and key not in child_keys
+                and key not in walk_indices
+            ):
+                walk_indices[key] = walk_index
+                path.append(key)
+                key = parent_keys[key]
+
+            if walk_indices.get(key) == walk_index and key not in child_keys:
+                cycle_keys.extend(path[path.index(key):])
+
+        return cycle_keys
+
+    def __whole_merge(self, base_snapshot):
+        """Merges snapshots one of which is empty, as wholes.
+
+        Returns:
+            The merged nodes as `(depth, title)` pairs in pre order.
+        """
+        base_hash, ours_hash, theirs_hash = (
+            snapshot.node_hash(snapshot.root_node_id)
+            if snapshot.root_node_id is not None
+            else None
+            for snapshot in (base_snapshot, self.__ours_snapshot, self.__theirs_snapshot)
+        )
+
+        if ours_hash == base_hash:
+            return list(self.__theirs_snapshot.nodes())
+
+        if theirs_hash not in (base_hash, ours_hash):
+            self.__conflicts.append(f"changed in both ours and theirs, ours kept")
+
+        self.__node_id_pairs.extend(
+            (node_id, index)
+            for index, node_id in enumerate(self.__ours_snapshot.node_ids())
+        )
+
+        return list(self.__ours_snapshot.nodes())
+
+    # snapshot *****************************************************************
+    @property
+    def snapshot(self):
+        """The [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot] of
+        the merged mind map.
+        """
+        return self.__snapshot
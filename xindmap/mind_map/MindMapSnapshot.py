@@ -0,0 +1,363 @@
+import itertools
+
+
+class MindMapSnapshot:
+    """Immutable view of a [mind map][xindmap.mind_map.MindMap.MindMap] as it
+    was when the snapshot was taken.
+
+    A snapshot holds pages of the arrays of the
+    [mind map store][xindmap.mind_map.MindMapStore.MindMapStore] that are
+    never written again, it can therefore be read from any thread while the
+    mind map keeps changing.
+    It exposes the read only part of the mind map api.
+
+    The [folds][xindmap.mind_map.MindMapFold.MindMapFold] of the folded nodes
+    are shared with the mind map as they are never modified.
+    Walking the nodes of the snapshot goes through the folded subtrees as well,
+    unlike reading a single node, which has to be unfolded.
+
+    Attributes:
+        __fold_node_states: Dictionnary mapping the ids of the folded nodes to
+            the states of the nodes of their fold, as given by
+            [`folded_node`][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot.folded_node].
+        __folds: Dictionnary mapping the ids of the folded nodes to their fold.
+        __node_count: Number of nodes in the snapshot.
+        __page_mask: Mask giving the index of a slot in its page.
+        __page_shift: Shift giving the index of the page of a slot.
+        __pages:
+            Dictionnary mapping an array name to the pages of the array.
+        __root_id: Id of the root node, `-1` if the snapshot is empty.
+        __title_buffer: The utf-8 buffer holding the titles.
+    """
+    # constructor **************************************************************
+    def __init__(self, pages, page_shift, title_buffer, node_count, root_id, folds):
+        self.__fold_node_states = {}
+        self.__folds = folds
+        self.__pages = pages
+        self.__page_shift = page_shift
+        self.__page_mask = (1 << page_shift) - 1
+        self.__title_buffer = title_buffer
+        self.__node_count = node_count
+        self.__root_id = root_id
+
+    # difference ***************************************************************
+    def differences(self, snapshot):
+        """Yields the pairs of nodes of this snapshot and of another one, of
+        any mind map, that differ.
+
+        Both trees are walked from their roots at once, subtrees with equal
+        [hashes][xindmap.mind_map.MindMap.MindMap.node_hash] being skipped, so
+        that only the paths to the differences and the children along them are
+        visited.
+        Children with equal hashes at the start and at the end of both lists
+        of children are skipped, the remaining ones being paired in order.
+
+        A pair is yielded when the titles of its nodes differ.
+        A node without counterpart is paired with [`None`][], its subtree
+        not being walked.
+
+        Args:
+            snapshot: The other snapshot.
+
+        Yields:
+            Pairs of the id of a node in this snapshot and of the id of a node
+            in the other one.
+        """
+        stack = [(self.root_node_id, snapshot.root_node_id)]
+
+        while stack:
+            node_id, other_node_id = stack.pop()
+
+            if node_id is None or other_node_id is None:
+                if node_id is not None or other_node_id is not None:
+                    yield node_id, other_node_id
+
+                continue
+
+            if self.node_hash(node_id) == snapshot.node_hash(other_node_id):
+                continue
+
+            if self.node_title(node_id) != snapshot.node_title(other_node_id):
+                yield node_id, other_node_id
+
+            child_ids = self.node_child_ids(node_id)
+            other_child_ids = snapshot.node_child_ids(other_node_id)
+
+            start = 0
+            while (
+                start < min(len(child_ids), len(other_child_ids))
+                and self.node_hash(child_ids[start])
+                == snapshot.node_hash(other_child_ids[start])
+            ):
+                start += 1
+
+            end = 0
+            while (
+                end < min(len(child_ids), len(other_child_ids)) - start
+                and self.node_hash(child_ids[-end - 1])
+                == snapshot.node_hash(other_child_ids[-end - 1])
+            ):
+                end += 1
+
+            pairs = itertools.zip_longest(
+                child_ids[start:len(child_ids) - end],
+                other_child_ids[start:len(other_child_ids) - end],
+            )
+            stack.extend(reversed(list(pairs)))
+
+    # dict *********************************************************************
+    def to_dict(self):
+        root_dict = {
+            "title": self.node_title(self.__root_id),
+            "childs": []
+        }
+        stack = [(self.__root_id, root_dict)]
+
+        while stack:
+            node_id, node_dict = stack.pop()
+
+            fold = self.__folds.get(node_id)
+            if fold is not None:
+                dict_stack = [node_dict]
+
+                for depth, title in fold.nodes():
+                    del dict_stack[depth:]
+
+                    child_dict = {
+                        "title": title,
+                        "childs": []
+                    }
+                    dict_stack[-1]["childs"].append(child_dict)
+                    dict_stack.append(child_dict)
+
+                continue
+
+            for child_id in self.node_child_ids(node_id):
+                child_dict = {
+                    "title": self.node_title(child_id),
+                    "childs": []
+                }
+                node_dict["childs"].append(child_dict)
+
+                stack.append((child_id, child_dict))
+
+        return root_dict
+
+    # fold *********************************************************************
+    def folded_node(self, node_id):
+        """Returns the state of a node of a folded subtree.
+
+        The states of the nodes of a fold are computed on the first call and
+        kept for the next ones.
+
+        Returns:
+            A `(parent_id, previous_sibling_id, next_sibling_id, title)` tuple,
+            missing ids being [`None`][], [`None`][] if the node is not folded.
+        """
+        if not self.__value_exists("alive", node_id) or self.__value("alive", node_id) != 2:
+            return None
+
+        folded_node_id = node_id
+        while self.__value("alive", folded_node_id) != 1:
+            folded_node_id = self.__value("parent_ids", folded_node_id)
+
+        node_states = self.__fold_node_states.get(folded_node_id)
+
+        if node_states is None:
+            node_states = {}
+            previous_node_id = None
+
+            for (
+                current_id, parent_id, previous_sibling_id, title
+            ) in self.folded_nodes(folded_node_id):
+                node_states[current_id] = [parent_id, previous_sibling_id, None, title]
+
+                if previous_sibling_id is not None:
+                    node_states[previous_sibling_id][2] = current_id
+
+            self.__fold_node_states[folded_node_id] = node_states
+
+        node_state = node_states.get(node_id)
+
+        return tuple(node_state) if node_state is not None else None
+
+    def folded_nodes(self, node_id=None):
+        """Yields the nodes of the folded subtrees as `(node_id, parent_id,
+        previous_sibling_id, title)` tuples, missing ids being [`None`][].
+
+        Args:
+            node_id: The folded node whose subtree is walked, every folded
+                subtree being walked if [`None`][].
+        """
+        if node_id is None:
+            for folded_node_id in self.node_ids():
+                if folded_node_id in self.__folds:
+                    yield from self.folded_nodes(folded_node_id)
+
+            return
+
+        fold = self.__folds.get(node_id)
+        if fold is None:
+            return
+
+        stack = [node_id]
+        previous_sibling_ids = [None]
+
+        for current_id, depth, title in fold.expanded_entries():
+            del stack[depth:]
+            del previous_sibling_ids[depth + 1:]
+
+            if len(previous_sibling_ids) == depth:
+                previous_sibling_ids.append(None)
+
+            yield current_id, stack[-1], previous_sibling_ids[depth], title
+
+            previous_sibling_ids[depth] = current_id
+            stack.append(current_id)
+
+    def node_is_folded(self, node_id):
+        return node_id in self.__folds
+
+    # node *********************************************************************
+    def node_child_ids(self, node_id):
+        child_ids = []
+
+        child_id = self.__value("first_child_ids", node_id)
+        while child_id != -1:
+            child_ids.append(child_id)
+            child_id = self.__value("next_sibling_ids", child_id)
+
+        return child_ids
+
+    def node_ids(self, node_id=None, include_folded=False):
+        """Yields the ids of the nodes of a subtree in pre order.
+
+        Args:
+            node_id: The root of the subtree, the root of the snapshot if
+                [`None`][].
+            include_folded: Whether the ids of the nodes of the folded
+                subtrees are yielded as well, after the one of their folded
+                node.
+        """
+        if node_id is None:
+            node_id = self.__root_id
+
+        if node_id == -1:
+            return
+
+        stack = [node_id]
+
+        while stack:
+            node_id = stack.pop()
+
+            yield node_id
+
+            if include_folded and node_id in self.__folds:
+                yield from self.__folds[node_id].node_ids()
+
+            child_id = self.__value("last_child_ids", node_id)
+            while child_id != -1:
+                stack.append(child_id)
+                child_id = self.__value("previous_sibling_ids", child_id)
+
+    def nodes(self, node_id=None):
+        """Yields the nodes of a subtree as `(depth, title)` pairs in pre order,
+        the depth being relative to the root of the subtree.
+
+        The nodes of the folded subtrees are yielded as well.
+
+        Args:
+            node_id: The root of the subtree, the root of the snapshot if
+                [`None`][].
+        """
+        if node_id is None:
+            node_id = self.__root_id
+
+        if node_id == -1:
+            return
+
+        stack = [(node_id, 0)]
+
+        while stack:
+            node_id, depth = stack.pop()
+
+            yield depth, self.node_title(node_id)
+
+            if node_id in self.__folds:
+                yield from self.__folds[node_id].nodes(depth)
+
+            child_id = self.__value("last_child_ids", node_id)
+            while child_id != -1:
+                stack.append((child_id, depth + 1))
+                child_id = self.__value("previous_sibling_ids", child_id)
+
+    def node_depth(self, node_id):
+        return self.__value("depths", node_id)
+
+    def node_first_child_id(self, node_id):
+        first_child_id = self.__value("first_child_ids", node_id)
+
+        return first_child_id if first_child_id != -1 else None
+
+    def node_hash(self, node_id):
+        return self.__value("hashes", node_id)
+
+    def node_height(self, node_id):
+        return self.__value("heights", node_id)
+
+    def node_id_exists(self, node_id):
+        return self.__value_exists("alive", node_id) and self.__value("alive", node_id) == 1
+
+    def node_last_child_id(self, node_id):
+        last_child_id = self.__value("last_child_ids", node_id)
+
+        return last_child_id if last_child_id != -1 else None
+
+    def node_next_sibling_id(self, node_id):
+        next_sibling_id = self.__value("next_sibling_ids", node_id)
+
+        return next_sibling_id if next_sibling_id != -1 else None
+
+    def node_parent_id(self, node_id):
+        parent_id = self.__value("parent_ids", node_id)
+
+        return parent_id if parent_id != -1 else None
+
+    def node_previous_sibling_id(self, node_id):
+        previous_sibling_id = self.__value("previous_sibling_ids", node_id)
+
+        return previous_sibling_id if previous_sibling_id != -1 else None
+
+    def node_subtree_size(self, node_id):
+        return self.__value("subtree_sizes", node_id)
+
+    def node_title(self, node_id):
+        offset = self.__value("title_offsets", node_id)
+        length = self.__value("title_lengths", node_id)
+
+        return self.__title_buffer[offset:offset + length].decode("utf-8")
+
+    # root *********************************************************************
+    @property
+    def root_node_id(self):
+        return self.__root_id if self.__root_id != -1 else None
+
+    # size *********************************************************************
+    def __len__(self):
+        return self.__node_count
+
+    # value ********************************************************************
+    def __value(self, name, node_id):
+        return self.__pages[name][node_id >> self.__page_shift][node_id & self.__page_mask]
+
+    def __value_exists(self, name, node_id):
+        if not isinstance(node_id, int) or node_id < 0:
+            return False
+
+        pages = self.__pages[name]
+        page_index = node_id >> self.__page_shift
+
+        if page_index >= len(pages):
+            return False
+
+        return (node_id & self.__page_mask) < len(pages[page_index])
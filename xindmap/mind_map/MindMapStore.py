@@ -0,0 +1,898 @@
+import array
+import hashlib
+import itertools
+
+from .MindMapIdAllocator import MindMapIdAllocator
+from .MindMapSnapshot import MindMapSnapshot
+
+
+class MindMapStore:
+    """Stores the nodes of a [mind map][xindmap.mind_map.MindMap.MindMap] in
+    parallel arrays indexed by node id.
+
+    Instead of one object per node, each node is a slot in a set of typed
+    arrays holding the links of the tree (parent, first and last child,
+    previous and next sibling).
+    A missing link is stored as `-1`.
+    The slots of removed nodes are reused by the next added nodes.
+
+    Each node also holds aggregates of its subtree: its depth, the height of
+    its subtree and the number of nodes in it.
+    They are kept up to date by propagating changes along the ancestor path
+    when nodes are added or removed.
+
+    Each node holds as well a 64 bits hash of the content of its subtree,
+    mixing the hash of its title with the sum of a hash of each pair of
+    consecutive children, the first child being paired with `0`.
+    Adding, removing or rehashing a child only changes the pairs it is part of,
+    a change is therefore propagated along the ancestor path in constant time
+    per ancestor.
+    Equal subtrees, ids aside, have equal hashes.
+
+    Ancestor queries rely on one jump pointer per node, set on insertion from
+    the jump pointers of its parent so that they follow a skew-binary
+    decomposition of the ancestor path.
+    Reaching any ancestor by following either parent or jump pointers then
+    takes a logarithmic number of steps.
+
+    Titles are kept in a single append-only utf-8 buffer, each node storing the
+    offset and length of its title in it.
+    Setting a title appends it at the end of the buffer, the space of the old
+    title becomes garbage that is reclaimed by compacting the buffer once it
+    outweighs the live titles.
+
+    Arrays are split in pages of `1024` slots when taking a
+    [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot].
+    Every write marks the page of the written slot as dirty, a snapshot only
+    copies the dirty pages and shares the other ones with the previous
+    snapshot.
+    The title buffer is never modified in place, snapshots share it as is.
+
+    Nodes of a folded subtree are taken out of the arrays, their slots being
+    reserved so that they get their ids back once unfolded.
+    A reserved slot only keeps the parent of its node.
+    The folded node keeps the child hash sum of its former children, its hash
+    does not change while it is folded.
+
+    Attributes:
+        __alive: One byte per slot, `1` if the slot holds a node, `2` if it is
+            reserved for a folded node.
+        __child_hash_sums: Sum of the hashes of the pairs of consecutive
+            children of each node.
+        __depths: Depth of each node, the root being at depth `0`.
+        __dirty_pages: Indexes of the pages written since the last snapshot.
+        __first_child_ids: Id of the first child of each node.
+        __folded_child_hash_sums: Dictionnary mapping the ids of the folded
+            nodes to the child hash sum of their folded children.
+        __hashes: Hash of the subtree of each node.
+        __heights: Height of the subtree of each node, a leaf being of height `0`.
+        __id_allocator:
+            [Allocator][xindmap.mind_map.MindMapIdAllocator.MindMapIdAllocator]
+            of the node ids, reusing the slots of removed nodes.
+        __jump_ids: Id of the jump pointer of each node, the root jumping to itself.
+        __last_child_ids: Id of the last child of each node.
+        __next_sibling_ids: Id of the next sibling of each node.
+        __node_count: Number of alive nodes.
+        __parent_ids: Id of the parent of each node.
+        __previous_sibling_ids: Id of the previous sibling of each node.
+        __snapshot_pages:
+            Dictionnary mapping an array name to the pages of the array as of
+            the last snapshot.
+        __subtree_sizes: Number of nodes in the subtree of each node.
+        __title_buffer: Utf-8 buffer holding the titles.
+        __title_buffer_live_size: Number of bytes of the buffer still in use.
+        __title_hashes: Hash of the title of each node.
+        __title_lengths: Length in bytes of the title of each node.
+        __title_offsets: Offset of the title of each node in the buffer.
+    """
+    # aggregate ****************************************************************
+    def aggregates_update(self, node_id):
+        """Computes the aggregates of a subtree whose nodes were added without
+        propagation and propagates them to the ancestors of its root.
+        """
+        for current_id in self.subtree_ids(node_id):
+            subtree_size = 1
+            height = 0
+            child_hash_sum = self.__folded_child_hash_sums.get(current_id, 0)
+            previous_hash = 0
+
+            child_id = self.__first_child_ids[current_id]
+            while child_id != -1:
+                subtree_size += self.__subtree_sizes[child_id]
+                height = max(height, self.__heights[child_id] + 1)
+
+                child_hash = self.__hashes[child_id]
+                child_hash_sum += MindMapStore.__hash_pair(previous_hash, child_hash)
+                previous_hash = child_hash
+
+                child_id = self.__next_sibling_ids[child_id]
+
+            self.__subtree_sizes[current_id] = subtree_size
+            self.__heights[current_id] = height
+            self.__child_hash_sums[current_id] = child_hash_sum & MindMapStore.__hash_mask
+            self.__hashes[current_id] = self.__hash_compute(current_id)
+            self.__dirty_pages.add(current_id >> MindMapStore.__page_shift)
+
+        self.__ancestors_grow(node_id)
+
+    def aggregates_refresh(self, node_id):
+        """Recomputes the aggregates of a subtree, already propagated to the
+        ancestors of its root, to which nodes were added without propagation.
+        """
+        self.__ancestors_shrink(node_id)
+        self.aggregates_update(node_id)
+
+    def __ancestors_grow(self, node_id):
+        self.__hash_link(node_id, 1)
+
+        subtree_size = self.__subtree_sizes[node_id]
+        height = self.__heights[node_id] + 1
+
+        ancestor_id = self.__parent_ids[node_id]
+        while ancestor_id != -1:
+            self.__subtree_sizes[ancestor_id] += subtree_size
+            self.__dirty_pages.add(ancestor_id >> MindMapStore.__page_shift)
+
+            if height > self.__heights[ancestor_id]:
+                self.__heights[ancestor_id] = height
+                height += 1
+            else:
+                height = 0
+
+            ancestor_id = self.__parent_ids[ancestor_id]
+
+    def __ancestors_shrink(self, node_id):
+        self.__hash_link(node_id, -1)
+
+        subtree_size = self.__subtree_sizes[node_id]
+        height = self.__heights[node_id] + 1
+
+        ancestor_id = self.__parent_ids[node_id]
+        while ancestor_id != -1:
+            self.__subtree_sizes[ancestor_id] -= subtree_size
+            self.__dirty_pages.add(ancestor_id >> MindMapStore.__page_shift)
+
+            ancestor_height = self.__heights[ancestor_id]
+            if height and height == ancestor_height:
+                new_height = 0
+
+                child_id = self.__first_child_ids[ancestor_id]
+                while child_id != -1:
+                    if child_id != node_id:
+                        new_height = max(new_height, self.__heights[child_id] + 1)
+                    child_id = self.__next_sibling_ids[child_id]
+
+                self.__heights[ancestor_id] = new_height
+                height = ancestor_height + 1 if new_height != ancestor_height else 0
+            else:
+                height = 0
+
+            ancestor_id = self.__parent_ids[ancestor_id]
+
+    def depth(self, node_id):
+        return self.__depths[node_id]
+
+    def height(self, node_id):
+        return self.__heights[node_id]
+
+    def subtree_size(self, node_id):
+        return self.__subtree_sizes[node_id]
+
+    # ancestor *****************************************************************
+    def ancestor_at_depth(self, node_id, depth):
+        while self.__depths[node_id] > depth:
+            jump_id = self.__jump_ids[node_id]
+
+            if self.__depths[jump_id] < depth:
+                node_id = self.__parent_ids[node_id]
+            else:
+                node_id = jump_id
+
+        return node_id
+
+    def is_ancestor(self, ancestor_id, node_id):
+        depth = self.__depths[ancestor_id]
+
+        if depth >= self.__depths[node_id]:
+            return False
+
+        return self.ancestor_at_depth(node_id, depth) == ancestor_id
+
+    def lowest_common_ancestor(self, node_a_id, node_b_id):
+        depth_a = self.__depths[node_a_id]
+        depth_b = self.__depths[node_b_id]
+
+        if depth_a > depth_b:
+            node_a_id = self.ancestor_at_depth(node_a_id, depth_b)
+        else:
+            node_b_id = self.ancestor_at_depth(node_b_id, depth_a)
+
+        while node_a_id != node_b_id:
+            jump_a_id = self.__jump_ids[node_a_id]
+            jump_b_id = self.__jump_ids[node_b_id]
+
+            if jump_a_id == jump_b_id:
+                node_a_id = self.__parent_ids[node_a_id]
+                node_b_id = self.__parent_ids[node_b_id]
+            else:
+                node_a_id = jump_a_id
+                node_b_id = jump_b_id
+
+        return node_a_id
+
+    def path_to_root(self, node_id):
+        path = []
+
+        while node_id != -1:
+            path.append(node_id)
+            node_id = self.__parent_ids[node_id]
+
+        return path
+
+    # child ********************************************************************
+    def child_ids(self, node_id):
+        child_ids = []
+
+        child_id = self.__first_child_ids[node_id]
+        while child_id != -1:
+            child_ids.append(child_id)
+            child_id = self.__next_sibling_ids[child_id]
+
+        return child_ids
+
+    def first_child_id(self, node_id):
+        return self.__first_child_ids[node_id]
+
+    def last_child_id(self, node_id):
+        return self.__last_child_ids[node_id]
+
+    # clear ********************************************************************
+    def clear(self):
+        self.__alive = bytearray()
+        self.__first_child_ids = array.array("i")
+        self.__last_child_ids = array.array("i")
+        self.__next_sibling_ids = array.array("i")
+        self.__parent_ids = array.array("i")
+        self.__previous_sibling_ids = array.array("i")
+
+        self.__depths = array.array("I")
+        self.__heights = array.array("I")
+        self.__subtree_sizes = array.array("I")
+
+        self.__child_hash_sums = array.array("Q")
+        self.__hashes = array.array("Q")
+        self.__title_hashes = array.array("Q")
+
+        self.__jump_ids = array.array("i")
+
+        self.__folded_child_hash_sums = {}
+
+        self.__id_allocator = MindMapIdAllocator()
+
+        self.__dirty_pages = set()
+        self.__snapshot_pages = {}
+
+        self.__title_buffer = bytearray()
+        self.__title_buffer_live_size = 0
+        self.__title_lengths = array.array("I")
+        self.__title_offsets = array.array("Q")
+
+        self.__node_count = 0
+
+    # constructor **************************************************************
+    def __init__(self):
+        self.clear()
+
+    # fold *********************************************************************
+    @staticmethod
+    def fold_child_hash_sum(nodes):
+        """Computes the child hash sum of a node from the nodes of its subtree,
+        as the store would once they are added.
+
+        Args:
+            nodes: Iterable of `(depth, title)` pairs in pre order, the
+                children of the node being at depth `1`.
+        """
+        # each frame holds the depth, the title hash, the child hash sum and
+        # the hash of the last child of a node whose subtree is being read
+        stack = [[0, 0, 0, 0]]
+
+        for depth, title in itertools.chain(nodes, ((1, None),)):
+            while stack[-1][0] >= depth:
+                _, title_hash, child_hash_sum, _ = stack.pop()
+                node_hash = MindMapStore.__hash_mix(
+                    (title_hash * 0xD6E8FEB86659FD93 + child_hash_sum)
+                    & MindMapStore.__hash_mask
+                )
+
+                parent_frame = stack[-1]
+                parent_frame[2] = (
+                    parent_frame[2] + MindMapStore.__hash_pair(parent_frame[3], node_hash)
+                ) & MindMapStore.__hash_mask
+                parent_frame[3] = node_hash
+
+            if title is not None:
+                stack.append(
+                    [depth, MindMapStore.__hash_title(title.encode("utf-8")), 0, 0]
+                )
+
+        return stack[0][2]
+
+    def fold_remove(self, node_id):
+        """Forgets the child hash sum of a folded node about to be unfolded.
+
+        Its children are then expected to be restored, without propagation,
+        and
+        [`aggregates_refresh`][xindmap.mind_map.MindMapStore.MindMapStore.aggregates_refresh]
+        to be called on it.
+        """
+        del self.__folded_child_hash_sums[node_id]
+
+    def fold_set(self, node_id, child_hash_sum):
+        """Makes a childless node folded, its folded children summing to a
+        given child hash sum.
+
+        The node is expected to be part of nodes added without propagation.
+        """
+        self.__folded_child_hash_sums[node_id] = child_hash_sum
+        self.__child_hash_sums[node_id] = child_hash_sum
+
+    def node_is_reserved(self, node_id):
+        return 0 <= node_id < len(self.__alive) and self.__alive[node_id] == 2
+
+    def node_release(self, node_id):
+        """Frees the slot of a folded node that no longer exists."""
+        self.__alive[node_id] = 0
+        self.__parent_ids[node_id] = -1
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        self.__id_allocator.free(node_id)
+
+    def node_reserve(self, parent_id):
+        """Reserves a slot for a folded node.
+
+        Returns:
+            The id of the folded node.
+        """
+        node_id = self.__node_slot_allocate()
+
+        self.__alive[node_id] = 2
+        self.__parent_ids[node_id] = parent_id
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        return node_id
+
+    def subtree_fold(self, node_id):
+        """Takes the descendants of a node out of the arrays, their slots being
+        reserved, the node keeping the child hash sum of its children.
+
+        The titles of the descendants are expected to be read beforehand.
+
+        Returns:
+            The child hash sum of the node.
+        """
+        self.__ancestors_shrink(node_id)
+
+        for current_id in self.subtree_ids_pre_order(node_id)[1:]:
+            parent_id = self.__parent_ids[current_id]
+            self.__node_remove(current_id, False)
+            self.__alive[current_id] = 2
+            self.__parent_ids[current_id] = parent_id
+            self.__folded_child_hash_sums.pop(current_id, None)
+
+        child_hash_sum = self.__child_hash_sums[node_id]
+        self.__folded_child_hash_sums[node_id] = child_hash_sum
+
+        self.__first_child_ids[node_id] = -1
+        self.__last_child_ids[node_id] = -1
+        self.__heights[node_id] = 0
+        self.__subtree_sizes[node_id] = 1
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        self.__ancestors_grow(node_id)
+
+        return child_hash_sum
+
+    # hash *********************************************************************
+    __hash_mask = (1 << 64) - 1
+
+    @staticmethod
+    def __hash_mix(value):
+        """Scrambles the bits of a 64 bits value, as the finalizer of
+        splitmix64.
+        """
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MindMapStore.__hash_mask
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MindMapStore.__hash_mask
+
+        return value ^ (value >> 31)
+
+    @staticmethod
+    def __hash_pair(previous_hash, node_hash):
+        """Returns the hash of a pair of consecutive siblings."""
+        return MindMapStore.__hash_mix(
+            (previous_hash * 0x9E3779B97F4A7C15 + node_hash) & MindMapStore.__hash_mask
+        )
+
+    @staticmethod
+    def __hash_title(encoded_title):
+        return int.from_bytes(
+            hashlib.blake2b(encoded_title, digest_size=8).digest(), "little"
+        )
+
+    __empty_title_hash = int.from_bytes(
+        hashlib.blake2b(b"", digest_size=8).digest(), "little"
+    )
+
+    def __hash_compute(self, node_id):
+        return MindMapStore.__hash_mix(
+            (
+                self.__title_hashes[node_id] * 0xD6E8FEB86659FD93
+                + self.__child_hash_sums[node_id]
+            )
+            & MindMapStore.__hash_mask
+        )
+
+    def __hash_link(self, node_id, sign):
+        """Adds, or removes if `sign` is `-1`, the pairs of a linked node to
+        the child hash sum of its parent and propagates the change.
+        """
+        parent_id = self.__parent_ids[node_id]
+        if parent_id == -1:
+            return
+
+        previous_sibling_id = self.__previous_sibling_ids[node_id]
+        next_sibling_id = self.__next_sibling_ids[node_id]
+
+        previous_hash = self.__hashes[previous_sibling_id] if previous_sibling_id != -1 else 0
+        node_hash = self.__hashes[node_id]
+
+        delta = MindMapStore.__hash_pair(previous_hash, node_hash)
+
+        if next_sibling_id != -1:
+            next_hash = self.__hashes[next_sibling_id]
+            delta += MindMapStore.__hash_pair(node_hash, next_hash)
+            delta -= MindMapStore.__hash_pair(previous_hash, next_hash)
+
+        self.__child_hash_sums[parent_id] = (
+            self.__child_hash_sums[parent_id] + sign * delta
+        ) & MindMapStore.__hash_mask
+
+        self.__hashes_propagate(parent_id)
+
+    def __hashes_propagate(self, node_id):
+        """Recomputes the hash of a node whose title or children changed, then
+        the ones of its ancestors.
+        """
+        while node_id != -1:
+            previous_node_hash = self.__hashes[node_id]
+            node_hash = self.__hash_compute(node_id)
+
+            if node_hash == previous_node_hash:
+                return
+
+            self.__hashes[node_id] = node_hash
+            self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+            parent_id = self.__parent_ids[node_id]
+            if parent_id == -1:
+                return
+
+            previous_sibling_id = self.__previous_sibling_ids[node_id]
+            next_sibling_id = self.__next_sibling_ids[node_id]
+
+            previous_hash = self.__hashes[previous_sibling_id] if previous_sibling_id != -1 else 0
+
+            delta = (
+                MindMapStore.__hash_pair(previous_hash, node_hash)
+                - MindMapStore.__hash_pair(previous_hash, previous_node_hash)
+            )
+
+            if next_sibling_id != -1:
+                next_hash = self.__hashes[next_sibling_id]
+                delta += (
+                    MindMapStore.__hash_pair(node_hash, next_hash)
+                    - MindMapStore.__hash_pair(previous_node_hash, next_hash)
+                )
+
+            self.__child_hash_sums[parent_id] = (
+                self.__child_hash_sums[parent_id] + delta
+            ) & MindMapStore.__hash_mask
+
+            node_id = parent_id
+
+    def node_hash(self, node_id):
+        return self.__hashes[node_id]
+
+    # node *********************************************************************
+    def node_add(self, parent_id, propagate=True):
+        """Adds a node as last child of a parent.
+
+        If `propagate` is [`False`][], the aggregates of the ancestors are left
+        untouched and
+        [`aggregates_update`][xindmap.mind_map.MindMapStore.MindMapStore.aggregates_update]
+        must be called on the root of the added nodes once they are all added.
+        """
+        node_id = self.__node_slot_allocate()
+
+        previous_sibling_id = self.__last_child_ids[parent_id] if parent_id != -1 else -1
+        self.__node_insert(node_id, parent_id, previous_sibling_id, propagate)
+
+        return node_id
+
+    def node_exists(self, node_id):
+        return (
+            isinstance(node_id, int)
+            and 0 <= node_id < len(self.__alive)
+            and self.__alive[node_id] == 1
+        )
+
+    def __node_insert(self, node_id, parent_id, previous_sibling_id, propagate):
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        self.__alive[node_id] = 1
+        self.__first_child_ids[node_id] = -1
+        self.__last_child_ids[node_id] = -1
+        self.__parent_ids[node_id] = parent_id
+        self.__title_lengths[node_id] = 0
+        self.__title_offsets[node_id] = 0
+
+        self.__depths[node_id] = self.__depths[parent_id] + 1 if parent_id != -1 else 0
+        self.__heights[node_id] = 0
+        self.__subtree_sizes[node_id] = 1
+
+        self.__child_hash_sums[node_id] = 0
+        self.__title_hashes[node_id] = MindMapStore.__empty_title_hash
+        self.__hashes[node_id] = self.__hash_compute(node_id) if propagate else 0
+
+        self.__jump_ids[node_id] = self.__jump_id(node_id, parent_id)
+
+        self.__node_link(node_id, parent_id, previous_sibling_id)
+
+        self.__node_count += 1
+
+        if propagate:
+            self.__ancestors_grow(node_id)
+
+    def __node_link(self, node_id, parent_id, previous_sibling_id):
+        """Links a node among the children of its parent, right after a given
+        sibling or as first child if the sibling is `-1`.
+        """
+        next_sibling_id = -1
+
+        if parent_id != -1:
+            if previous_sibling_id == -1:
+                next_sibling_id = self.__first_child_ids[parent_id]
+                self.__first_child_ids[parent_id] = node_id
+            else:
+                next_sibling_id = self.__next_sibling_ids[previous_sibling_id]
+                self.__next_sibling_ids[previous_sibling_id] = node_id
+                self.__dirty_pages.add(previous_sibling_id >> MindMapStore.__page_shift)
+
+            if next_sibling_id == -1:
+                self.__last_child_ids[parent_id] = node_id
+            else:
+                self.__previous_sibling_ids[next_sibling_id] = node_id
+                self.__dirty_pages.add(next_sibling_id >> MindMapStore.__page_shift)
+
+            self.__dirty_pages.add(parent_id >> MindMapStore.__page_shift)
+
+        self.__previous_sibling_ids[node_id] = previous_sibling_id
+        self.__next_sibling_ids[node_id] = next_sibling_id
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+    def node_move(self, node_id, parent_id, previous_sibling_id):
+        """Moves a node and its subtree under a new parent, right after a given
+        sibling or as first child if the sibling is `-1`.
+
+        Reordering a node among its siblings only relinks it.
+        Otherwise the aggregates of the old and new ancestors are updated and
+        the depths and jump pointers of the subtree are recomputed.
+        """
+        previous_parent_id = self.__parent_ids[node_id]
+
+        if parent_id == previous_parent_id:
+            self.__hash_link(node_id, -1)
+            self.__node_unlink(node_id)
+            self.__node_link(node_id, parent_id, previous_sibling_id)
+            self.__hash_link(node_id, 1)
+            return
+
+        self.__ancestors_shrink(node_id)
+        self.__node_unlink(node_id)
+
+        self.__parent_ids[node_id] = parent_id
+        self.__node_link(node_id, parent_id, previous_sibling_id)
+
+        for current_id in self.subtree_ids_pre_order(node_id):
+            current_parent_id = self.__parent_ids[current_id]
+            self.__depths[current_id] = self.__depths[current_parent_id] + 1
+            self.__jump_ids[current_id] = self.__jump_id(current_id, current_parent_id)
+            self.__dirty_pages.add(current_id >> MindMapStore.__page_shift)
+
+        self.__ancestors_grow(node_id)
+
+    def __node_remove(self, node_id, is_freed=True):
+        self.__node_unlink(node_id)
+
+        self.__title_buffer_live_size -= self.__title_lengths[node_id]
+
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        self.__alive[node_id] = 0
+        self.__first_child_ids[node_id] = -1
+        self.__last_child_ids[node_id] = -1
+        self.__next_sibling_ids[node_id] = -1
+        self.__parent_ids[node_id] = -1
+        self.__previous_sibling_ids[node_id] = -1
+        self.__title_lengths[node_id] = 0
+        self.__title_offsets[node_id] = 0
+
+        self.__depths[node_id] = 0
+        self.__heights[node_id] = 0
+        self.__subtree_sizes[node_id] = 0
+
+        self.__child_hash_sums[node_id] = 0
+        self.__hashes[node_id] = 0
+        self.__title_hashes[node_id] = 0
+
+        self.__jump_ids[node_id] = -1
+
+        if is_freed:
+            self.__id_allocator.free(node_id)
+
+        self.__node_count -= 1
+
+    def __jump_id(self, node_id, parent_id):
+        if parent_id == -1:
+            return node_id
+
+        parent_jump_id = self.__jump_ids[parent_id]
+        parent_jump_jump_id = self.__jump_ids[parent_jump_id]
+
+        # two jumps of the same length are merged into one twice longer
+        if (
+            self.__depths[parent_id] - self.__depths[parent_jump_id]
+            == self.__depths[parent_jump_id] - self.__depths[parent_jump_jump_id]
+        ):
+            return parent_jump_jump_id
+
+        return parent_id
+
+    def node_restore(self, node_id, parent_id, previous_sibling_id, propagate=True):
+        """Adds a node back in the free slot of a removed node, right after a
+        given sibling or as first child if the sibling is `-1`.
+
+        See [`node_add`][xindmap.mind_map.MindMapStore.MindMapStore.node_add]
+        for `propagate`.
+        The slot may as well be reserved for a folded node.
+        """
+        if self.__alive[node_id] == 0:
+            self.__id_allocator.take(node_id)
+
+        self.__node_insert(node_id, parent_id, previous_sibling_id, propagate)
+
+    def __node_slot_allocate(self):
+        node_id = self.__id_allocator.allocate()
+
+        if node_id == len(self.__alive):
+            self.__alive.append(0)
+            self.__first_child_ids.append(-1)
+            self.__last_child_ids.append(-1)
+            self.__next_sibling_ids.append(-1)
+            self.__parent_ids.append(-1)
+            self.__previous_sibling_ids.append(-1)
+            self.__title_lengths.append(0)
+            self.__title_offsets.append(0)
+
+            self.__depths.append(0)
+            self.__heights.append(0)
+            self.__subtree_sizes.append(0)
+
+            self.__child_hash_sums.append(0)
+            self.__hashes.append(0)
+            self.__title_hashes.append(0)
+
+            self.__jump_ids.append(-1)
+
+        return node_id
+
+    def __node_unlink(self, node_id):
+        parent_id = self.__parent_ids[node_id]
+        previous_sibling_id = self.__previous_sibling_ids[node_id]
+        next_sibling_id = self.__next_sibling_ids[node_id]
+
+        if parent_id != -1:
+            if previous_sibling_id == -1:
+                self.__first_child_ids[parent_id] = next_sibling_id
+            else:
+                self.__next_sibling_ids[previous_sibling_id] = next_sibling_id
+                self.__dirty_pages.add(previous_sibling_id >> MindMapStore.__page_shift)
+
+            if next_sibling_id == -1:
+                self.__last_child_ids[parent_id] = previous_sibling_id
+            else:
+                self.__previous_sibling_ids[next_sibling_id] = previous_sibling_id
+                self.__dirty_pages.add(next_sibling_id >> MindMapStore.__page_shift)
+
+            self.__dirty_pages.add(parent_id >> MindMapStore.__page_shift)
+
+    # parent *******************************************************************
+    def parent_id(self, node_id):
+        return self.__parent_ids[node_id]
+
+    # sibling ******************************************************************
+    def next_sibling_id(self, node_id):
+        return self.__next_sibling_ids[node_id]
+
+    def previous_sibling_id(self, node_id):
+        return self.__previous_sibling_ids[node_id]
+
+    # snapshot *****************************************************************
+    __page_shift = 10
+
+    def snapshot(self, root_id, folds):
+        """Takes a [snapshot][xindmap.mind_map.MindMapSnapshot.MindMapSnapshot]
+        of this store.
+
+        Only the pages written since the last snapshot are copied, the other
+        ones are shared with the last snapshot.
+
+        Args:
+            root_id: The id of the root node, [`None`][] if the store is empty.
+            folds: Dictionnary mapping the ids of the folded nodes to their
+                [fold][xindmap.mind_map.MindMapFold.MindMapFold].
+        """
+        page_size = 1 << MindMapStore.__page_shift
+        page_count = (len(self.__alive) + page_size - 1) // page_size
+
+        arrays = {
+            "alive": self.__alive,
+            "depths": self.__depths,
+            "first_child_ids": self.__first_child_ids,
+            "hashes": self.__hashes,
+            "heights": self.__heights,
+            "last_child_ids": self.__last_child_ids,
+            "next_sibling_ids": self.__next_sibling_ids,
+            "parent_ids": self.__parent_ids,
+            "previous_sibling_ids": self.__previous_sibling_ids,
+            "subtree_sizes": self.__subtree_sizes,
+            "title_lengths": self.__title_lengths,
+            "title_offsets": self.__title_offsets,
+        }
+
+        # pages appended since the last call have never been copied
+        previous_page_count = len(self.__snapshot_pages.get("alive", ()))
+        self.__dirty_pages.update(range(previous_page_count, page_count))
+
+        dirty_pages = [
+            page_index
+            for page_index in self.__dirty_pages
+            if page_index < page_count
+        ]
+
+        for name, values in arrays.items():
+            pages = self.__snapshot_pages.get(name, [])[:page_count]
+            pages.extend(None for _ in range(len(pages), page_count))
+
+            for page_index in dirty_pages:
+                start = page_index * page_size
+                pages[page_index] = values[start:start + page_size]
+
+            self.__snapshot_pages[name] = pages
+
+        self.__dirty_pages = set()
+
+        return MindMapSnapshot(
+            {name: list(pages) for name, pages in self.__snapshot_pages.items()},
+            MindMapStore.__page_shift,
+            self.__title_buffer,
+            self.__node_count,
+            root_id if root_id is not None else -1,
+            folds,
+        )
+
+    # subtree ******************************************************************
+    def subtree_ids(self, node_id):
+        """Returns the ids of the nodes of a subtree, each child coming before
+        its parent and siblings in order.
+        """
+        # children are stacked in order so that reversing the visit order
+        # yields a post order where siblings keep their order
+        node_ids = []
+        stack = [node_id]
+
+        while stack:
+            current_id = stack.pop()
+            node_ids.append(current_id)
+            stack.extend(self.child_ids(current_id))
+
+        node_ids.reverse()
+
+        return node_ids
+
+    def subtree_ids_pre_order(self, node_id):
+        """Returns the ids of the nodes of a subtree, each parent coming before
+        its children and siblings in order.
+        """
+        node_ids = []
+        stack = [node_id]
+
+        while stack:
+            current_id = stack.pop()
+            node_ids.append(current_id)
+
+            child_id = self.__last_child_ids[current_id]
+            while child_id != -1:
+                stack.append(child_id)
+                child_id = self.__previous_sibling_ids[child_id]
+
+        return node_ids
+
+    def subtree_remove(self, node_id):
+        """Removes a node and its whole subtree.
+
+        Returns:
+            The removed node ids, each child coming before its parent.
+        """
+        self.__ancestors_shrink(node_id)
+
+        node_ids = self.subtree_ids(node_id)
+
+        for current_id in node_ids:
+            self.__node_remove(current_id)
+
+        return node_ids
+
+    # size *********************************************************************
+    def __len__(self):
+        return self.__node_count
+
+    # title ********************************************************************
+    def set_title(self, node_id, title, propagate=True):
+        """Sets the title of a node.
+
+        See [`node_add`][xindmap.mind_map.MindMapStore.MindMapStore.node_add]
+        for `propagate`, the hashes of the subtree being left untouched as
+        well.
+        """
+        encoded_title = title.encode("utf-8")
+
+        self.__title_hashes[node_id] = MindMapStore.__hash_title(encoded_title)
+        if propagate:
+            self.__hashes_propagate(node_id)
+
+        self.__title_buffer_live_size -= self.__title_lengths[node_id]
+
+        self.__title_offsets[node_id] = len(self.__title_buffer)
+        self.__title_lengths[node_id] = len(encoded_title)
+        self.__title_buffer += encoded_title
+
+        self.__dirty_pages.add(node_id >> MindMapStore.__page_shift)
+
+        self.__title_buffer_live_size += len(encoded_title)
+
+        if len(self.__title_buffer) > 2 * self.__title_buffer_live_size + 65536:
+            self.__title_buffer_compact()
+
+    def title(self, node_id):
+        offset = self.__title_offsets[node_id]
+        length = self.__title_lengths[node_id]
+
+        return self.__title_buffer[offset:offset + length].decode("utf-8")
+
+    def __title_buffer_compact(self):
+        title_buffer = bytearray()
+
+        for node_id, alive in enumerate(self.__alive):
+            if alive != 1:
+                continue
+
+            offset = self.__title_offsets[node_id]
+            length = self.__title_lengths[node_id]
+
+            self.__title_offsets[node_id] = len(title_buffer)
+            title_buffer += self.__title_buffer[offset:offset + length]
+
+        self.__title_buffer = title_buffer
+
+        self.__dirty_pages.update(range((len(self.__alive) >> MindMapStore.__page_shift) + 1))
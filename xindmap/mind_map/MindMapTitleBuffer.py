@@ -0,0 +1,99 @@
+class MindMapTitleBuffer:
+    """Gap buffer holding the title of the node being edited in a
+    [mind map][xindmap.mind_map.MindMap.MindMap].
+
+    Characters are stored in a list with a gap of free cells at the cursor.
+    Typing or erasing at the cursor only moves a bound of the gap, moving the
+    cursor moves the characters it steps over from one side of the gap to the
+    other.
+    The gap is doubled when full.
+
+    Attributes:
+        __chars: The characters, the gap cells holding empty strings.
+        __gap_end: Index of the first character after the gap.
+        __gap_start: Index of the gap, which is also the cursor.
+        __node_id: The id of the node whose title is edited.
+    """
+    # constructor **************************************************************
+    def __init__(self, node_id, title):
+        self.__node_id = node_id
+
+        gap_size = max(len(title), 16)
+
+        self.__chars = list(title) + [""] * gap_size
+        self.__gap_start = len(title)
+        self.__gap_end = len(self.__chars)
+
+    # cursor *******************************************************************
+    @property
+    def cursor(self):
+        """Returns the index of the cursor in the title."""
+        return self.__gap_start
+
+    def cursor_move(self, offset):
+        self.cursor_move_to(self.__gap_start + offset)
+
+    def cursor_move_to(self, index):
+        index = max(0, min(index, len(self)))
+
+        while self.__gap_start > index:
+            self.__gap_start -= 1
+            self.__gap_end -= 1
+            self.__chars[self.__gap_end] = self.__chars[self.__gap_start]
+
+        while self.__gap_start < index:
+            self.__chars[self.__gap_start] = self.__chars[self.__gap_end]
+            self.__gap_start += 1
+            self.__gap_end += 1
+
+    # edit *********************************************************************
+    def delete_after(self):
+        """Erases the character after the cursor.
+
+        Returns:
+            [`True`][] if a character was erased, [`False`][] otherwise.
+        """
+        if self.__gap_end == len(self.__chars):
+            return False
+
+        self.__gap_end += 1
+
+        return True
+
+    def delete_before(self):
+        """Erases the character before the cursor.
+
+        Returns:
+            [`True`][] if a character was erased, [`False`][] otherwise.
+        """
+        if self.__gap_start == 0:
+            return False
+
+        self.__gap_start -= 1
+
+        return True
+
+    def insert(self, text):
+        """Inserts a text at the cursor, leaving the cursor after it."""
+        if len(text) > self.__gap_end - self.__gap_start:
+            gap_size = max(len(text), len(self.__chars))
+            self.__chars[self.__gap_end:self.__gap_end] = [""] * gap_size
+            self.__gap_end += gap_size
+
+        self.__chars[self.__gap_start:self.__gap_start + len(text)] = text
+        self.__gap_start += len(text)
+
+    # node *********************************************************************
+    @property
+    def node_id(self):
+        return self.__node_id
+
+    # size *********************************************************************
+    def __len__(self):
+        return self.__gap_start + len(self.__chars) - self.__gap_end
+
+    # title ********************************************************************
+    def title(self):
+        return "".join(self.__chars[:self.__gap_start]) + "".join(
+            self.__chars[self.__gap_end:]
+        )
@@ -0,0 +1,125 @@
+class MindMapTitleIndex:
+    """Trigram index over the titles of a
+    [mind map][xindmap.mind_map.MindMap.MindMap].
+
+    Titles are case folded and split into all their substrings of three
+    characters.
+    Each trigram maps to the set of node ids whose title contains it.
+    A query is narrowed down to the intersection of the sets of its own
+    trigrams, starting from the smallest one.
+
+    Queries shorter than a trigram can not be narrowed down by this index.
+
+    Attributes:
+        __trigram_to_node_ids:
+            Dictionnary mapping a trigram to the ids of the nodes whose title
+            contains it.
+    """
+    # candidate ****************************************************************
+    def candidate_ids(self, query):
+        """Returns the ids of the nodes whose title may contain a query.
+
+        Returns:
+            A set of node ids to check, or [`None`][] if the query is too short
+            to be narrowed down and every node must be checked.
+        """
+        trigrams = MindMapTitleIndex.__trigrams(query.casefold())
+
+        if not trigrams:
+            return None
+
+        node_id_sets = []
+        for trigram in trigrams:
+            node_ids = self.__trigram_to_node_ids.get(trigram)
+
+            if node_ids is None:
+                return set()
+
+            node_id_sets.append(node_ids)
+
+        node_id_sets.sort(key=len)
+
+        candidate_ids = set(node_id_sets[0])
+        for node_ids in node_id_sets[1:]:
+            candidate_ids.intersection_update(node_ids)
+
+            if not candidate_ids:
+                break
+
+        return candidate_ids
+
+    # clear ********************************************************************
+    def clear(self):
+        self.__trigram_to_node_ids = {}
+
+    # constructor **************************************************************
+    def __init__(self):
+        self.__trigram_to_node_ids = {}
+
+    # node *********************************************************************
+    def node_add(self, node_id, title):
+        for trigram in MindMapTitleIndex.__trigrams(title.casefold()):
+            self.__trigram_add(trigram, node_id)
+
+    def node_remove(self, node_id, title):
+        for trigram in MindMapTitleIndex.__trigrams(title.casefold()):
+            self.__trigram_remove(trigram, node_id)
+
+    def node_title_set(self, node_id, previous_title, title):
+        previous_title = previous_title.casefold()
+        title = title.casefold()
+
+        # typing appends to the title, only the trigrams overlapping the
+        # appended text are new
+        if title.startswith(previous_title):
+            tail = title[max(len(previous_title) - 2, 0):]
+
+            for trigram in MindMapTitleIndex.__trigrams(tail):
+                self.__trigram_add(trigram, node_id)
+
+            return
+
+        # erasing removes the end of the title, only the trigrams overlapping
+        # the erased text may be gone
+        if previous_title.startswith(title):
+            tail = previous_title[max(len(title) - 2, 0):]
+
+            for trigram in MindMapTitleIndex.__trigrams(tail):
+                if trigram not in title:
+                    self.__trigram_remove(trigram, node_id)
+
+            return
+
+        previous_trigrams = MindMapTitleIndex.__trigrams(previous_title)
+        trigrams = MindMapTitleIndex.__trigrams(title)
+
+        for trigram in previous_trigrams - trigrams:
+            self.__trigram_remove(trigram, node_id)
+
+        for trigram in trigrams - previous_trigrams:
+            self.__trigram_add(trigram, node_id)
+
+    # trigram ******************************************************************
+    def __trigram_add(self, trigram, node_id):
+        node_ids = self.__trigram_to_node_ids.get(trigram)
+
+        if node_ids is None:
+            node_ids = set()
+            self.__trigram_to_node_ids[trigram] = node_ids
+
+        node_ids.add(node_id)
+
+    def __trigram_remove(self, trigram, node_id):
+        node_ids = self.__trigram_to_node_ids.get(trigram)
+
+        if node_ids is None:
+            return
+
+        node_ids.discard(node_id)
+
+        if not node_ids:
+            del self.__trigram_to_node_ids[trigram]
+
+    @staticmethod
+    def __trigrams(text):
+        return {text[index:index + 3] for index in range(len(text) - 2)}
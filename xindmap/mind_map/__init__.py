@@ -1,3 +1,10 @@
 from .MindMap import MindMap
+from .MindMapChangeTracker import MindMapChangeTracker
+from .MindMapDiff import MindMapDiff
 from .MindMapError import MindMapError
 from .MindMapEvent import MindMapEvent
+from .MindMapFold import MindMapFold
+from .MindMapHistory import MindMapHistory
+from .MindMapMerge import MindMapMerge
+from .MindMapSnapshot import MindMapSnapshot
+from .MindMapTitleBuffer import MindMapTitleBuffer
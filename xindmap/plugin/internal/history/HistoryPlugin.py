@@ -0,0 +1,29 @@
+import xindmap.plugin
+
+
+class HistoryPlugin(xindmap.plugin.Plugin):
+    # command ******************************************************************
+    def commands(self):
+        return [
+            ("redo", self.command_redo),
+            ("undo", self.command_undo),
+        ]
+
+    def command_redo(self, api):
+        node = api.redo(wait=True)
+        self.__node_select(node, api)
+
+    def command_undo(self, api):
+        node = api.undo(wait=True)
+        self.__node_select(node, api)
+
+    # constructor **************************************************************
+    def __init__(self):
+        super().__init__()
+
+    # select *******************************************************************
+    def __node_select(self, node, api):
+        if node is None or not api.node_exists(node):
+            return
+
+        api.select_node(node)
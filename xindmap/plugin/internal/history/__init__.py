@@ -0,0 +1 @@
+from .HistoryPlugin import HistoryPlugin
@@ -16,17 +16,10 @@ class MovePlugin(xindmap.plugin.Plugin):
         if current_node is None:
             return
 
-        parent = api.parent_node(current_node)
-        if parent is None:
+        next_sibling = api.next_sibling_node(current_node)
+        if next_sibling is None:
             return
 
-        siblings = api.children_node(parent)
-        siblings.sort()
-        current_node_index = siblings.index(current_node)
-        if current_node_index >= len(siblings) - 1:
-            return
-
-        next_sibling = siblings[current_node_index + 1]
         api.select_node(next_sibling)
 
     def command_move_left(self, api):
@@ -45,13 +38,10 @@ class MovePlugin(xindmap.plugin.Plugin):
         if current_node is None:
             return
 
-        children = api.children_node(current_node)
-        if not children:
+        first_child = api.first_child_node(current_node)
+        if first_child is None:
             return
 
-        children.sort()
-        first_child = children[0]
-
         api.select_node(first_child)
 
     def command_move_up(self, api):
@@ -59,17 +49,10 @@ class MovePlugin(xindmap.plugin.Plugin):
         if current_node is None:
             return
 
-        parent = api.parent_node(current_node)
-        if parent is None:
-            return
-
-        siblings = api.children_node(parent)
-        siblings.sort()
-        current_node_index = siblings.index(current_node)
-        if current_node_index == 0:
+        previous_sibling = api.previous_sibling_node(current_node)
+        if previous_sibling is None:
             return
 
-        previous_sibling = siblings[current_node_index - 1]
         api.select_node(previous_sibling)
 
     # constructor **************************************************************
@@ -6,6 +6,13 @@ class NodePlugin(xindmap.plugin.Plugin):
         return [
             ("add_node", self.command_add_node),
             ("delete_node", self.command_delete_node),
+            ("fold_node", self.command_fold_node),
+            ("move_node_down", self.command_move_node_down),
+            ("move_node_left", self.command_move_node_left),
+            ("move_node_right", self.command_move_node_right),
+            ("move_node_up", self.command_move_node_up),
+            ("toggle_fold_node", self.command_toggle_fold_node),
+            ("unfold_node", self.command_unfold_node),
         ]
 
     def command_add_node(self, api):
@@ -22,6 +29,75 @@ class NodePlugin(xindmap.plugin.Plugin):
         if parent is not None:
             api.select_node(parent)
 
+    def command_fold_node(self, api):
+        if api.current_node() is None:
+            return
+
+        api.fold_node()
+
+    def command_move_node_down(self, api):
+        current_node = api.current_node()
+        if current_node is None:
+            return
+
+        next_sibling = api.next_sibling_node(current_node)
+        if next_sibling is None:
+            return
+
+        api.move_node_after(current_node, api.parent_node(current_node), next_sibling)
+
+    def command_move_node_left(self, api):
+        current_node = api.current_node()
+        if current_node is None:
+            return
+
+        parent = api.parent_node(current_node)
+        if parent is None or parent == api.root_node():
+            return
+
+        api.move_node_after(current_node, api.parent_node(parent), parent)
+
+    def command_move_node_right(self, api):
+        current_node = api.current_node()
+        if current_node is None:
+            return
+
+        previous_sibling = api.previous_sibling_node(current_node)
+        if previous_sibling is None:
+            return
+
+        api.move_node(current_node, previous_sibling)
+
+    def command_move_node_up(self, api):
+        current_node = api.current_node()
+        if current_node is None:
+            return
+
+        previous_sibling = api.previous_sibling_node(current_node)
+        if previous_sibling is None:
+            return
+
+        api.move_node_after(
+            current_node,
+            api.parent_node(current_node),
+            api.previous_sibling_node(previous_sibling),
+        )
+
+    def command_toggle_fold_node(self, api):
+        if api.current_node() is None:
+            return
+
+        if api.node_is_folded():
+            api.unfold_node(levels=1)
+        else:
+            api.fold_node()
+
+    def command_unfold_node(self, api):
+        if api.current_node() is None:
+            return
+
+        api.unfold_node(levels=1)
+
     # constructor **************************************************************
     def __init__(self):
         super().__init__()
@@ -0,0 +1,72 @@
+import logging
+
+import xindmap.plugin
+
+
+class SearchPlugin(xindmap.plugin.Plugin):
+    # command ******************************************************************
+    def commands(self):
+        return [
+            ("search", self.command_search),
+            ("search_next", self.command_search_next),
+            ("search_previous", self.command_search_previous),
+        ]
+
+    def command_search(self, *words, api):
+        query = " ".join(words)
+
+        self.__query = query.casefold()
+        self.__results = api.search_nodes(query)
+        self.__result_index = 0
+
+        if not self.__results:
+            logging.info(f'no node found for "{query}"')
+            return
+
+        self.__result_select(api)
+
+    def command_search_next(self, api):
+        if not self.__results:
+            return
+
+        self.__result_index = (self.__result_index + 1) % len(self.__results)
+        self.__result_select(api)
+
+    def command_search_previous(self, api):
+        if not self.__results:
+            return
+
+        self.__result_index = (self.__result_index - 1) % len(self.__results)
+        self.__result_select(api)
+
+    # constructor **************************************************************
+    def __init__(self):
+        super().__init__()
+
+        self.__query = ""
+        self.__results = []
+        self.__result_index = 0
+
+    # result *******************************************************************
+    def __result_is_stale(self, api, node_id):
+        """Tells whether a result no longer matches the query, such as a node
+        deleted since the search, whose id may have been given to another
+        node, or retitled.
+        """
+        return (
+            not api.node_exists(node_id)
+            or self.__query not in api.node_title(node_id).casefold()
+        )
+
+    def __result_select(self, api):
+        while self.__result_is_stale(api, self.__results[self.__result_index]):
+            del self.__results[self.__result_index]
+
+            if not self.__results:
+                return
+
+            self.__result_index %= len(self.__results)
+
+        node = self.__results[self.__result_index]
+        api.select_node(node)
+        api.center_view(node)
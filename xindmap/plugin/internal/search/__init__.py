@@ -0,0 +1 @@
+from .SearchPlugin import SearchPlugin
@@ -6,10 +6,28 @@ import xindmap.state
 
 class StateViewer(ctk.CTkFrame, xindmap.config.Configurable):
     # callback *****************************************************************
+    def on_mind_map_loader_ended(self, mind_map_loader, event):
+        logging.debug(f"state viewer {id(self)}: on_mind_map_loader_ended(event={event})")
+
+        self.__load_progress_text = None
+        self.__update_label_text()
+
+    def on_mind_map_loader_progressed(self, mind_map_loader, event):
+        logging.debug(f"state viewer {id(self)}: on_mind_map_loader_progressed(event={event})")
+
+        if event.node_count is None:
+            self.__load_progress_text = "loading..."
+        else:
+            percentage = 100 * event.loaded_node_count // max(event.node_count, 1)
+            self.__load_progress_text = f"loading {percentage}%"
+
+        self.__update_label_text()
+
     def on_state_holder_state_set(self, state_holder, event):
         logging.debug(f"state viewer {id(self)}: on_state_holder_state_set(event={event})")
 
-        self.__update_label_text(event.state)
+        self.__state = event.state
+        self.__update_label_text()
 
     # config callback **********************************************************
     def on_config_variable_state_viewer_height_px_set(self, value):
@@ -22,6 +40,9 @@ class StateViewer(ctk.CTkFrame, xindmap.config.Configurable):
             self, [xindmap.config.Variables.state_viewer_height_px]
         )
 
+        self.__load_progress_text = None
+        self.__state = xindmap.state.State.none
+
         self.__label_text = ctk.StringVar(value="hello")
         self.__label = ctk.CTkLabel(
             self,
@@ -39,5 +60,10 @@ class StateViewer(ctk.CTkFrame, xindmap.config.Configurable):
         xindmap.state.State.none: "-- ... --",
     }
 
-    def __update_label_text(self, state):
-        self.__label_text.set(StateViewer.__state_to_text[state])
+    def __update_label_text(self):
+        text = StateViewer.__state_to_text[self.__state]
+
+        if self.__load_progress_text is not None:
+            text = f"{text} {self.__load_progress_text}"
+
+        self.__label_text.set(text)
@@ -0,0 +1,76 @@
+class ChildIdList:
+    """Ordered ids of the drawn children of a node.
+
+    Children are linked to their siblings so that they are inserted, removed
+    and told last in a constant time, whatever their number.
+
+    Attributes:
+        __first_id: The id of the first child, [`None`][] if there is none.
+        __last_id: The id of the last child, [`None`][] if there is none.
+        __next_ids: Dictionnary mapping the id of each child to the one of its
+            next sibling, [`None`][] for the last one.
+        __previous_ids: Dictionnary mapping the id of each child to the one of
+            its previous sibling, [`None`][] for the first one.
+    """
+    # child ********************************************************************
+    def __contains__(self, node_id):
+        return node_id in self.__next_ids
+
+    def insert_after(self, previous_id, node_id):
+        """Inserts a child right after one of its siblings.
+
+        Args:
+            previous_id: The id of the previous sibling, first if [`None`][].
+            node_id: The id of the inserted child.
+        """
+        if previous_id is None:
+            next_id = self.__first_id
+            self.__first_id = node_id
+        else:
+            next_id = self.__next_ids[previous_id]
+            self.__next_ids[previous_id] = node_id
+
+        if next_id is None:
+            self.__last_id = node_id
+        else:
+            self.__previous_ids[next_id] = node_id
+
+        self.__next_ids[node_id] = next_id
+        self.__previous_ids[node_id] = previous_id
+
+    @property
+    def last_id(self):
+        return self.__last_id
+
+    def remove(self, node_id):
+        next_id = self.__next_ids.pop(node_id)
+        previous_id = self.__previous_ids.pop(node_id)
+
+        if previous_id is None:
+            self.__first_id = next_id
+        else:
+            self.__next_ids[previous_id] = next_id
+
+        if next_id is None:
+            self.__last_id = previous_id
+        else:
+            self.__previous_ids[next_id] = previous_id
+
+    # constructor **************************************************************
+    def __init__(self):
+        self.__first_id = None
+        self.__last_id = None
+        self.__next_ids = {}
+        self.__previous_ids = {}
+
+    # iteration ****************************************************************
+    def __iter__(self):
+        node_id = self.__first_id
+
+        while node_id is not None:
+            yield node_id
+            node_id = self.__next_ids[node_id]
+
+    # size *********************************************************************
+    def __len__(self):
+        return len(self.__next_ids)
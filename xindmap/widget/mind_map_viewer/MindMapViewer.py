@@ -1,9 +1,9 @@
 import customtkinter as ctk
 import logging
 import queue
-import sortedcontainers
 import xindmap.config
 
+from .ChildIdList import ChildIdList
 from .EdgeDrawing import EdgeDrawing
 from .MindMapViewerError import MindMapViewerError
 from .MindNodeDrawing import MindNodeDrawing
@@ -12,6 +12,47 @@ from .RootNodeDrawing import RootNodeDrawing
 
 class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
     # callback *****************************************************************
+    def on_mind_map_changed(self, mind_map, event):
+        logging.debug(
+            f"mind map viewer {id(self)}: on_mind_map_changed(event={event})"
+        )
+
+        # moved nodes are detached first so that they do not go along with
+        # their deleted former ancestors, and attached last once their new
+        # parent is drawn
+        node_id_to_edge_drawing = {
+            node_id: self.__node_drawing_detach(node_id)
+            for node_id in event.moved_node_ids
+        }
+
+        for node_id in event.deleted_node_ids:
+            if node_id in self.__node_id_to_drawing:
+                self.__node_drawing_delete(node_id)
+
+        # a node added during a transaction may have been moved under a node
+        # added after it, parents are ensured to come first by sorting on depth,
+        # nodes folded since are left undrawn
+        added_node_ids = [
+            node_id for node_id in event.added_node_ids if mind_map.node_id_exists(node_id)
+        ]
+
+        for node_id in sorted(added_node_ids, key=mind_map.node_depth):
+            node_drawing = self.__node_drawing_add(mind_map, node_id)
+            if node_drawing is not None:
+                node_drawing.title = mind_map.node_title(node_id)
+
+        for node_id, edge_drawing in node_id_to_edge_drawing.items():
+            self.__node_drawing_attach(mind_map, node_id, edge_drawing)
+
+        for node_id in event.title_set_node_ids:
+            if node_id in self.__node_id_to_drawing:
+                node_drawing = self.__node_id_to_drawing[node_id]
+                node_drawing.title = mind_map.node_title(node_id)
+
+        if self.__root_id is not None:
+            self.__node_drawing_compute_height_and_y(self.__root_id)
+            self.__node_drawing_compute_width_and_x(self.__root_id)
+
     def on_mind_map_cleared(self, mind_map, event):
         logging.debug(
             f"mind map viewer {id(self)}: on_mind_map_cleared(event={event})"
@@ -31,63 +72,54 @@ class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
         )
 
         node_id = event.node_id
-        parent_id = mind_map.node_parent_id(node_id)
 
-        if self.__root_id is None:
-            self.__root_id = node_id
+        if self.__node_drawing_add(mind_map, node_id) is None:
+            return
 
-        if node_id == self.__root_id:
-            node_drawing = RootNodeDrawing(self.__canvas)
-        else:
-            node_drawing = MindNodeDrawing(self.__canvas)
+        self.__node_drawing_compute_height_and_y(node_id)
+        self.__node_drawing_compute_width_and_x(node_id)
 
-        self.__node_id_to_child_ids[node_id] = sortedcontainers.SortedList()
-        self.__node_id_to_drawing[node_id] = node_drawing
-        self.__node_id_to_edge_drawings[node_id] = {}
-        self.__node_id_to_parent_id[node_id] = parent_id
+    def on_mind_map_node_deleted(self, mind_map, event):
+        logging.debug(f"mind map viewer {id(self)}: on_mind_map_node_deleted(event={event})")
 
-        if parent_id is not None:
-            self.__node_id_to_child_ids[parent_id].add(node_id)
+        # folded nodes are not drawn
+        if event.node_id not in self.__node_id_to_drawing:
+            return
 
-            edge_drawing = EdgeDrawing(self.__canvas)
-            self.__node_id_to_edge_drawings[parent_id][node_id] = edge_drawing
+        parent_id = self.__node_drawing_remove(event.node_id)
 
-        self.__node_drawing_compute_height_and_y(node_id)
-        self.__node_drawing_compute_width_and_x(node_id)
+        if parent_id is not None:
+            self.__node_drawing_compute_height_and_y(parent_id)
+            self.__node_drawing_compute_width_and_x(parent_id)
 
-    def on_mind_map_node_deleted(self, mind_map, event):
-        def on_mind_map_node_deleted_recursivity(node_id):
-            child_ids = list(self.__node_id_to_child_ids[node_id])
-            for child_id in child_ids:
-                on_mind_map_node_deleted_recursivity(child_id)
-            del self.__node_id_to_child_ids[node_id]
+    def on_mind_map_node_folded(self, mind_map, event):
+        logging.debug(f"mind map viewer {id(self)}: on_mind_map_node_folded(event={event})")
 
-            for edge_drawing in self.__node_id_to_edge_drawings[node_id].values():
-                edge_drawing.clear()
-            del self.__node_id_to_edge_drawings[node_id]
+        node_id = event.node_id
 
-            self.__node_id_to_drawing[node_id].clear()
-            del self.__node_id_to_drawing[node_id]
+        if node_id not in self.__node_id_to_drawing:
+            return
 
-            parent_id = self.__node_id_to_parent_id.get(node_id, None)
-            if parent_id is not None:
-                self.__node_id_to_child_ids[parent_id].remove(node_id)
-                self.__node_id_to_edge_drawings[parent_id][node_id].clear()
-                del self.__node_id_to_edge_drawings[parent_id][node_id]
+        for child_id in list(self.__node_id_to_child_ids[node_id]):
+            self.__node_drawing_remove(child_id)
 
-            if node_id == self.__root_id:
-                self.__root_id = None
+        self.__node_id_to_drawing[node_id].is_folded = True
 
-        logging.debug(f"mind map viewer {id(self)}: on_mind_map_node_deleted(event={event})")
+        self.__node_drawing_compute_height_and_y(node_id)
+        self.__node_drawing_compute_width_and_x(node_id)
+
+    def on_mind_map_node_moved(self, mind_map, event):
+        logging.debug(f"mind map viewer {id(self)}: on_mind_map_node_moved(event={event})")
 
         node_id = event.node_id
-        parent_id = self.__node_id_to_parent_id.get(node_id, None)
 
-        on_mind_map_node_deleted_recursivity(node_id)
+        edge_drawing = self.__node_drawing_detach(node_id)
+        self.__node_drawing_attach(mind_map, node_id, edge_drawing)
 
-        if parent_id is not None:
-            self.__node_drawing_compute_height_and_y(parent_id)
-            self.__node_drawing_compute_width_and_x(parent_id)
+        self.__node_drawing_compute_height_and_y(self.__root_id)
+
+        if node_id in self.__node_id_to_drawing:
+            self.__node_drawing_compute_width_and_x(node_id)
 
     def on_mind_map_node_selected(self, mind_map, event):
         logging.debug(f"mind map viewer {id(self)}: on_mind_map_node_selected(event={event})")
@@ -111,9 +143,64 @@ class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
 
         if node_id in self.__node_id_to_drawing:
             node_drawing = self.__node_id_to_drawing[node_id]
+
+            previous_title_width = node_drawing.title_width()
             node_drawing.title = title
+            node_drawing.cursor = getattr(event, "cursor", None)
 
-            self.__node_drawing_compute_width_and_x(node_id)
+            # the title stays centered, the layout only depends on its width
+            if node_drawing.title_width() != previous_title_width:
+                self.__node_drawing_compute_width_and_x(node_id)
+
+    def on_mind_map_node_unfolded(self, mind_map, event):
+        logging.debug(
+            f"mind map viewer {id(self)}: on_mind_map_node_unfolded(event={event})"
+        )
+
+        node_id = event.node_id
+
+        if node_id not in self.__node_id_to_drawing:
+            return
+
+        self.__node_id_to_drawing[node_id].is_folded = mind_map.node_is_folded(node_id)
+
+        # unfolded nodes come in pre order, parents first
+        for unfolded_node_id in event.node_ids:
+            if (
+                mind_map.node_id_exists(unfolded_node_id)
+                and unfolded_node_id not in self.__node_id_to_drawing
+            ):
+                node_drawing = self.__node_drawing_add(mind_map, unfolded_node_id)
+                if node_drawing is not None:
+                    node_drawing.title = mind_map.node_title(unfolded_node_id)
+
+        self.__node_drawing_compute_height_and_y(node_id)
+        self.__node_drawing_compute_width_and_x(node_id)
+
+    def on_mind_map_subtree_added(self, mind_map, event):
+        logging.debug(
+            f"mind map viewer {id(self)}: on_mind_map_subtree_added(event={event})"
+        )
+
+        node_id = event.node_id
+
+        # nodes folded since are left undrawn
+        subtree_node_ids = [
+            subtree_node_id
+            for subtree_node_id in event.node_ids
+            if mind_map.node_id_exists(subtree_node_id)
+        ]
+
+        for subtree_node_id in subtree_node_ids:
+            node_drawing = self.__node_drawing_add(mind_map, subtree_node_id)
+            if node_drawing is not None:
+                node_drawing.title = mind_map.node_title(subtree_node_id)
+
+        if node_id not in self.__node_id_to_drawing:
+            return
+
+        self.__node_drawing_compute_height_and_y(node_id)
+        self.__node_drawing_compute_width_and_x(node_id)
 
     # config callback **********************************************************
     def on_config_variable_mind_map_viewer_node_height_set(self, value):
@@ -132,6 +219,30 @@ class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
         if self.__root_id is not None:
             self.__node_drawing_compute_height_and_y(self.__root_id)
 
+    # child ********************************************************************
+    def __child_id_insert(self, mind_map, parent_id, node_id):
+        """Inserts a node among the children of its parent, in the order of
+        the mind map.
+
+        Returns:
+            [`False`][] if the parent is not drawn, the node being left out,
+            [`True`][] otherwise.
+        """
+        if parent_id not in self.__node_id_to_child_ids:
+            return False
+
+        child_ids = self.__node_id_to_child_ids[parent_id]
+        previous_sibling_id = mind_map.node_previous_sibling_id(node_id)
+
+        # within a transaction, previous siblings may not be drawn yet, the
+        # node goes after the closest one that is
+        while previous_sibling_id is not None and previous_sibling_id not in child_ids:
+            previous_sibling_id = mind_map.node_previous_sibling_id(previous_sibling_id)
+
+        child_ids.insert_after(previous_sibling_id, node_id)
+
+        return True
+
     # constructor **************************************************************
     def __init__(self, parent):
         ctk.CTkFrame.__init__(self, parent)
@@ -170,6 +281,41 @@ class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
             edge_drawing.set_coords(from_x, from_y, to_x, to_y)
 
     # node drawing *************************************************************
+    def __node_drawing_add(self, mind_map, node_id):
+        """Adds the drawing of a node under the drawing of its parent.
+
+        Returns:
+            The drawing of the node, [`None`][] if its parent is not drawn.
+        """
+        parent_id = mind_map.node_parent_id(node_id)
+
+        # the parent may have been folded since the node was added
+        if parent_id is not None and parent_id not in self.__node_id_to_drawing:
+            return None
+
+        if self.__root_id is None:
+            self.__root_id = node_id
+
+        if node_id == self.__root_id:
+            node_drawing = RootNodeDrawing(self.__canvas)
+        else:
+            node_drawing = MindNodeDrawing(self.__canvas)
+
+        node_drawing.is_folded = mind_map.node_is_folded(node_id)
+
+        self.__node_id_to_child_ids[node_id] = ChildIdList()
+        self.__node_id_to_drawing[node_id] = node_drawing
+        self.__node_id_to_edge_drawings[node_id] = {}
+        self.__node_id_to_parent_id[node_id] = parent_id
+
+        if parent_id is not None:
+            self.__child_id_insert(mind_map, parent_id, node_id)
+
+            edge_drawing = EdgeDrawing(self.__canvas)
+            self.__node_id_to_edge_drawings[parent_id][node_id] = edge_drawing
+
+        return node_drawing
+
     def __node_drawing_compute_height_and_y(self, node_id):
         priority_queue = queue.PriorityQueue()
         priority_queue_items = set()
@@ -277,14 +423,90 @@ class MindMapViewer(ctk.CTkFrame, xindmap.config.Configurable):
                 x = parent_drawing.x + parent_drawing.width + config.get(xindmap.config.Variables.mind_map_viewer_node_margin_x)
                 node_drawing.x = x
 
-                node_index = self.__node_id_to_child_ids[node_parent_id].index(node_id)
-                if node_index == len(self.__node_id_to_child_ids[node_parent_id]) - 1:
+                if self.__node_id_to_child_ids[node_parent_id].last_id == node_id:
                     self.__edge_drawing_compute_from_and_to(node_parent_id)
 
             for child_id in node_child_ids:
                 item = (priority + 1, child_id)
                 priority_queue.put(item)
 
+    def __node_drawing_attach(self, mind_map, node_id, edge_drawing):
+        """Attaches a detached node under its parent in the mind map, its
+        subtree being removed if its parent is not drawn.
+        """
+        parent_id = mind_map.node_parent_id(node_id)
+
+        if not self.__child_id_insert(mind_map, parent_id, node_id):
+            edge_drawing.clear()
+            self.__node_drawing_remove(node_id)
+            return
+
+        self.__node_id_to_edge_drawings[parent_id][node_id] = edge_drawing
+        self.__node_id_to_parent_id[node_id] = parent_id
+
+    def __node_drawing_delete(self, node_id):
+        """Removes the drawings of a node, its children being already removed
+        or detached.
+        """
+        del self.__node_id_to_child_ids[node_id]
+
+        for edge_drawing in self.__node_id_to_edge_drawings[node_id].values():
+            edge_drawing.clear()
+        del self.__node_id_to_edge_drawings[node_id]
+
+        self.__node_id_to_drawing[node_id].clear()
+        del self.__node_id_to_drawing[node_id]
+
+        # within a transaction, the parent may have been deleted first
+        parent_id = self.__node_id_to_parent_id.pop(node_id, None)
+        if parent_id in self.__node_id_to_child_ids:
+            self.__node_id_to_child_ids[parent_id].remove(node_id)
+            self.__node_id_to_edge_drawings[parent_id][node_id].clear()
+            del self.__node_id_to_edge_drawings[parent_id][node_id]
+
+        if node_id == self.__root_id:
+            self.__root_id = None
+
+    def __node_drawing_detach(self, node_id):
+        """Detaches a node from its parent, keeping the drawings of its
+        subtree.
+
+        Returns:
+            The drawing of the edge leading to the node.
+        """
+        parent_id = self.__node_id_to_parent_id[node_id]
+
+        self.__node_id_to_child_ids[parent_id].remove(node_id)
+        edge_drawing = self.__node_id_to_edge_drawings[parent_id].pop(node_id)
+        self.__node_id_to_parent_id[node_id] = None
+
+        # the edges of the parent start from the position of its last child
+        if self.__node_id_to_child_ids[parent_id]:
+            self.__edge_drawing_compute_from_and_to(parent_id)
+
+        return edge_drawing
+
+    def __node_drawing_remove(self, node_id):
+        """Removes the drawings of a node and of its subtree.
+
+        Returns:
+            The id of the parent of the node, [`None`][] if it has none.
+        """
+        parent_id = self.__node_id_to_parent_id.get(node_id, None)
+
+        node_ids = []
+        stack = [node_id]
+
+        while stack:
+            node_id = stack.pop()
+            node_ids.append(node_id)
+            stack.extend(self.__node_id_to_child_ids[node_id])
+
+        for node_id in reversed(node_ids):
+            self.__node_drawing_delete(node_id)
+
+        return parent_id
+
     # view *********************************************************************
     def view_center_on_node(self, node_id):
         if node_id not in self.__node_id_to_drawing:
@@ -37,6 +37,8 @@ class MindNodeDrawing:
         self._width = 0
         self._height = 0
 
+        self.__cursor = None
+        self.__is_folded = False
         self._is_selected = False
 
         self._hitbox_id = self.__canvas.create_rectangle(
@@ -44,6 +46,26 @@ class MindNodeDrawing:
         )
         self._title_id = self.__canvas.create_text(self._x, self._y, text="", anchor=ctk.CENTER)
 
+    # cursor *******************************************************************
+    @property
+    def cursor(self):
+        return self.__cursor
+
+    @cursor.setter
+    def cursor(self, cursor):
+        """Shows the insertion cursor at the given index of the title, hides it
+        if [`None`][].
+        """
+        previous_cursor = self.__cursor
+        self.__cursor = cursor
+
+        if cursor is None:
+            if previous_cursor is not None:
+                self.__canvas.focus("")
+        else:
+            self.__canvas.icursor(self._title_id, cursor)
+            self.__canvas.focus(self._title_id)
+
     # draw *********************************************************************
     def clear(self):
         self.__canvas.delete(
@@ -55,6 +77,18 @@ class MindNodeDrawing:
         self.__canvas.coords(self._hitbox_id, self._x, self._y, self._x+self._width, self._y+self._height)
         self.__canvas.coords(self._title_id, self.center_x, self.center_y)
 
+    # fold *********************************************************************
+    @property
+    def is_folded(self):
+        return self.__is_folded
+
+    @is_folded.setter
+    def is_folded(self, is_folded):
+        """Draws the hitbox with a dashed outline if the node is folded."""
+        self.__is_folded = is_folded
+
+        self.__canvas.itemconfigure(self._hitbox_id, dash=(4, 2) if is_folded else "")
+
     # select *******************************************************************
     @property
     def is_selected(self):